@@ -16,7 +16,7 @@ def add_menu_items():
             )
             user.set_password("password")  # Set a password
             db.session.add(user)
-            db.session.commit()
+            db.session.flush()
 
         # Get the correct restaurant
         restaurant = Restaurant.query.filter_by(name="The Gourmet Spot").first()
@@ -28,20 +28,20 @@ def add_menu_items():
                 city="Duisburg"
             )
             db.session.add(restaurant)
-            db.session.commit()
+            db.session.flush()
 
         # Example categories
         main_dishes_category = Category.query.filter_by(name="Main Dishes", restaurant_id=restaurant.id).first()
         if not main_dishes_category:
             main_dishes_category = Category(name="Main Dishes", restaurant_id=restaurant.id)
             db.session.add(main_dishes_category)
-            db.session.commit()
+            db.session.flush()
 
         drinks_category = Category.query.filter_by(name="Drinks", restaurant_id=restaurant.id).first()
         if not drinks_category:
             drinks_category = Category(name="Drinks", restaurant_id=restaurant.id)
             db.session.add(drinks_category)
-            db.session.commit()
+            db.session.flush()
 
         # Add menu items
         items = [
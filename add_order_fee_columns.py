@@ -1,54 +1,39 @@
-import os
-import sys
-from flask import Flask
-from models import db, Order
+from sqlalchemy import BigInteger, Float, and_, cast, func, inspect, literal, text, type_coerce, update
+from models import Order
+from migration_runner import DataMigration, run_cli
 
-# Create a minimal Flask app
-app = Flask(__name__)
-basedir = os.path.abspath(os.path.dirname(__file__))
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(basedir, 'instance', 'database.sqlite')}"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["SECRET_KEY"] = "your_secret_key"
+class AddOrderFeeColumns(DataMigration):
+    """Add service_fee and original_fee columns to Order table and backfill them."""
+    name = "add_order_fee_columns"
+    model = Order
 
-# Initialize the database
-db.init_app(app)
+    def setup(self, session):
+        # Check if the columns already exist
+        existing = {column["name"] for column in inspect(session.connection()).get_columns("order")}
+        for column in ("service_fee", "original_fee"):
+            if column not in existing:
+                # Money columns hold integer cents
+                session.execute(text(f'ALTER TABLE "order" ADD COLUMN {column} BIGINT DEFAULT 0'))
+                print(f"✅ Added {column} column to Order table")
 
-def add_order_fee_columns():
-    """Add service_fee and original_fee columns to Order table."""
-    with app.app_context():
-        try:
-            # Check if the columns already exist
-            try:
-                # Try to query using the columns
-                Order.query.filter(Order.service_fee > 0).first()
-                print("✅ Fee columns already exist")
-                return
-            except Exception:
-                # Columns don't exist, proceed with migration
-                pass
-            
-            # Execute raw SQL to add the columns
-            db.session.execute(db.text("ALTER TABLE 'order' ADD COLUMN service_fee FLOAT DEFAULT 0"))
-            db.session.execute(db.text("ALTER TABLE 'order' ADD COLUMN original_fee FLOAT DEFAULT 0"))
-            
-            # Update existing orders to set the fees based on total_price
-            # Service fee is 15% of the original fee (which is 85% of total)
-            # Original fee is 85% of total
-            orders = Order.query.all()
-            for order in orders:
-                if order.total_price > 0:
-                    # Calculate fees
-                    order.original_fee = order.total_price * 0.85
-                    order.service_fee = order.total_price * 0.15
-            
-            db.session.commit()
-            print(f"✅ Successfully added fee columns to Order table")
-            print(f"✅ Updated fee values for {len(orders)} orders")
-            
-        except Exception as e:
-            db.session.rollback()
-            print(f"❌ Error adding fee columns: {str(e)}")
-            sys.exit(1)
+    def where(self):
+        # Only orders with a total and no fee split yet
+        return and_(
+            Order.total_price > 0,
+            func.coalesce(Order.original_fee, 0) == 0,
+            func.coalesce(Order.service_fee, 0) == 0,
+        )
+
+    def process_chunk(self, session, first_id, last_id):
+        # Original fee is 85% of the total; the service fee (15%) is the rest, so the split always adds up
+        total_cents = type_coerce(Order.total_price, BigInteger)
+        original_fee = cast(func.round(total_cents * literal(0.85, Float)), BigInteger)
+        return session.execute(
+            update(Order)
+            .where(Order.id.between(first_id, last_id), self.where())
+            .values(original_fee=original_fee, service_fee=total_cents - original_fee)
+            .execution_options(synchronize_session=False)
+        ).rowcount
 
 if __name__ == "__main__":
-    add_order_fee_columns() 
\ No newline at end of file
+    run_cli(AddOrderFeeColumns())
@@ -4,8 +4,14 @@ import os
 # Add the parent directory to the path so we can import from the root
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import the main Flask app
-from app import app
+# Build the Flask app through the factory
+from flask_login import current_user
+
+from app import create_app
+from cache import get_cache
+from profiling import get_metrics
+
+app = create_app()
 
 # This is the handler that Vercel will use
 @app.route('/api/health')
@@ -15,6 +21,17 @@ def health_check():
         'message': 'Lieferspatz API is running'
     }
 
+@app.route('/api/metrics')
+def metrics():
+    # Includes SQL statement text, so only admins get to see it
+    if not current_user.is_authenticated or current_user.user_type != 'admin':
+        return {'error': 'Forbidden'}, 403
+    return get_metrics()
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    return get_cache().stats()
+
 # For local development
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
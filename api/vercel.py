@@ -4,8 +4,10 @@ import os
 # Add the parent directory to the path so we can import from the root
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import the main Flask app
-from app import app
+# Build the Flask app through the factory
+from app import create_app
+
+app = create_app()
 
 # This is the handler that Vercel will use
 def handler(request):
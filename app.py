@@ -1,98 +1,153 @@
 import os
 import logging
-import uuid
-import secrets
-from datetime import datetime
-from sqlalchemy import func
-from sqlalchemy import or_
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
-from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-from database import db, get_database_url
-from models import User, Restaurant, MenuItem, Item, Order, OrderHasItems, Category, Payment, Rating, Admin
-from cloud_storage import upload_file
-
-# Set up logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Initialize Flask app
-app = Flask(__name__)
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev_key_for_testing_only")
-app.config["SQLALCHEMY_DATABASE_URI"] = get_database_url()
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["UPLOAD_FOLDER"] = "static/uploads"
-
-# Ensure upload directory exists
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify, session, current_app
+from flask_login import LoginManager, login_required, current_user
+
+from database import db, get_database_url, get_engine_options
+from models import User, Restaurant
+from upload_queue import get_upload_queue
+import search as search_index
+import listings
+from profiling import init_profiling
+from images import image_sources
+from assets import init_assets
+import page_cache
+import events as event_bus
+import identity
 
-# Initialize database
-db.init_app(app)
+logger = logging.getLogger(__name__)
 
-# Initialize login manager
+# Login manager is bound to each app in create_app()
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = "login"
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # User and role record come from the identity cache instead of a query per request
+    return identity.load_user(int(user_id))
+
+# Views are collected here and registered on every app built by create_app()
+_routes = []
+
+def route(rule, **options):
+    """Like @app.route, but deferred until create_app() registers it."""
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
+
+def ensure_upload_folder(app):
+    """Create the local upload folder on first use instead of at import time."""
+    folder = os.path.join(app.root_path, app.config["UPLOAD_FOLDER"])
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def create_app(config=None):
+    """Application factory.
+
+    Only Flask, SQLAlchemy and the models are imported up front. Optional
+    subsystems (Cloudinary, the upload folder) initialise themselves the
+    first time they are used, so a cold start that only serves
+    /api/health does not pay for them.
+    """
+    # Load environment variables from .env file
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    logging.basicConfig(level=logging.INFO)
+
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev_key_for_testing_only")
+    app.config["SQLALCHEMY_DATABASE_URI"] = get_database_url()
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = get_engine_options()
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["UPLOAD_FOLDER"] = "static/uploads"
+    app.config["EVENTS_STREAMING"] = event_bus.streaming_enabled()
+    if config:
+        app.config.update(config)
+
+    # Initialize database
+    db.init_app(app)
+
+    # Per-request SQL timing, Server-Timing header and slow-query log
+    init_profiling(app)
+
+    login_manager.init_app(app)
+
+    # <picture> sources for responsive image variants
+    app.jinja_env.globals["image_sources"] = image_sources
+
+    # Fingerprinted JS/CSS bundles from build_assets.py
+    init_assets(app)
+
+    # {% cache %} fragments for restaurant cards and menus
+    page_cache.init_page_cache(app)
+
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+
+    return app
 
-@app.route("/")
+@route("/")
 def home():
     """Home page showing available restaurants."""
     try:
-        # Get all open restaurants
-        restaurants = Restaurant.query.filter_by(is_open=True).order_by(Restaurant.display_order).all()
-        
-        # Get all unique cities from the database for the city filter
-        cities = db.session.query(Restaurant.city).distinct().all()
-        city_list = [city[0] for city in cities if city[0]]
+        # Open restaurants and the city filter come from the listing cache
+        restaurants = listings.get_open_restaurants()
+        city_list = listings.get_cities()
         
-        return render_template("index.html", restaurants=restaurants, cities=city_list)
+        # The listing already carries each card's version, so a revalidation costs no query
+        version = ([(r["id"], r.get("version")) for r in restaurants], city_list)
+        last_modified = max((r["updated_at"] for r in restaurants if r.get("updated_at")), default=None)
+        return page_cache.render_if_modified(
+            version,
+            lambda: render_template("index.html", restaurants=restaurants, cities=city_list),
+            last_modified,
+        )
     except Exception as e:
         logger.error(f"Error in home route: {str(e)}")
         return render_template("error.html", error=str(e))
 
-@app.route("/search")
+@route("/search")
 def search():
-    query = request.args.get("q", "")
-    if not query:
-        return render_template("search_results.html", results=[], query="")
+    # The search form posts "query"; older links still use "q"
+    query = request.args.get("query") or request.args.get("q", "")
+    if not query.strip():
+        return render_template("search_results.html", results=[], restaurants=[], query="")
     
-    # Search for restaurants
-    restaurants = Restaurant.query.filter(
-        or_(
-            Restaurant.name.ilike(f"%{query}%"),
-            Restaurant.description.ilike(f"%{query}%"),
-            Restaurant.city.ilike(f"%{query}%")
+    page = request.args.get("page", 1, type=int)
+    catalog_version, last_modified = page_cache.catalog_version()
+
+    def render():
+        results = search_index.search(query, page=page)
+        return render_template(
+            "search_results.html",
+            results=results,
+            restaurants=results["restaurants"],
+            query=query,
         )
-    ).all()
-    
-    # Search for menu items
-    menu_items = MenuItem.query.filter(
-        or_(
-            MenuItem.name.ilike(f"%{query}%"),
-            MenuItem.description.ilike(f"%{query}%")
+
+    # Unchanged catalog: skip both the search and the render
+    return page_cache.render_if_modified((query, page, catalog_version), render, last_modified)
+
+@route("/api/restaurants")
+def api_restaurants():
+    """JSON restaurant browsing filtered by city/PLZ, paginated by cursor."""
+    is_open = request.args.get("is_open", "true").lower() not in ("false", "0")
+    try:
+        restaurants, next_cursor = listings.browse_restaurants(
+            city=request.args.get("city"),
+            plz=request.args.get("plz"),
+            is_open=is_open,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", listings.BROWSE_DEFAULT_LIMIT, type=int),
         )
-    ).all()
-    
-    # Combine results
-    results = {
-        "restaurants": restaurants,
-        "menu_items": menu_items
-    }
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    return render_template("search_results.html", results=results, query=query)
+    return jsonify({"restaurants": restaurants, "next_cursor": next_cursor})
 
-@app.route("/restaurant/upload-image", methods=["POST"])
+@route("/restaurant/upload-image", methods=["POST"])
 @login_required
 def upload_restaurant_image():
     """Upload a restaurant's profile picture."""
@@ -101,7 +156,7 @@ def upload_restaurant_image():
         return redirect(url_for("home"))
     
     # Get the restaurant for the current user
-    restaurant = Restaurant.query.filter_by(user_id=current_user.id).first()
+    restaurant = identity.restaurant_of(current_user)
     if not restaurant:
         flash("Restaurant information not found!", "danger")
         return redirect(url_for("restaurant_dashboard"))
@@ -126,34 +181,71 @@ def upload_restaurant_image():
         return redirect(url_for("restaurant_dashboard"))
     
     try:
-        # Upload to Cloudinary
-        image_url = upload_file(file)
-        
-        if not image_url:
-            flash('Error uploading image. Please try again.', 'danger')
-            return redirect(url_for("restaurant_dashboard"))
-        
-        # Update restaurant image URL
-        restaurant.image_url = image_url
-        db.session.commit()
+        # Hand the upload to the background queue; image_url is updated when it finishes
+        job_id = get_upload_queue(current_app).submit(restaurant.id, file.read(), file.filename)
+        session["image_upload_job"] = job_id
         
-        flash('Profile picture updated successfully!', 'success')
+        flash('Profile picture is uploading and will appear shortly.', 'info')
     except Exception as e:
         logger.error(f"Error uploading image: {str(e)}")
         flash(f"Error uploading image: {str(e)}", "danger")
     
     return redirect(url_for("restaurant_dashboard"))
 
+@route("/restaurant/upload-image/<job_id>")
+@login_required
+def upload_restaurant_image_status(job_id):
+    """Poll the state of a queued profile picture upload."""
+    job = get_upload_queue(current_app).status(job_id)
+    restaurant = identity.restaurant_of(current_user)
+    if not job or not restaurant or job["restaurant_id"] != restaurant.id:
+        return jsonify({"error": "Upload not found"}), 404
+    
+    return jsonify({"status": job["status"], "image_url": job["url"], "error": job["error"]})
+
+@route("/events")
+def events():
+    """Server-Sent Events stream of cart and order updates for the current user."""
+    if not current_user.is_authenticated or not current_app.config["EVENTS_STREAMING"]:
+        # 204 tells EventSource to stop reconnecting
+        return "", 204
+    
+    channels = [event_bus.user_channel(current_user.id)]
+    restaurant = identity.restaurant_of(current_user)
+    if current_user.user_type == "restaurant" and restaurant:
+        channels.append(event_bus.restaurant_channel(restaurant.id))
+    
+    subscription = event_bus.get_broker().subscribe(channels)
+    return Response(
+        event_bus.event_stream(subscription),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+_app = None
+
+def get_app():
+    """The shared app instance for scripts that do `from app import app`."""
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
+def __getattr__(name):
+    # Build the module-level `app` lazily so importing this module stays cheap
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Vercel serverless handler
 def handler(event, context):
-    return app
+    return get_app()
 
 if __name__ == "__main__":
+    app = create_app()
     # Create all tables if they don't exist
     with app.app_context():
         db.create_all()
+        search_index.init_search_index()
     # Run the app
     app.run(debug=True)
-
-
-
@@ -0,0 +1,74 @@
+"""Bundled, fingerprinted JS/CSS.
+
+build_assets.py concatenates (and, when rjsmin/rcssmin are installed,
+minifies) the files of each bundle below into static/dist/ under a
+content-hash name, and records them in static/dist/manifest.json:
+
+    {"base.js": "/static/dist/base-3f2a9c1d0b7e4a65.js", ...}
+
+Templates call asset_url("site.css") or loop over asset_urls("base.js").
+Without a built manifest (local development) they get the source files,
+so edits show up without a rebuild.
+
+Hashed names change whenever their content does, so /static/dist/ is
+served with a year-long immutable Cache-Control.
+"""
+import json
+import os
+
+from flask import request
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST = os.path.join(DIST_DIR, "manifest.json")
+DIST_URL = "/static/dist/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Bundle name -> source files under static/, in load order
+BUNDLES = {
+    "site.css": ["css/tailwind.css"],
+    "base.js": ["js/live-events.js", "js/main.js"],
+    "restaurant_menu.js": ["js/live-events.js", "js/restaurant.js"],
+}
+
+_manifest = None
+
+
+def _load_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def asset_urls(bundle):
+    """URLs to include for a bundle: the fingerprinted file, or its sources when unbuilt."""
+    built = _load_manifest().get(bundle)
+    if built:
+        return [built]
+    return [f"/static/{source}" for source in BUNDLES[bundle]]
+
+
+def asset_url(bundle):
+    """Single URL for a bundle with one source (stylesheets)."""
+    urls = asset_urls(bundle)
+    if len(urls) != 1:
+        raise ValueError(f"Bundle {bundle} has {len(urls)} unbuilt sources; use asset_urls()")
+    return urls[0]
+
+
+def _cache_dist_files(response):
+    if request.path.startswith(DIST_URL) and response.status_code in (200, 304):
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+def init_assets(app):
+    """Register the template helpers and long-lived caching for /static/dist/."""
+    app.jinja_env.globals["asset_url"] = asset_url
+    app.jinja_env.globals["asset_urls"] = asset_urls
+    app.after_request(_cache_dist_files)
@@ -0,0 +1,64 @@
+"""Check that the restaurant dashboard costs the same SQL statements at any order volume.
+
+Usage: python benchmark_dashboard.py [orders]
+
+Seeds one restaurant with `orders` orders (50 by default) through datagen
+into an in-memory database, then builds get_dashboard_context() and
+walks everything restaurant_dashboard.html reads (menu categories, order
+lines and their items) while counting statements. Repeats with ten times
+as many orders. Exits with status 1 if the two counts differ, which means
+something is loaded per order again.
+"""
+import sys
+import time
+
+from app import create_app
+from models import db, Restaurant
+from profiling import QueryCounter
+import dashboard
+import datagen
+
+
+def render_dashboard(restaurant):
+    """Build the context and touch what the template touches."""
+    context = dashboard.get_dashboard_context(restaurant)
+    for item in context["menu_items"]:
+        _ = item.name, item.price, item.category.name if item.category else None
+    for order in context["current_orders"] + context["completed_orders"]:
+        _ = order.id, order.order_date, order.total_price, order.order_status, order.cashback_applied, order.archived
+        for order_item in order.order_items:
+            _ = order_item.quantity, order_item.item.name, order_item.item.image_url
+    _ = context["ratings_count"]
+    return context
+
+
+def measure(orders):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_ENGINE_OPTIONS": {}})
+    with app.app_context():
+        db.create_all()
+        with db.engine.connect() as connection:
+            datagen.generate(connection, restaurants=1, customers=20, orders=orders, items_per_restaurant=10)
+        restaurant = db.session.execute(db.select(Restaurant)).scalar_one()
+        with QueryCounter() as queries:
+            started = time.perf_counter()
+            context = render_dashboard(restaurant)
+            elapsed = (time.perf_counter() - started) * 1000
+        shown = len(context["current_orders"]) + len(context["completed_orders"])
+        db.session.remove()
+    print(f"📊 {orders:>6} orders: {queries.count} statements, {shown} orders shown, {elapsed:.1f} ms")
+    return queries.count
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    small = measure(orders)
+    large = measure(orders * 10)
+    if small != large:
+        print(f"❌ Dashboard statements grew from {small} to {large} with ten times the orders")
+        return 1
+    print(f"✅ Dashboard costs {small} statements at {orders} and {orders * 10} orders")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Benchmark "restaurants delivering to my PLZ" on the delivery-area index.
+
+Usage: python benchmark_delivery_area.py [restaurants] [postal codes]
+
+Scatters restaurants (50k by default) with 3-8km delivery radii over the
+Ruhr area, plus a synthetic per-code centroid set (8k codes by default)
+the size of Germany's. It then times:
+
+  - lookups by PLZ (answers precomputed at build time)
+  - lookups by coordinates through the grid
+  - the same coordinates with a vectorized scan of every restaurant
+  - a plain Python loop over every restaurant
+
+Grid answers are checked against the full scan. Exits with status 1 if
+they differ or if the p99 of either index lookup is 1ms or more.
+"""
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from delivery_area import DeliveryAreaIndex, haversine_km
+
+# Roughly Köln to Dortmund
+LAT_RANGE = (50.85, 51.60)
+LON_RANGE = (6.60, 7.55)
+RADII_KM = [3.0, 5.0, 5.0, 8.0]
+QUERIES = 2000
+TARGET_MS = 1.0
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def _time(fn, args):
+    timings = []
+    for arg in args:
+        started = time.perf_counter()
+        fn(*arg)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    restaurant_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    plz_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    rng = random.Random(42)
+
+    lats = [rng.uniform(*LAT_RANGE) for _ in range(restaurant_count)]
+    lons = [rng.uniform(*LON_RANGE) for _ in range(restaurant_count)]
+    radii = [rng.choice(RADII_KM) for _ in range(restaurant_count)]
+    centroids = {
+        f"{n:05d}": (rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE))
+        for n in range(10000, 10000 + plz_count)
+    }
+
+    started = time.perf_counter()
+    index = DeliveryAreaIndex(range(1, restaurant_count + 1), lats, lons, radii, centroids)
+    print(f"🗺️  Indexed {restaurant_count} restaurants and precomputed {plz_count} postal codes "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    codes = [(rng.choice(list(centroids)),) for _ in range(QUERIES)]
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(QUERIES)]
+    all_lats, all_lons, all_radii, all_ids = index.lats, index.lons, index.radii, index.ids
+
+    def full_scan(lat, lon):
+        return all_ids[haversine_km(lat, lon, all_lats, all_lons) <= all_radii]
+
+    def python_loop(lat, lon):
+        return [
+            restaurant_id for restaurant_id, r_lat, r_lon, radius in zip(range(1, restaurant_count + 1), lats, lons, radii)
+            if haversine_km(lat, lon, r_lat, r_lon) <= radius
+        ]
+
+    mismatches = sum(
+        not np.array_equal(index.delivering_to_point(lat, lon), np.sort(full_scan(lat, lon)))
+        for lat, lon in points[:200]
+    )
+    answers = [len(index.delivering_to(code)) for (code,) in codes]
+    print(f"📊 {statistics.mean(answers):.0f} restaurants deliver to an average postal code")
+
+    results = {
+        "by PLZ (precomputed)": _time(index.delivering_to, codes),
+        "by point (grid)": _time(index.delivering_to_point, points),
+        "by point (full scan)": _time(full_scan, points),
+        "by point (Python loop)": _time(python_loop, points[:5]),
+    }
+    for name, timings in results.items():
+        median, p99 = _percentiles(timings)
+        print(f"⏱️  {name:<24} median {median:9.4f} ms   p99 {p99:9.4f} ms")
+
+    failed = False
+    if mismatches:
+        print(f"❌ Grid and full scan disagree on {mismatches} of 200 points")
+        failed = True
+    for name in ("by PLZ (precomputed)", "by point (grid)"):
+        _, p99 = _percentiles(results[name])
+        if p99 >= TARGET_MS:
+            print(f"❌ {name} p99 {p99:.3f} ms is not under {TARGET_MS} ms")
+            failed = True
+    if failed:
+        return 1
+    print(f"✅ Index lookups answer in under {TARGET_MS} ms (p99) and match the full scan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
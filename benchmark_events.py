@@ -0,0 +1,58 @@
+"""Measure what idle SSE subscribers cost and how fast events fan out to them.
+
+Usage: python benchmark_events.py [subscribers]
+
+Opens subscribers on the in-process broker the way /events does (one per
+open tab), reports the memory held per connection, then publishes to every
+user channel and times delivery. Exits with status 1 when a subscriber
+misses an event or memory per connection exceeds EVENTS_MAX_KB_PER_CONN.
+Each open stream also holds a worker thread or greenlet, so run the app
+under gunicorn's gthread or gevent workers when many tabs stay open.
+"""
+import os
+import sys
+import time
+import tracemalloc
+from events import InProcessBroker, event_stream, user_channel
+
+MAX_KB_PER_CONNECTION = float(os.environ.get("EVENTS_MAX_KB_PER_CONN", 8))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    broker = InProcessBroker()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    streams = []
+    for user_id in range(count):
+        stream = event_stream(broker.subscribe([user_channel(user_id)]), heartbeat=0)
+        next(stream)  # Prime past the retry hint, as a connected client would
+        streams.append(stream)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_connection_kb = (after - before) / count / 1024
+    print(f"🔌 {count} subscribers hold {(after - before) / 1024 / 1024:.1f} MB ({per_connection_kb:.2f} KB each)")
+
+    started = time.perf_counter()
+    for user_id in range(count):
+        broker.publish(user_channel(user_id), "cart_count", {"count": 1})
+    publish_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    missed = sum(1 for stream in streams if not next(stream).startswith("event: cart_count"))
+    drain_ms = (time.perf_counter() - started) * 1000
+    print(f"⏱️  Published {count} events in {publish_ms:.1f} ms, drained in {drain_ms:.1f} ms")
+
+    for stream in streams:
+        stream.close()
+    print(f"📈 {broker.subscriber_count()} subscribers left after disconnect")
+
+    if missed or broker.subscriber_count() or per_connection_kb > MAX_KB_PER_CONNECTION:
+        print(f"❌ {missed} missed events, budget {MAX_KB_PER_CONNECTION:.0f} KB per connection")
+        sys.exit(1)
+    print("✅ All subscribers received their event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Check the geocoding cache against a slow fake upstream.
+
+Usage: python benchmark_geocoding.py [threads] [addresses]
+
+Runs against a scratch SQLite database with FakeGeocodingClient answering
+after UPSTREAM_LATENCY seconds, the order of a real Geocoding API call.
+
+  - cold: `threads` threads look up the same `addresses` addresses, each
+    spelled several ways, at the same time
+  - LRU: the same lookups again in this process
+  - database: a fresh geocoder (an empty LRU, as in a new worker) over
+    the same table
+  - batch: geocode_many() over all spellings with an empty LRU
+
+Exits with status 1 if any address went upstream more than once, if the
+warm runs went upstream at all, or if the batch needed more than one
+cache query per CHUNK_SIZE addresses.
+"""
+import math
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app
+from models import db
+from profiling import QueryCounter
+import geocoding
+
+UPSTREAM_LATENCY = 0.05
+CITIES = [("47051", "Duisburg"), ("45127", "Essen"), ("40210", "Düsseldorf"), ("44135", "Dortmund")]
+
+
+def spellings(n):
+    """Several ways of writing address n that share one cache key."""
+    plz, city = CITIES[n % len(CITIES)]
+    street = f"Königstraße {n + 1}"
+    return [
+        f"{street}, {plz} {city}",
+        f"{street.replace('straße', 'str.')}, {plz} {city}, Germany",
+        f"  {street.upper()}  {plz}  {city.upper()} ",
+        f"{street.replace('ö', 'oe').replace('ß', 'ss')}, {plz} {city}",
+    ]
+
+
+def run_threads(app, geocoder, threads, addresses):
+    """Every thread looks up every address; returns per-lookup timings in ms."""
+    timings = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(offset):
+        local = []
+        with app.app_context():
+            barrier.wait()
+            for address in addresses[offset:] + addresses[:offset]:
+                started = time.perf_counter()
+                geocoder.geocode(address)
+                local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            timings.extend(local)
+
+    # Spread out, so threads both race for the same addresses and work on different ones
+    workers = [threading.Thread(target=worker, args=(n * len(addresses) // threads,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return timings
+
+
+def report(name, geocoder, timings, elapsed):
+    timings = sorted(timings)
+    print(f"⏱️  {name:<9} {len(timings):>6} lookups in {elapsed:6.2f}s   median {statistics.median(timings):8.3f} ms   "
+          f"p99 {timings[int(len(timings) * 0.99) - 1]:8.3f} ms   upstream calls {geocoder.upstream_calls}")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    path = os.path.join(tempfile.mkdtemp(), "geocoding_bench.sqlite")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "SQLALCHEMY_ENGINE_OPTIONS": {}})
+    with app.app_context():
+        db.create_all()
+
+    addresses = [spelling for n in range(count) for spelling in spellings(n)]
+    unique = len({geocoding.normalize_address(address) for address in addresses})
+    client = geocoding.FakeGeocodingClient(latency=UPSTREAM_LATENCY)
+    failed = False
+
+    geocoder = geocoding.Geocoder(client)
+    for name in ("cold", "LRU"):
+        before = geocoder.upstream_calls
+        started = time.perf_counter()
+        timings = run_threads(app, geocoder, threads, addresses)
+        report(name, geocoder, timings, time.perf_counter() - started)
+        expected = unique if name == "cold" else 0
+        if geocoder.upstream_calls - before != expected:
+            print(f"❌ {name}: {geocoder.upstream_calls - before} upstream calls, expected {expected}")
+            failed = True
+
+    geocoder = geocoding.Geocoder(client)
+    started = time.perf_counter()
+    timings = run_threads(app, geocoder, threads, addresses)
+    report("database", geocoder, timings, time.perf_counter() - started)
+    if geocoder.upstream_calls:
+        print(f"❌ database: {geocoder.upstream_calls} upstream calls, expected 0")
+        failed = True
+
+    geocoder = geocoding.Geocoder(client)
+    with app.app_context():
+        with QueryCounter() as queries:
+            started = time.perf_counter()
+            answers = geocoder.geocode_many(addresses)
+            elapsed = time.perf_counter() - started
+    allowed = math.ceil(unique / geocoding.CHUNK_SIZE)
+    print(f"📦 batch     {len(addresses):>6} addresses in {elapsed * 1000:6.1f} ms with {queries.count} queries "
+          f"and {geocoder.upstream_calls} upstream calls")
+    if queries.count > allowed or geocoder.upstream_calls or None in answers.values():
+        print(f"❌ batch: expected at most {allowed} queries, no upstream calls and an answer for every address")
+        failed = True
+
+    print(f"📊 {len(addresses)} spellings of {unique} addresses; fake upstream answered {client.calls} times")
+    if failed:
+        return 1
+    print("✅ Every address went upstream once; warm lookups and batches were served from the cache")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Check that a login storm doesn't slow down the rest of the app.
+
+Usage: python benchmark_hashing.py [seconds] [login_threads]
+
+Serves /api/restaurants from request threads and measures its latency three
+ways: with no logins running, during a login storm hashing inline, and
+during a login storm using the hashing pool (HASH_EXECUTOR, default
+"process"). Exits with status 1 if the pooled p99 is more than
+HASH_P99_FACTOR (default 3) times the idle p99 plus 20 ms.
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+from app import create_app
+from models import db
+import hashing
+
+P99_FACTOR = float(os.environ.get("HASH_P99_FACTOR", 3))
+P99_SLACK_MS = 20
+READER_THREADS = 4
+
+
+def p99(samples):
+    return statistics.quantiles(samples, n=100)[98] if len(samples) >= 100 else max(samples)
+
+
+def reader(app, stop, samples):
+    client = app.test_client()
+    while not stop.is_set():
+        started = time.perf_counter()
+        client.get("/api/restaurants?city=Duisburg")
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+def login_storm(password_hash, stop, logins):
+    while not stop.is_set():
+        hashing.check_password("password123", password_hash)
+        logins.append(1)
+
+
+def run_phase(app, seconds, login_threads, password_hash):
+    stop = threading.Event()
+    samples, logins = [], []
+    threads = [threading.Thread(target=reader, args=(app, stop, samples)) for _ in range(READER_THREADS)]
+    threads += [threading.Thread(target=login_storm, args=(password_hash, stop, logins)) for _ in range(login_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return samples, len(logins)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    login_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    pooled_mode = hashing.HASH_EXECUTOR if hashing.HASH_EXECUTOR != "inline" else "process"
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_ENGINE_OPTIONS": {}})
+    with app.app_context():
+        db.create_all()
+    password_hash = hashing.hash_password("password123")
+
+    results = {}
+    for label, mode, threads in (("idle", "inline", 0), ("storm, inline", "inline", login_threads),
+                                 (f"storm, {pooled_mode} pool", pooled_mode, login_threads)):
+        hashing.shutdown()
+        hashing.HASH_EXECUTOR = mode
+        if threads:
+            hashing.check_password("password123", password_hash)  # Start the pool before timing
+        samples, logins = run_phase(app, seconds, threads, password_hash)
+        results[label] = p99(samples)
+        print(f"⏱️  {label:<22} p50 {statistics.median(samples):7.2f} ms  p99 {results[label]:7.2f} ms  "
+              f"({len(samples)} requests, {logins / seconds:.1f} logins/s)")
+    hashing.shutdown()
+
+    budget = results["idle"] * P99_FACTOR + P99_SLACK_MS
+    pooled = results[f"storm, {pooled_mode} pool"]
+    if pooled > budget:
+        print(f"❌ p99 during login storm {pooled:.2f} ms exceeds budget {budget:.2f} ms")
+        sys.exit(1)
+    print(f"✅ p99 during login storm {pooled:.2f} ms within budget {budget:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
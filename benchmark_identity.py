@@ -0,0 +1,81 @@
+"""Count the database round-trips the identity cache saves per page.
+
+Usage: python benchmark_identity.py [requests]
+
+Simulates authenticated page views against an in-memory database. Each
+view loads current_user and touches its restaurant/customer/admin records
+the way the templates do. It runs once with the old loader
+(a primary-key get plus lazy backrefs) and once with identity.load_user.
+Exits with status 1 if the cached loader doesn't cut the queries per page.
+"""
+import sys
+import time
+from flask import g
+
+from app import create_app
+from models import db, Customer, Restaurant, User
+from profiling import QueryCounter
+import identity
+
+
+def old_loader(user_id):
+    return db.session.get(User, user_id)
+
+
+def render_page(app, loader, user_id):
+    """One request: load the user, then read what header/profile/dashboard templates read."""
+    with app.test_request_context("/"):
+        user = loader(user_id)
+        _ = user.first_name, user.balance
+        _ = user.restaurant, user.customer, user.admin
+        restaurant = identity.restaurant_of(user)
+        if restaurant is not None:
+            _ = restaurant.name, restaurant.balance
+        db.session.remove()
+        g.pop("_identities", None)
+
+
+def measure(app, loader, user_ids, requests):
+    with QueryCounter() as queries:
+        started = time.perf_counter()
+        for n in range(requests):
+            render_page(app, loader, user_ids[n % len(user_ids)])
+        elapsed = time.perf_counter() - started
+    return queries.count / requests, elapsed / requests * 1000
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_ENGINE_OPTIONS": {}})
+    with app.app_context():
+        db.create_all()
+        users = [
+            User(email=f"identity{i}@example.com", password_hash="x", user_type="restaurant" if i % 2 else "customer",
+                 first_name="Bench", last_name=str(i), location="Bench", plz="47057")
+            for i in range(20)
+        ]
+        db.session.add_all(users)
+        db.session.flush()
+        for user in users:
+            if user.user_type == "restaurant":
+                db.session.add(Restaurant(user_id=user.id, name=f"Bench {user.id}", address="Bench", city="Bench"))
+            else:
+                db.session.add(Customer(user_id=user.id))
+        db.session.commit()
+        user_ids = [user.id for user in users]
+
+    identity.clear()
+    before, before_ms = measure(app, old_loader, user_ids, requests)
+    after, after_ms = measure(app, identity.load_user, user_ids, requests)
+
+    print(f"📈 Queries per page: {before:.2f} uncached -> {after:.2f} with identity cache "
+          f"({before - after:.2f} round-trips saved)")
+    print(f"⏱️  {before_ms:.3f} ms -> {after_ms:.3f} ms per simulated page")
+    if after >= before:
+        print("❌ Identity cache did not reduce queries")
+        sys.exit(1)
+    print("✅ Identity cache saves database round-trips")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measure cold-start cost of the Vercel entry point and check it against a budget.
+
+Usage: python benchmark_import.py [runs]
+
+Each run starts a fresh interpreter with `python -X importtime`, imports
+api/vercel.py (which builds the app through create_app()) and reports the
+wall time plus the most expensive imports. Exits with status 1 when the
+median exceeds COLD_START_BUDGET_MS.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BUDGET_MS = float(os.environ.get("COLD_START_BUDGET_MS", 1000))
+TOP_IMPORTS = 15
+ENTRY_POINT = "import sys; sys.path.insert(0, 'api'); import vercel"
+
+# Subsystems that must stay off the cold-start path
+LAZY_MODULES = ("cloudinary", "requests", "googlemaps", "numpy")
+
+
+def run_once():
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY_POINT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            imports.append((int(cumulative) / 1000, name.rstrip()))
+    return wall_ms, imports
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [run_once() for _ in range(runs)]
+    timings = [wall_ms for wall_ms, _ in results]
+    median = statistics.median(timings)
+
+    _, imports = results[-1]
+    print("🔝 Most expensive imports (cumulative ms):")
+    for cumulative_ms, name in sorted(imports, reverse=True)[:TOP_IMPORTS]:
+        print(f"   {cumulative_ms:8.1f}  {name}")
+
+    eager = sorted({name.strip() for _, name in imports if name.strip().split(".")[0] in LAZY_MODULES})
+    if eager:
+        print(f"❌ Lazy subsystems imported at startup: {', '.join(eager)}")
+
+    print(f"⏱️  Cold start median {median:.0f} ms over {runs} runs (budget {BUDGET_MS:.0f} ms)")
+    if median > BUDGET_MS or eager:
+        sys.exit(1)
+    print("✅ Within cold-start budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Concurrency stress test for ledger transfers.
+
+Usage: python benchmark_ledger.py [threads] [checkouts_per_thread] [--naive]
+
+Builds a throwaway database (LEDGER_BENCH_DATABASE_URL, default a SQLite
+file in the temp dir), then runs parallel checkouts between a few
+customers, restaurants and one admin through ledger.settle_order(). Money
+must be conserved: the sum of all balances has to stay the same, each
+account must match its ledger entries, and every transfer must balance.
+Exits with status 1 otherwise.
+
+--naive runs the same load as ORM read-modify-write (`balance += x`) to
+show the lost updates the ledger avoids.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from models import db, Admin, LedgerEntry, Restaurant, User
+import ledger
+
+CUSTOMERS = 20
+RESTAURANTS = 5
+START_BALANCE = 1000.0
+MAX_RETRIES = 20
+
+
+def build_app():
+    url = os.environ.get("LEDGER_BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "ledger_bench.sqlite")
+        url = f"sqlite:///{path}"
+    options = {"connect_args": {"timeout": 30}} if url.startswith("sqlite") else {}
+    return create_app({"SQLALCHEMY_DATABASE_URI": url, "SQLALCHEMY_ENGINE_OPTIONS": options})
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    users = [
+        User(email=f"bench{i}@example.com", password_hash="x", user_type=user_type,
+             first_name="Bench", last_name=str(i), location="Bench", plz="47057", balance=START_BALANCE)
+        for i, user_type in enumerate(["customer"] * CUSTOMERS + ["restaurant"] * RESTAURANTS + ["admin"])
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    restaurants = [
+        Restaurant(user_id=user.id, name=f"Bench {user.id}", address="Bench", city="Bench", balance=START_BALANCE)
+        for user in users[CUSTOMERS:CUSTOMERS + RESTAURANTS]
+    ]
+    admin = Admin(user_id=users[-1].id, total_earnings=0.0)
+    db.session.add_all(restaurants + [admin])
+    db.session.commit()
+    return [user.id for user in users[:CUSTOMERS]], [r.id for r in restaurants], admin.id
+
+
+def total_money():
+    return sum(
+        db.session.execute(select(func.coalesce(func.sum(column), 0.0))).scalar()
+        for column in ledger.ACCOUNTS.values()
+    )
+
+
+def checkout_ledger(order, admin_id):
+    ledger.settle_order(order, admin_id=admin_id)
+
+
+def checkout_naive(order, admin_id):
+    user = db.session.get(User, order.user_id)
+    restaurant = db.session.get(Restaurant, order.restaurant_id)
+    admin = db.session.get(Admin, admin_id)
+    # Widen the race window the way a slow request would
+    time.sleep(0.001)
+    user.balance -= order.original_fee + order.service_fee
+    restaurant.balance += order.original_fee
+    admin.total_earnings += order.service_fee
+
+
+def worker(app, checkout, customer_ids, restaurant_ids, admin_id, count, seed_value, stats):
+    rng = random.Random(seed_value)
+    with app.app_context():
+        for _ in range(count):
+            total = round(rng.uniform(5, 40), 2)
+            order = SimpleNamespace(
+                id=None,
+                user_id=rng.choice(customer_ids),
+                restaurant_id=rng.choice(restaurant_ids),
+                original_fee=round(total * 0.85, 2),
+                service_fee=round(total - round(total * 0.85, 2), 2),
+            )
+            for _ in range(MAX_RETRIES):
+                try:
+                    checkout(order, admin_id)
+                    db.session.commit()
+                    stats["ok"] += 1
+                    break
+                except ledger.InsufficientFunds:
+                    db.session.rollback()
+                    stats["refused"] += 1
+                    break
+                except OperationalError:
+                    # SQLite reports a busy database instead of waiting forever; try again
+                    db.session.rollback()
+                    stats["retries"] += 1
+        db.session.remove()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    naive = "--naive" in sys.argv
+    threads = int(args[0]) if args else 8
+    per_thread = int(args[1]) if len(args) > 1 else 200
+
+    app = build_app()
+    with app.app_context():
+        customer_ids, restaurant_ids, admin_id = seed()
+        before = total_money()
+
+    stats = {"ok": 0, "refused": 0, "retries": 0}
+    checkout = checkout_naive if naive else checkout_ledger
+    pool = [
+        threading.Thread(target=worker, args=(app, checkout, customer_ids, restaurant_ids, admin_id, per_thread, i, stats))
+        for i in range(threads)
+    ]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    failures = []
+    with app.app_context():
+        after = total_money()
+        if abs(after - before) > 0.01:
+            failures.append(f"total money moved from {before:.2f} to {after:.2f}")
+        if not naive:
+            from consistency import check_ledger
+            if check_ledger():
+                failures.append(f"{len(check_ledger())} transfers do not balance")
+            for account_type, column in ledger.ACCOUNTS.items():
+                ids = {"user": customer_ids, "restaurant": restaurant_ids, "admin": [admin_id]}[account_type]
+                start = 0.0 if account_type == "admin" else START_BALANCE
+                for account_id in ids:
+                    stored = db.session.execute(select(column).where(column.table.c.id == account_id)).scalar()
+                    moved = db.session.execute(
+                        select(func.coalesce(func.sum(LedgerEntry.amount), 0.0))
+                        .where(LedgerEntry.account_type == account_type, LedgerEntry.account_id == account_id)
+                    ).scalar()
+                    if abs(stored - (start + moved)) > 0.01:
+                        failures.append(f"{account_type} {account_id} holds {stored:.2f}, ledger says {start + moved:.2f}")
+
+    mode = "naive read-modify-write" if naive else "ledger"
+    print(f"⏱️  {stats['ok']} {mode} checkouts in {elapsed:.2f}s "
+          f"({stats['ok'] / elapsed:.0f}/s, {stats['refused']} refused, {stats['retries']} busy retries)")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ Money conserved across {threads} threads: {after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
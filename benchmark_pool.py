@@ -0,0 +1,82 @@
+"""Load test showing database connections stay bounded under concurrency.
+
+Usage: DATABASE_URL=postgresql://... DB_POOL_MODE=transaction python benchmark_pool.py [threads] [queries]
+
+Runs many concurrent workers against the engine built from
+database.get_engine_options() and samples how many connections the pool
+has checked out, plus (on Postgres) how many server connections carry our
+application_name.
+"""
+import os
+import sys
+import threading
+import time
+from flask import Flask
+from sqlalchemy import text
+from database import db, get_database_url, get_engine_options
+
+app = Flask(__name__)
+app.config["SQLALCHEMY_DATABASE_URI"] = get_database_url()
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = get_engine_options()
+app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+db.init_app(app)
+
+
+def worker(queries, errors):
+    with app.app_context():
+        for _ in range(queries):
+            try:
+                db.session.execute(text("SELECT 1")).scalar()
+                db.session.commit()
+            except Exception as e:
+                errors.append(str(e))
+                db.session.rollback()
+        db.session.remove()
+
+
+def server_connections():
+    """Connections Postgres currently reports for our application_name."""
+    if db.engine.dialect.name != "postgresql":
+        return None
+    with db.engine.connect() as connection:
+        return connection.execute(
+            text("SELECT count(*) FROM pg_stat_activity WHERE application_name = :name"),
+            {"name": os.environ.get("DB_APPLICATION_NAME", "lieferspatz")},
+        ).scalar()
+
+
+def main():
+    thread_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with app.app_context():
+        pool = db.engine.pool
+        print(f"🔌 Pool {type(pool).__name__} ({os.environ.get('DB_POOL_MODE', 'auto')}) "
+              f"with {thread_count} threads x {queries} queries")
+
+        errors = []
+        threads = [threading.Thread(target=worker, args=(queries, errors)) for _ in range(thread_count)]
+        peak_checked_out = 0
+        peak_server = 0
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            if hasattr(pool, "checkedout"):
+                peak_checked_out = max(peak_checked_out, pool.checkedout())
+            peak_server = max(peak_server, server_connections() or 0)
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+
+        print(f"⏱️  {thread_count * queries} queries in {elapsed:.2f}s "
+              f"({thread_count * queries / elapsed:,.0f} queries/s)")
+        print(f"📈 Peak pool checkouts: {peak_checked_out}")
+        if db.engine.dialect.name == "postgresql":
+            print(f"📈 Peak server connections: {peak_server}")
+        if errors:
+            print(f"❌ {len(errors)} failed queries, first: {errors[0]}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark the full-text search backend against the old ILIKE scan.
+
+Usage: python benchmark_search.py [restaurants] [menu_items]
+
+Defaults to 10k restaurants and 1M menu items in a throwaway SQLite file.
+Set BENCH_DATABASE_URL to run against Postgres instead.
+"""
+import os
+import sys
+import random
+import statistics
+import tempfile
+import time
+from flask import Flask
+from sqlalchemy import insert
+from models import db, User, Restaurant, MenuItem
+import search
+
+WORDS = [
+    "pizza", "sushi", "burger", "vegan", "curry", "pasta", "salad", "kebab",
+    "ramen", "tacos", "steak", "falafel", "schnitzel", "currywurst", "bowl",
+    "spicy", "crispy", "fresh", "homemade", "grilled", "cheese", "chicken",
+]
+CITIES = ["Duisburg", "Essen", "Düsseldorf", "Bochum", "Dortmund", "Köln"]
+QUERIES = ["pizza", "spicy chicken", "Essen", "ram", "vegan bowl", "schnitzel crispy"]
+BATCH_SIZE = 10000
+
+app = Flask(__name__)
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+    "BENCH_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search_bench.sqlite')}",
+)
+app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+db.init_app(app)
+
+
+def _phrase(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _insert_batched(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def seed(restaurant_count, menu_item_count):
+    """Fill the benchmark database with deterministic synthetic rows."""
+    rng = random.Random(42)
+    db.drop_all()
+    db.create_all()
+    # Index first so the triggers populate SQLite's FTS tables during the load
+    search.init_search_index()
+
+    _insert_batched(User, [
+        dict(id=i, email=f"bench{i}@lieferspatz.com", password_hash="x",
+             user_type="restaurant", first_name="Bench", last_name=str(i),
+             location="Benchstraße 1", plz="47000")
+        for i in range(1, restaurant_count + 1)
+    ])
+    _insert_batched(Restaurant, [
+        dict(id=i, user_id=i, name=f"{_phrase(rng, 2).title()} {i}", address="Benchstraße 1",
+             city=rng.choice(CITIES), description=_phrase(rng, 12), rating=0.0, is_open=True)
+        for i in range(1, restaurant_count + 1)
+    ])
+    for start in range(0, menu_item_count, BATCH_SIZE):
+        end = min(start + BATCH_SIZE, menu_item_count)
+        db.session.execute(insert(MenuItem), [
+            dict(id=i, name=_phrase(rng, 2), price=9.5, category="Main",
+                 restaurant_id=rng.randint(1, restaurant_count), description=_phrase(rng, 8))
+            for i in range(start + 1, end + 1)
+        ])
+    db.session.commit()
+
+
+def time_backend(backend, repeat=5):
+    """Return per-query timings in milliseconds for a backend."""
+    timings = []
+    for query in QUERIES:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            search.search(query, backend=backend)
+            timings.append((time.perf_counter() - started) * 1000)
+            db.session.expunge_all()
+    return timings
+
+
+def main():
+    restaurant_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    menu_item_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    with app.app_context():
+        started = time.perf_counter()
+        seed(restaurant_count, menu_item_count)
+        print(f"🌱 Seeded {restaurant_count} restaurants and {menu_item_count} menu items "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        for backend in (search.IlikeSearchBackend(), search.get_backend()):
+            timings = sorted(time_backend(backend))
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"⏱️  {backend.name:<18} median {statistics.median(timings):8.2f} ms   "
+                  f"p95 {p95:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
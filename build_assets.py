@@ -0,0 +1,99 @@
+"""Bundle, minify and fingerprint the JS/CSS listed in assets.BUNDLES.
+
+Usage: python build_assets.py [--tailwind]
+
+Writes content-hashed bundles to static/dist/ and records them in
+manifest.json, which assets.asset_url() reads. Minification needs the
+optional rjsmin and rcssmin packages (pip install rjsmin rcssmin);
+without them bundles are only concatenated. --tailwind regenerates
+static/css/tailwind.css with the Tailwind CLI first. Re-run after
+changing any bundled file; unchanged bundles keep their names.
+"""
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+
+from assets import BUNDLES, DIST_DIR, DIST_URL, MANIFEST, STATIC_DIR
+from images import content_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Relative url(...) references, which would break once the CSS moves to static/dist/
+_CSS_URL_RE = re.compile(r"url\(\s*(['\"]?)(?![a-z]+:|/|#)([^'\")]+)\1\s*\)", re.IGNORECASE)
+
+
+def _minifiers():
+    minifiers = {}
+    try:
+        import rjsmin
+        minifiers["js"] = rjsmin.jsmin
+    except ImportError:
+        print("⚠️ rjsmin not installed; JavaScript bundles will not be minified")
+    try:
+        import rcssmin
+        minifiers["css"] = rcssmin.cssmin
+    except ImportError:
+        print("⚠️ rcssmin not installed; CSS bundles will not be minified")
+    return minifiers
+
+
+def _read_source(source):
+    with open(os.path.join(STATIC_DIR, source), encoding="utf-8") as f:
+        content = f.read()
+    if source.endswith(".css"):
+        base = "/static/" + os.path.dirname(source)
+        content = _CSS_URL_RE.sub(lambda m: f"url({m[1]}{os.path.normpath(os.path.join(base, m[2]))}{m[1]})", content)
+    return content
+
+
+def build_bundle(name, sources, minifiers):
+    kind = name.rsplit(".", 1)[-1]
+    # The semicolon keeps a file without a trailing one from running into the next
+    separator = ";\n" if kind == "js" else "\n"
+    content = separator.join(_read_source(source) for source in sources)
+    if kind in minifiers:
+        content = minifiers[kind](content)
+
+    data = content.encode("utf-8")
+    stem = name.rsplit(".", 1)[0]
+    filename = f"{stem}-{content_hash(data)}.{kind}"
+    with open(os.path.join(DIST_DIR, filename), "wb") as f:
+        f.write(data)
+    return filename, len(data)
+
+
+def build_tailwind():
+    print("🎨 Building Tailwind CSS...")
+    subprocess.run(["npx", "tailwindcss", "-o", "./static/css/tailwind.css"], cwd=BASE_DIR, check=True)
+
+
+def main():
+    if "--tailwind" in sys.argv[1:]:
+        build_tailwind()
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    minifiers = _minifiers()
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        source_size = sum(os.path.getsize(os.path.join(STATIC_DIR, source)) for source in sources)
+        filename, size = build_bundle(name, sources, minifiers)
+        manifest[name] = DIST_URL + filename
+        print(f"✅ {name}: {len(sources)} file(s), {source_size / 1024:.1f} KB -> {filename} ({size / 1024:.1f} KB)")
+
+    # Drop bundles from earlier builds
+    current = {url[len(DIST_URL):] for url in manifest.values()}
+    for path in glob.glob(os.path.join(DIST_DIR, "*")):
+        name = os.path.basename(path)
+        if name != os.path.basename(MANIFEST) and name not in current:
+            os.remove(path)
+
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"📄 Wrote {len(manifest)} bundles to {os.path.relpath(MANIFEST, BASE_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
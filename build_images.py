@@ -0,0 +1,87 @@
+"""Build WebP/AVIF variants of the bundled images in static/images.
+
+Usage: python build_images.py
+
+Writes content-hashed files to static/images/variants/ and records them in
+manifest.json, which images.image_sources() reads to emit srcset. Re-run
+after adding or changing an image; unchanged images keep their names.
+"""
+import glob
+import json
+import os
+from PIL import Image
+from images import STATIC_MANIFEST, VARIANT_WIDTHS, content_hash, variant_formats, _encode
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(BASE_DIR, "static", "images")
+VARIANT_DIR = os.path.dirname(STATIC_MANIFEST)
+SOURCE_PATTERNS = ("*.png", "*.jpg", "*.jpeg")
+
+
+def build_variants(path, formats):
+    with open(path, "rb") as f:
+        data = f.read()
+    image = Image.open(path)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f"{stem}-{content_hash(data)}"
+    # Always include the full width so small images still get a modern format
+    widths = [width for width in VARIANT_WIDTHS if width < image.width] + [image.width]
+
+    kept_formats = []
+    for fmt in formats:
+        encoded = {}
+        for width in widths:
+            resized = image if width == image.width else image.resize(
+                (width, round(image.height * width / image.width)), Image.LANCZOS
+            )
+            encoded[width] = _encode(resized, fmt)
+        # A format that comes out heavier than the source at full size is not worth serving
+        if len(encoded[image.width]) >= len(data):
+            continue
+        kept_formats.append(fmt)
+        for width, content in encoded.items():
+            with open(os.path.join(VARIANT_DIR, f"{name}-{width}.{fmt}"), "wb") as f:
+                f.write(content)
+
+    if not kept_formats:
+        return None
+    return {
+        "base": f"/static/images/variants/{name}",
+        "widths": widths,
+        "formats": kept_formats,
+    }
+
+
+def main():
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+    formats = variant_formats()
+    manifest = {}
+    for pattern in SOURCE_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(SOURCE_DIR, pattern))):
+            if os.path.getsize(path) == 0:
+                print(f"⚠️ Skipping empty image {os.path.basename(path)}")
+                continue
+            entry = build_variants(path, formats)
+            if entry:
+                manifest[f"/static/images/{os.path.basename(path)}"] = entry
+
+    # Drop variants of images that changed or were removed
+    referenced = {
+        f"{os.path.basename(entry['base'])}-{width}.{fmt}"
+        for entry in manifest.values() for width in entry["widths"] for fmt in entry["formats"]
+    }
+    for path in glob.glob(os.path.join(VARIANT_DIR, "*")):
+        name = os.path.basename(path)
+        if name != os.path.basename(STATIC_MANIFEST) and name not in referenced:
+            os.remove(path)
+
+    with open(STATIC_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"✅ Built variants for {len(manifest)} images in {', '.join(formats)}")
+
+
+if __name__ == "__main__":
+    main()
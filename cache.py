@@ -0,0 +1,159 @@
+"""Small cache layer with an in-process TTL/LRU backend and an optional Redis backend.
+
+Set CACHE_REDIS_URL to share the cache between workers; otherwise every
+process keeps its own bounded in-memory cache.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = int(os.environ.get("CACHE_DEFAULT_TTL", 300))
+DEFAULT_MAXSIZE = int(os.environ.get("CACHE_MAXSIZE", 1024))
+
+_MISSING = object()
+
+
+class BaseCache:
+    """Common hit/miss accounting; subclasses implement _get/_set/_delete/_clear."""
+    name = "base"
+
+    def __init__(self, default_ttl=DEFAULT_TTL):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        value = self._get(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self._set(key, value, self.default_ttl if ttl is None else ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._delete(key)
+
+    def clear(self):
+        self._clear()
+
+    def get_or_set(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() to fill it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class TTLCache(BaseCache):
+    """Thread-safe in-process cache; entries expire after their TTL and the
+    least recently used entry is evicted once maxsize is reached."""
+    name = "memory"
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, default_ttl=DEFAULT_TTL):
+        super().__init__(default_ttl)
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache(BaseCache):
+    """Cache backed by any Redis-compatible client (get/set/delete/scan_iter).
+
+    Values are stored as JSON, so only plain data (dicts, lists, strings,
+    numbers) should be cached through this backend.
+    """
+    name = "redis"
+
+    def __init__(self, client, prefix="lieferspatz:", default_ttl=DEFAULT_TTL):
+        super().__init__(default_ttl)
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return _MISSING
+        return json.loads(raw)
+
+    def _set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl or None)
+
+    def _delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def _clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                redis_url = os.environ.get("CACHE_REDIS_URL")
+                _cache = RedisCache.from_url(redis_url) if redis_url else TTLCache()
+    return _cache
+
+
+def set_cache(cache):
+    """Replace the process-wide cache (e.g. with a fake Redis client in tests)."""
+    global _cache
+    _cache = cache
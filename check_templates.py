@@ -0,0 +1,72 @@
+"""Check that every template compiles and that the menu page renders.
+
+Usage: python check_templates.py
+
+Loads every file under templates/ through the app's Jinja environment,
+so a misplaced tag such as an {% endcache %} inside a loop it didn't
+open fails here instead of on the first request. Then seeds a restaurant
+into an in-memory database and renders restaurant_menu.html twice: once
+filling the {% cache %} fragment and once from it. Both renders must show
+every menu item. Exits with status 1 on any failure.
+"""
+import sys
+
+from jinja2 import TemplateError
+
+from app import create_app
+from cache import TTLCache, set_cache
+from models import db, Item, Restaurant
+import datagen
+
+
+def compile_all(app):
+    failed = []
+    for name in sorted(app.jinja_env.list_templates(extensions=["html"])):
+        try:
+            app.jinja_env.get_template(name)
+        except TemplateError as e:
+            print(f"❌ {name}: {e}")
+            failed.append(name)
+    return failed
+
+
+def render_menu(app):
+    """Render restaurant_menu.html with and without a cached fragment; returns problems found."""
+    problems = []
+    with app.app_context():
+        db.create_all()
+        with db.engine.connect() as connection:
+            datagen.generate(connection, restaurants=1, customers=1, orders=0, items_per_restaurant=5)
+        restaurant = db.session.execute(db.select(Restaurant)).scalar_one()
+        menu_items = db.session.execute(db.select(Item).where(Item.restaurant_id == restaurant.id)).scalars().all()
+        template = app.jinja_env.get_template("restaurant_menu.html")
+        for attempt in ("uncached", "cached"):
+            with app.test_request_context(f"/restaurant/{restaurant.id}"):
+                html = template.render(restaurant=restaurant, menu_items=menu_items)
+            missing = [item.name for item in menu_items if f'data-id="{item.id}"' not in html]
+            if missing:
+                problems.append(f"{attempt} render is missing {', '.join(missing)}")
+        db.session.remove()
+    return problems
+
+
+def main():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_ENGINE_OPTIONS": {}})
+    set_cache(TTLCache())
+
+    failed = compile_all(app)
+    if failed:
+        print(f"❌ {len(failed)} templates do not compile")
+        return 1
+
+    problems = render_menu(app)
+    for problem in problems:
+        print(f"❌ restaurant_menu.html: {problem}")
+    if problems:
+        return 1
+    print(f"✅ {len(app.jinja_env.list_templates(extensions=['html']))} templates compile; the menu page renders")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,43 @@
 import os
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.environ.get('CLOUDINARY_API_KEY'),
-    api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
-    secure=True
-)
+_uploader = None
 
-def upload_file(file, folder="lieferspatz"):
-    """Upload a file to Cloudinary and return the URL."""
+def _get_uploader():
+    """Import and configure Cloudinary on first use, keeping it off the cold-start path."""
+    global _uploader
+    if _uploader is None:
+        import cloudinary
+        import cloudinary.uploader
+
+        # Configure Cloudinary
+        cloudinary.config(
+            cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
+            api_key=os.environ.get('CLOUDINARY_API_KEY'),
+            api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
+            secure=True
+        )
+        _uploader = cloudinary.uploader
+    return _uploader
+
+def upload_file(file, folder="lieferspatz", eager=None):
+    """Upload a file to Cloudinary and return the URL.
+
+    `eager` is an optional list of transformations Cloudinary should render
+    in the background right after the upload.
+    """
     if not file:
         return None
     
     try:
         # Upload the file
-        result = cloudinary.uploader.upload(
+        options = {}
+        if eager:
+            options = {"eager": eager, "eager_async": True}
+        result = _get_uploader().upload(
             file,
             folder=folder,
-            resource_type="auto"
+            resource_type="auto",
+            **options
         )
         # Return the secure URL
         return result['secure_url']
@@ -36,7 +52,7 @@ def delete_file(public_id):
     
     try:
         # Delete the file
-        result = cloudinary.uploader.destroy(public_id)
+        result = _get_uploader().destroy(public_id)
         return result['result'] == 'ok'
     except Exception as e:
         print(f"Error deleting from Cloudinary: {str(e)}")
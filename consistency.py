@@ -0,0 +1,186 @@
+"""Backfill and consistency checks for denormalized data.
+
+Usage:
+    python consistency.py backfill-ratings   # recompute rating_sum / rating_count
+    python consistency.py check-ratings      # report drift, exit 1 if any
+    python consistency.py check-ledger       # report transfers that don't sum to zero
+    python consistency.py check-orders       # compare order totals with their order lines
+"""
+import sys
+from sqlalchemy import and_, case, func, or_, select, type_coerce, union_all
+from models import db, ArchivedRating, Item, LedgerEntry, Order, OrderHasItems, OrderStatus, Restaurant, Rating
+from money import MoneyType
+
+TOLERANCE = 1e-6
+
+
+def _ratings():
+    """Ratings from the rating table and the archive (see order_archive.py)."""
+    return union_all(*(
+        select(table.c.restaurant_id, table.c.rating)
+        for table in (Rating.__table__, ArchivedRating.__table__)
+    )).subquery()
+
+
+def _rating_totals():
+    """Per-restaurant SUM/COUNT of live and archived ratings as a subquery."""
+    ratings = _ratings()
+    return (
+        select(
+            ratings.c.restaurant_id.label("restaurant_id"),
+            func.sum(ratings.c.rating).label("rating_sum"),
+            func.count().label("rating_count"),
+        )
+        .group_by(ratings.c.restaurant_id)
+        .subquery()
+    )
+
+
+def backfill_rating_aggregates():
+    """Recompute every restaurant's rating counters from live and archived ratings in one UPDATE."""
+    ratings = _ratings()
+    rating_sum = func.coalesce(
+        select(func.sum(ratings.c.rating)).where(ratings.c.restaurant_id == Restaurant.id).scalar_subquery(), 0.0
+    )
+    rating_count = select(func.count()).where(ratings.c.restaurant_id == Restaurant.id).scalar_subquery()
+    # Restaurants without any ratings keep whatever average they were seeded with
+    result = db.session.execute(
+        Restaurant.__table__.update().values(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=case((rating_count > 0, rating_sum / rating_count), else_=Restaurant.rating),
+        )
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def check_rating_aggregates():
+    """Return a list of restaurants whose counters disagree with their live and archived ratings."""
+    totals = _rating_totals()
+    rows = db.session.execute(
+        select(
+            Restaurant.id,
+            Restaurant.rating_sum,
+            Restaurant.rating_count,
+            func.coalesce(totals.c.rating_sum, 0.0),
+            func.coalesce(totals.c.rating_count, 0),
+        ).outerjoin(totals, totals.c.restaurant_id == Restaurant.id)
+    ).all()
+
+    drift = []
+    for restaurant_id, stored_sum, stored_count, actual_sum, actual_count in rows:
+        if stored_count != actual_count or abs((stored_sum or 0.0) - actual_sum) > TOLERANCE:
+            drift.append({
+                "restaurant_id": restaurant_id,
+                "stored_sum": stored_sum,
+                "stored_count": stored_count,
+                "actual_sum": actual_sum,
+                "actual_count": actual_count,
+            })
+    return drift
+
+
+def check_ledger():
+    """Return transfers whose ledger entries do not sum to zero."""
+    rows = db.session.execute(
+        select(LedgerEntry.transfer_id, func.sum(LedgerEntry.amount))
+        .group_by(LedgerEntry.transfer_id)
+        .having(func.sum(LedgerEntry.amount) != 0)
+    ).all()
+    return [{"transfer_id": transfer_id, "imbalance": imbalance} for transfer_id, imbalance in rows]
+
+
+def check_order_totals():
+    """Return checked-out orders whose stored totals disagree with their lines.
+
+    total_price must equal the sum of quantity x item price, and a fee split,
+    once set, must add up to total_price. Order lines don't snapshot prices,
+    so orders whose items were repriced afterwards show up here as well.
+    """
+    line_totals = (
+        select(
+            OrderHasItems.order_id.label("order_id"),
+            type_coerce(func.sum(OrderHasItems.quantity * Item.price), MoneyType).label("lines_total"),
+        )
+        .join(Item, Item.id == OrderHasItems.item_id)
+        .group_by(OrderHasItems.order_id)
+        .subquery()
+    )
+    lines_total = func.coalesce(line_totals.c.lines_total, 0)
+    original_fee = func.coalesce(Order.original_fee, 0)
+    service_fee = func.coalesce(Order.service_fee, 0)
+    # Comparisons run on integer cents inside the database
+    rows = db.session.execute(
+        select(Order.id, Order.total_price, lines_total, original_fee, service_fee)
+        .outerjoin(line_totals, line_totals.c.order_id == Order.id)
+        .where(
+            Order.order_status != OrderStatus.SHOPPING.value,
+            or_(
+                func.coalesce(Order.total_price, 0) != lines_total,
+                and_(original_fee + service_fee != 0, original_fee + service_fee != func.coalesce(Order.total_price, 0)),
+            ),
+        )
+        .order_by(Order.id)
+    ).all()
+    return [
+        {
+            "order_id": order_id,
+            "total_price": total_price,
+            "lines_total": lines_total,
+            "original_fee": original_fee,
+            "service_fee": service_fee,
+        }
+        for order_id, total_price, lines_total, original_fee, service_fee in rows
+    ]
+
+
+COMMANDS = ("backfill-ratings", "check-ratings", "check-ledger", "check-orders")
+
+
+def main(argv):
+    if len(argv) != 1 or argv[0] not in COMMANDS:
+        print(f"Usage: python consistency.py [{' | '.join(COMMANDS)}]")
+        return 2
+
+    from app import app
+    with app.app_context():
+        if argv[0] == "backfill-ratings":
+            updated = backfill_rating_aggregates()
+            print(f"✅ Recomputed rating aggregates for {updated} restaurants")
+            return 0
+
+        if argv[0] == "check-ledger":
+            unbalanced = check_ledger()
+            for row in unbalanced:
+                print(f"❌ Transfer {row['transfer_id']} is off by {row['imbalance']:.2f}")
+            if unbalanced:
+                print(f"❌ {len(unbalanced)} ledger transfers do not balance")
+                return 1
+            print("✅ Every ledger transfer balances")
+            return 0
+
+        if argv[0] == "check-orders":
+            mismatched = check_order_totals()
+            for row in mismatched:
+                print(f"❌ Order {row['order_id']}: total {row['total_price']}, lines {row['lines_total']}, "
+                      f"fees {row['original_fee']} + {row['service_fee']}")
+            if mismatched:
+                print(f"❌ {len(mismatched)} orders disagree with their order lines")
+                return 1
+            print("✅ Order totals match their order lines")
+            return 0
+
+        drift = check_rating_aggregates()
+        for row in drift:
+            print(f"❌ Restaurant {row['restaurant_id']}: stored {row['stored_count']} ratings / "
+                  f"sum {row['stored_sum']}, actual {row['actual_count']} / sum {row['actual_sum']}")
+        if drift:
+            print(f"❌ {len(drift)} restaurants have drifted rating aggregates")
+            return 1
+        print("✅ Rating aggregates are consistent")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,168 @@
+"""Queries behind restaurant_dashboard.html and admin_dashboard.html.
+
+Every collection the template walks is loaded up front with eager loading,
+and the review count comes from the restaurant's denormalized counter, so
+rendering the page costs a fixed number of SQL statements no matter how
+many orders, order lines or ratings a restaurant has. Completed orders are
+paged, newest first, down into the order archive (see order_archive.py). Earnings are summed
+in the database over integer-cent columns.
+
+Admin figures come from the restaurant_daily_stats rollup (see stats.py)
+rather than the order table, and the user and restaurant tables are
+paginated, so the admin page stays the same size as order volume grows.
+"""
+from datetime import timedelta
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import (
+    db, Item, Order, OrderHasItems, OrderStatus, Restaurant, RestaurantDailyStats, User, active_orders_clause, utcnow,
+)
+from pagination import encode_cursor, decode_cursor
+import order_archive
+
+ADMIN_PAGE_SIZE = 50
+RECENT_ORDERS_LIMIT = 10
+
+
+def _current_orders(restaurant_id):
+    return (
+        Order.query
+        # Served from the partial ix_order_restaurant_active index
+        .filter(Order.restaurant_id == restaurant_id, active_orders_clause(Order.order_status))
+        .options(selectinload(Order.order_items).joinedload(OrderHasItems.item))
+        .order_by(Order.order_date.desc())
+        .all()
+    )
+
+
+def get_menu_items(restaurant_id):
+    """Menu items with their category joined in."""
+    return (
+        Item.query
+        .filter_by(restaurant_id=restaurant_id)
+        .options(joinedload(Item.category))
+        .order_by(Item.id)
+        .all()
+    )
+
+
+def get_dashboard_context(restaurant, completed_cursor=None):
+    """Template variables for restaurant_dashboard.html.
+
+    Completed orders come one page at a time, reaching into the order
+    archive on later pages. Raises ValueError for a malformed cursor.
+    """
+    completed_orders, completed_next_cursor = order_archive.restaurant_history_page(restaurant.id, completed_cursor)
+    return {
+        "restaurant": restaurant,
+        "menu_items": get_menu_items(restaurant.id),
+        "current_orders": _current_orders(restaurant.id),
+        "completed_orders": completed_orders,
+        "completed_next_cursor": completed_next_cursor,
+        "ratings_count": restaurant.ratings_count,
+    }
+
+
+def get_platform_earnings():
+    """Service fees collected from delivered orders, as Money."""
+    return db.session.execute(
+        select(func.coalesce(func.sum(RestaurantDailyStats.service_fees), 0))
+    ).scalar()
+
+
+def get_top_restaurants(limit=5):
+    """Restaurants ranked by the service fees their delivered orders brought in.
+
+    Rows have name, total_orders and service_fees, as admin_dashboard.html expects.
+    """
+    service_fees = func.sum(RestaurantDailyStats.service_fees)
+    return db.session.execute(
+        select(
+            Restaurant.id,
+            Restaurant.name,
+            func.sum(RestaurantDailyStats.order_count).label("total_orders"),
+            service_fees.label("service_fees"),
+        )
+        .join(RestaurantDailyStats, RestaurantDailyStats.restaurant_id == Restaurant.id)
+        .group_by(Restaurant.id, Restaurant.name)
+        .order_by(service_fees.desc(), Restaurant.id)
+        .limit(limit)
+    ).all()
+
+
+def get_daily_totals(days=30):
+    """Platform-wide (day, order_count, revenue, service_fees) rows for the last days, oldest first."""
+    since = (utcnow() - timedelta(days=days - 1)).date()
+    return db.session.execute(
+        select(
+            RestaurantDailyStats.day,
+            func.sum(RestaurantDailyStats.order_count).label("order_count"),
+            func.sum(RestaurantDailyStats.revenue).label("revenue"),
+            func.sum(RestaurantDailyStats.service_fees).label("service_fees"),
+        )
+        .where(RestaurantDailyStats.day >= since)
+        .group_by(RestaurantDailyStats.day)
+        .order_by(RestaurantDailyStats.day)
+    ).all()
+
+
+def get_recent_orders(limit=RECENT_ORDERS_LIMIT):
+    """(order, user) pairs for the latest checked-out orders."""
+    return db.session.execute(
+        select(Order, User)
+        .join(User, User.id == Order.user_id)
+        .where(Order.order_status != OrderStatus.SHOPPING.value)
+        .options(joinedload(Order.restaurant))
+        .order_by(Order.order_date.desc(), Order.id.desc())
+        .limit(limit)
+    ).all()
+
+
+def get_users_page(cursor=None, limit=ADMIN_PAGE_SIZE):
+    """One page of users by id; returns (users, next cursor or None)."""
+    query = select(User).order_by(User.id).limit(limit + 1)
+    after = decode_cursor(cursor, int)
+    if after:
+        query = query.where(User.id > after[0])
+    rows = db.session.execute(query).scalars().all()
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].id) if len(rows) > limit else None
+
+
+def get_restaurants_page(cursor=None, limit=ADMIN_PAGE_SIZE):
+    """One page of restaurants in display order; returns (restaurants, next cursor or None)."""
+    query = select(Restaurant).order_by(Restaurant.display_order, Restaurant.id).limit(limit + 1)
+    after = decode_cursor(cursor, int, int)
+    if after:
+        query = query.where(tuple_(Restaurant.display_order, Restaurant.id) > tuple_(*after))
+    rows = db.session.execute(query).scalars().all()
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].display_order, page[-1].id) if len(rows) > limit else None
+
+
+def get_admin_dashboard_context(admin, users_cursor=None, restaurants_cursor=None):
+    """Template variables for admin_dashboard.html.
+
+    Raises ValueError for a malformed cursor.
+    """
+    users, users_next_cursor = get_users_page(users_cursor)
+    restaurants, restaurants_next_cursor = get_restaurants_page(restaurants_cursor)
+    return {
+        "admin": admin,
+        "restaurants": restaurants,
+        "restaurants_next_cursor": restaurants_next_cursor,
+        "users": users,
+        "users_next_cursor": users_next_cursor,
+        "recent_orders": get_recent_orders(),
+        "top_restaurants": get_top_restaurants(),
+        "daily_totals": get_daily_totals(),
+        "total_orders": db.session.execute(
+            select(func.coalesce(func.sum(RestaurantDailyStats.order_count), 0))
+        ).scalar(),
+        "active_restaurants": db.session.execute(
+            select(func.count(Restaurant.id)).where(Restaurant.is_open.is_(True))
+        ).scalar(),
+        "total_users": db.session.execute(select(func.count(User.id))).scalar(),
+    }
@@ -1,8 +1,11 @@
-from flask_sqlalchemy import SQLAlchemy
 import os
+from sqlalchemy.pool import NullPool, QueuePool
 
-# Initialize SQLAlchemy instance
-db = SQLAlchemy()
+# Re-export the SQLAlchemy instance the models are registered on, so
+# db.init_app() and Model.query always refer to the same extension
+from models import db
+
+POOL_MODES = ("auto", "queue", "null", "transaction")
 
 def get_database_url():
     """Get the database URL from environment variables or use SQLite as fallback."""
@@ -18,6 +21,64 @@ def get_database_url():
     # For local development
     return 'sqlite:///instance/database.sqlite'
 
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+def get_engine_options(database_url=None):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the pool mode in DB_POOL_MODE.
+
+    - queue: a QueuePool per process, sized by DB_POOL_SIZE / DB_MAX_OVERFLOW.
+    - null: no pooling; every checkout opens a connection and closes it on
+      release. Use this on serverless instances behind an external pooler
+      (PgBouncer, Supabase/Neon poolers) so idle lambdas hold no connections.
+    - transaction: PgBouncer-style, a small fixed pool with no overflow. The
+      session hands its connection back at every commit/rollback, so
+      DB_POOL_SIZE connections are shared by all requests in the process.
+    - auto (default): null on Vercel, queue everywhere else.
+
+    SQLite URLs get no pool options.
+    """
+    database_url = database_url or get_database_url()
+    if database_url.startswith("sqlite"):
+        return {}
+
+    mode = os.environ.get("DB_POOL_MODE", "auto").lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE {mode!r}, expected one of {POOL_MODES}")
+    if mode == "auto":
+        mode = "null" if os.environ.get("VERCEL") else "queue"
+
+    options = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "connect_args": {
+            "connect_timeout": _env_int("DB_CONNECT_TIMEOUT", 10),
+            "application_name": os.environ.get("DB_APPLICATION_NAME", "lieferspatz"),
+        },
+    }
+    if mode == "null":
+        options["poolclass"] = NullPool
+    elif mode == "queue":
+        options.update(
+            poolclass=QueuePool,
+            pool_size=_env_int("DB_POOL_SIZE", 5),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", 5),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+        )
+    else:
+        options.update(
+            poolclass=QueuePool,
+            pool_size=_env_int("DB_POOL_SIZE", 2),
+            max_overflow=0,
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 10),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 300),
+            pool_use_lifo=True,
+        )
+    return options
+
 def create_tables(app):
     """Create tables using Flask-SQLAlchemy within app context."""
     with app.app_context():
@@ -0,0 +1,435 @@
+"""Bulk data generation and import.
+
+Usage:
+    python datagen.py synthetic [--restaurants N] [--customers N] [--orders N]
+                                [--items-per-restaurant N] [--seed S] [--batch-size N]
+    python datagen.py import restaurants <file.json|file.jsonl|file.csv> [--city CITY] [--skip-geocoding]
+
+`synthetic` builds a benchmark dataset, e.g. 100k restaurants and 10M orders:
+
+    python datagen.py synthetic --restaurants 100000 --customers 1000000 --orders 10000000
+
+Rows go in through Core `insert()` with executemany batches (COPY on
+Postgres), committed per batch, with primary keys assigned up front so
+nothing is read back. All synthetic users share one precomputed password
+hash (DATAGEN_PASSWORD, default "password123"). The same seed on the same
+starting database produces the same rows. Rows per second are reported
+per table.
+
+Imported restaurants are placed on the map through geocoding.py, one
+geocode_many() call per batch; --skip-geocoding leaves them for
+`python delivery_area.py locate`.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.types import TypeDecorator
+
+from models import db, Category, Customer, Item, Order, OrderHasItems, OrderStatus, Restaurant, User
+from money import Money
+import delivery_area
+import geocoding
+import hashing
+import order_state
+
+BATCH_SIZE = 5000
+DEFAULT_PASSWORD = os.environ.get("DATAGEN_PASSWORD", "password123")
+
+CITIES = ["Duisburg", "Essen", "Düsseldorf", "Dortmund", "Bochum", "Köln", "Oberhausen", "Mülheim an der Ruhr"]
+CUISINES = ["Italian", "Vegan", "BBQ", "Sushi", "Mexican", "Burgers", "Indian", "Chinese"]
+DISHES = ["Pizza", "Pasta", "Burger", "Curry", "Salad", "Wrap", "Soup", "Bowl", "Noodles", "Tacos"]
+CATEGORIES = ["Main Dishes", "Drinks"]
+ORDER_STATUSES = ["delivered"] * 6 + ["cancelled", "pending", "accepted", "prepared"]
+
+# Fixed reference point so generated order dates don't depend on the clock
+EPOCH = datetime(2026, 1, 1)
+# Statuses an order passes through to reach each generated status
+STATUS_PATHS = {
+    "pending": ["pending"],
+    "accepted": ["pending", "accepted"],
+    "prepared": ["pending", "accepted", "prepared"],
+    "delivered": ["pending", "accepted", "prepared", "delivered"],
+    "cancelled": ["pending", "cancelled"],
+}
+STATUS_STEP = timedelta(minutes=15)
+DELIVERY_RADII_KM = [3.0, 5.0, 5.0, 8.0]
+
+
+# ============================ ✍️ WRITING ============================ #
+class BulkWriter:
+    """Inserts batches of row dicts, counting rows per table."""
+
+    def __init__(self, connection, use_copy=None):
+        self.connection = connection
+        self.use_copy = connection.dialect.name == "postgresql" if use_copy is None else use_copy
+        self.counts = Counter()
+        self.started = time.perf_counter()
+
+    def write(self, table, rows):
+        if not rows:
+            return
+        if self.use_copy:
+            self._copy(table, rows)
+        else:
+            self.connection.execute(table.insert(), rows)
+        self.counts[table.name] += len(rows)
+
+    def commit(self):
+        self.connection.commit()
+
+    def _copy(self, table, rows):
+        dialect = self.connection.dialect
+        columns = list(rows[0])
+        # COPY skips SQLAlchemy's type processing, so apply MoneyType & co. by hand
+        processors = {
+            name: table.c[name].type.process_bind_param
+            for name in columns if isinstance(table.c[name].type, TypeDecorator)
+        }
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                "" if value is None else value
+                for value in (processors[name](row[name], dialect) if name in processors else row[name] for name in columns)
+            ])
+        buffer.seek(0)
+        preparer = dialect.identifier_preparer
+        statement = (f"COPY {preparer.format_table(table)} ({', '.join(preparer.quote(name) for name in columns)}) "
+                     "FROM STDIN WITH (FORMAT csv)")
+        self.connection.connection.cursor().copy_expert(statement, buffer)
+
+    def reset_sequences(self, tables):
+        """Move Postgres id sequences past the explicitly assigned keys."""
+        if self.connection.dialect.name != "postgresql":
+            return
+        preparer = self.connection.dialect.identifier_preparer
+        for table in tables:
+            self.connection.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{preparer.format_table(table)}', 'id'), "
+                f"COALESCE(MAX(id), 1)) FROM {preparer.format_table(table)}"
+            )
+        self.commit()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        total = sum(self.counts.values())
+        for name, count in self.counts.items():
+            print(f"   {name:<16} {count:>12,} rows")
+        print(f"📈 {total:,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+def _next_id(connection, model):
+    return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _password_hash():
+    # One hash for every synthetic user; bcrypt per row would dominate the run
+    return hashing.hash_password(DEFAULT_PASSWORD)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _item_price(item_id):
+    """Deterministic menu price between 2.99 and 22.98 derived from the item id."""
+    return Money.from_cents(299 + (item_id * 7919) % 2000)
+
+
+# ============================ 🌱 SYNTHETIC DATASET ============================ #
+def generate(connection, restaurants=1000, customers=5000, orders=20000, items_per_restaurant=10,
+             seed=42, batch_size=BATCH_SIZE):
+    rng = random.Random(seed)
+    writer = BulkWriter(connection)
+    password_hash = _password_hash()
+
+    first_user = _next_id(connection, User)
+    first_restaurant = _next_id(connection, Restaurant)
+    first_customer = _next_id(connection, Customer)
+    first_category = _next_id(connection, Category)
+    first_item = _next_id(connection, Item)
+    first_order = _next_id(connection, Order)
+    first_line = _next_id(connection, OrderHasItems)
+    first_customer_user = first_user + restaurants
+
+    # Users and restaurants get real postal codes of their city, so delivery areas can be looked up
+    postcodes = {}
+    for plz, lat, lon, city in delivery_area.read_centroids():
+        postcodes.setdefault(city, []).append((plz, lat, lon))
+
+    def postcode(n):
+        city = CITIES[n % len(CITIES)]
+        if city not in postcodes:
+            return f"{47000 + n % 1000}", None, None
+        return postcodes[city][n // len(CITIES) % len(postcodes[city])]
+
+    def users():
+        for n in range(restaurants + customers):
+            is_restaurant = n < restaurants
+            city = CITIES[n % len(CITIES)]
+            yield {
+                "id": first_user + n,
+                "email": f"datagen-{seed}-{first_user + n}@example.com",
+                "password_hash": password_hash,
+                "user_type": "restaurant" if is_restaurant else "customer",
+                "first_name": rng.choice(DISHES) if is_restaurant else f"Customer{n}",
+                "last_name": "Restaurant" if is_restaurant else "Datagen",
+                "location": f"Datagen Street {n % 200 + 1}, {city}",
+                "plz": postcode(n)[0],
+                "balance": Money(0 if is_restaurant else 100),
+            }
+
+    def restaurant_rows():
+        for n in range(restaurants):
+            cuisine = CUISINES[n % len(CUISINES)]
+            city = CITIES[n % len(CITIES)]
+            _, lat, lon = postcode(n)
+            yield {
+                "id": first_restaurant + n,
+                "user_id": first_user + n,
+                "name": f"{cuisine} {rng.choice(DISHES)} House {first_restaurant + n}",
+                "address": f"Datagen Street {n % 200 + 1}, {city}",
+                "city": city,
+                "image_url": f"/static/images/{cuisine}.png",
+                "description": f"Synthetic {cuisine} restaurant in {city}.",
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "rating_sum": 0.0,
+                "rating_count": 0,
+                "balance": Money(0),
+                "is_open": rng.random() < 0.8,
+                "display_order": n,
+                # Scattered up to ~3km around the postal code's centroid
+                "latitude": lat + rng.uniform(-0.025, 0.025) if lat is not None else None,
+                "longitude": lon + rng.uniform(-0.04, 0.04) if lon is not None else None,
+                "delivery_radius_km": rng.choice(DELIVERY_RADII_KM),
+            }
+
+    def customer_rows():
+        for n in range(customers):
+            yield {
+                "id": first_customer + n,
+                "user_id": first_customer_user + n,
+                "address": f"Datagen Street {n % 200 + 1}",
+                "postal_code": postcode(restaurants + n)[0],
+            }
+
+    def category_rows():
+        for n in range(restaurants):
+            for k, name in enumerate(CATEGORIES):
+                yield {"id": first_category + n * len(CATEGORIES) + k, "name": name, "restaurant_id": first_restaurant + n}
+
+    def item_rows():
+        for n in range(restaurants):
+            for k in range(items_per_restaurant):
+                item_id = first_item + n * items_per_restaurant + k
+                yield {
+                    "id": item_id,
+                    "name": f"{rng.choice(DISHES)} {k + 1}",
+                    "description": None,
+                    "price": _item_price(item_id),
+                    "category_id": first_category + n * len(CATEGORIES) + (0 if k < items_per_restaurant - 2 else 1),
+                    "restaurant_id": first_restaurant + n,
+                    "image_url": "/static/images/default_food.png",
+                }
+
+    for model, rows in ((User, users()), (Restaurant, restaurant_rows()), (Customer, customer_rows()),
+                        (Category, category_rows()), (Item, item_rows())):
+        for batch in _batches(rows, batch_size):
+            writer.write(model.__table__, batch)
+            writer.commit()
+        print(f"🌱 {model.__tablename__}: {writer.counts[model.__tablename__]:,} rows")
+
+    # Orders and their lines are written together so each batch is self-consistent
+    line_id = first_line
+    for start in range(0, orders, batch_size):
+        order_batch, line_batch = [], []
+        for n in range(start, min(start + batch_size, orders)):
+            order_id = first_order + n
+            customer = rng.randrange(customers)
+            restaurant = rng.randrange(restaurants)
+            total = Money(0)
+            for item_offset in rng.sample(range(items_per_restaurant), k=min(rng.randint(1, 3), items_per_restaurant)):
+                item_id = first_item + restaurant * items_per_restaurant + item_offset
+                quantity = rng.randint(1, 3)
+                total += _item_price(item_id) * quantity
+                line_batch.append({"id": line_id, "order_id": order_id, "item_id": item_id, "quantity": quantity})
+                line_id += 1
+            original_fee = total * 0.85
+            status = rng.choice(ORDER_STATUSES)
+            order_date = EPOCH + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            order_batch.append({
+                "id": order_id,
+                "customer_id": first_customer + customer,
+                "restaurant_id": first_restaurant + restaurant,
+                "user_id": first_customer_user + customer,
+                "total_price": total,
+                "original_fee": original_fee,
+                "service_fee": total - original_fee,
+                "order_status": status,
+                "order_date": order_date,
+                "cashback_applied": False,
+                **dict.fromkeys(order_state.TIMESTAMPS.values()),
+                **{
+                    order_state.TIMESTAMPS[OrderStatus(step)]: order_date + n * STATUS_STEP
+                    for n, step in enumerate(STATUS_PATHS[status])
+                },
+            })
+        writer.write(Order.__table__, order_batch)
+        writer.write(OrderHasItems.__table__, line_batch)
+        writer.commit()
+        if (start // batch_size) % 20 == 19:
+            print(f"⏱️  {writer.counts['order']:,} / {orders:,} orders")
+
+    writer.reset_sequences([model.__table__ for model in (User, Restaurant, Customer, Category, Item, Order, OrderHasItems)])
+    return writer
+
+
+# ============================ 📥 IMPORT ============================ #
+def read_records(path):
+    """Yield dicts from a CSV, JSON Lines or JSON array file.
+
+    CSV and JSON Lines are streamed; a JSON array is parsed in one go.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def import_restaurants(connection, path, city="Duisburg", batch_size=BATCH_SIZE, geocode=True):
+    """Import restaurants (name, image, rating, city, address, plz, description),
+    each with its own restaurant user, geocoded unless geocode is False."""
+    writer = BulkWriter(connection)
+    password_hash = _password_hash()
+    next_user = _next_id(connection, User)
+    next_restaurant = _next_id(connection, Restaurant)
+    display_order = connection.execute(select(func.coalesce(func.max(Restaurant.display_order), -1))).scalar() + 1
+
+    for batch in _batches(read_records(path), batch_size):
+        users, restaurants = [], []
+        for record in batch:
+            name = record.get("name") or "Unknown"
+            restaurant_city = record.get("city") or city
+            address = record.get("address") or restaurant_city
+            plz = str(record.get("plz") or "00000")
+            users.append({
+                "id": next_user,
+                "email": f"import-{next_user}@lieferspatz.com",
+                "password_hash": password_hash,
+                "user_type": "restaurant",
+                "first_name": name[:100],
+                "last_name": "Restaurant",
+                "location": address,
+                "plz": plz,
+                "balance": Money(0),
+            })
+            restaurants.append({
+                "id": next_restaurant,
+                "user_id": next_user,
+                "name": name,
+                "address": address,
+                "city": restaurant_city,
+                "image_url": record.get("image") or record.get("image_url") or "/static/images/default_restaurant.png",
+                "description": record.get("description"),
+                "rating": float(record.get("rating") or 0.0),
+                "rating_sum": 0.0,
+                "rating_count": 0,
+                "balance": Money(0),
+                "is_open": True,
+                "display_order": display_order,
+                "latitude": None,
+                "longitude": None,
+                "_geocode_as": geocoding.full_address(address, record.get("plz"), restaurant_city),
+            })
+            next_user += 1
+            next_restaurant += 1
+            display_order += 1
+        locations = geocoding.geocode_many([row["_geocode_as"] for row in restaurants], connection) if geocode else {}
+        for row in restaurants:
+            location = locations.get(row.pop("_geocode_as"))
+            if location:
+                row["latitude"], row["longitude"] = location.latitude, location.longitude
+        writer.write(User.__table__, users)
+        writer.write(Restaurant.__table__, restaurants)
+        writer.commit()
+
+    writer.reset_sequences([User.__table__, Restaurant.__table__])
+    return writer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate or import bulk data")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    synthetic = commands.add_parser("synthetic", help="generate a deterministic benchmark dataset")
+    synthetic.add_argument("--restaurants", type=int, default=1000)
+    synthetic.add_argument("--customers", type=int, default=5000)
+    synthetic.add_argument("--orders", type=int, default=20000)
+    synthetic.add_argument("--items-per-restaurant", type=int, default=10)
+    synthetic.add_argument("--seed", type=int, default=42)
+    synthetic.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    importer = commands.add_parser("import", help="import records from CSV/JSON")
+    importer.add_argument("kind", choices=["restaurants"])
+    importer.add_argument("path")
+    importer.add_argument("--city", default="Duisburg", help="city for records without one")
+    importer.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    importer.add_argument("--skip-geocoding", action="store_true", help="leave coordinates empty")
+
+    args = parser.parse_args(argv)
+
+    from app import app
+    import listings
+    import stats
+    with app.app_context():
+        with db.engine.connect() as connection:
+            try:
+                if args.command == "synthetic":
+                    writer = generate(
+                        connection, restaurants=args.restaurants, customers=args.customers, orders=args.orders,
+                        items_per_restaurant=args.items_per_restaurant, seed=args.seed, batch_size=args.batch_size,
+                    )
+                else:
+                    writer = import_restaurants(connection, args.path, city=args.city, batch_size=args.batch_size,
+                                                geocode=not args.skip_geocoding)
+            except (OSError, ValueError) as e:
+                print(f"❌ ERROR: {e}")
+                return 1
+        # Core inserts bypass the session events that normally invalidate listings
+        # and roll delivered orders into the dashboard stats
+        listings.invalidate_listing()
+        if args.command == "synthetic":
+            started = time.perf_counter()
+            rows = stats.rebuild()
+            db.session.commit()
+            print(f"📊 Rebuilt {rows} dashboard stat rows in {time.perf_counter() - started:.1f}s")
+
+    writer.report()
+    print("✅ Done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Which restaurants deliver to a postal code.
+
+A restaurant delivers within delivery_radius_km of its coordinates
+(Restaurant.latitude / longitude). Postal codes are placed at their
+centroid from an offline CSV, so no geocoding happens per request:
+
+    plz,lat,lon[,city]                      one row per postal code
+    plz_from,plz_to,lat,lon[,city]          one row per range of codes
+
+The bundled static/data/plz_centroids.csv is the coarse second kind: the
+postal code ranges of the cities the platform serves, each placed at its
+city centre. Point DELIVERY_PLZ_CENTROIDS at a per-code dataset (e.g. one
+derived from OpenStreetMap) for finer delivery areas.
+
+DeliveryAreaIndex keeps the restaurants in NumPy arrays bucketed into a
+grid whose cells are as wide as the largest delivery radius, so a point
+only needs the distances to the restaurants in its 3x3 block of cells,
+computed in one vectorized haversine. Every postal code's answer is
+precomputed when the index is built, which makes a lookup by PLZ a dict
+access. NumPy is only imported then, keeping it off the app's cold
+start. The index is rebuilt when restaurant locations change: right away
+in the process that committed the change, and within
+INDEX_RECHECK_SECONDS elsewhere (see page_cache.catalog_version()).
+
+Restaurants without coordinates are not in the index. New restaurants
+start out that way until `locate` geocodes them, so browsing by PLZ also
+lists them when their owner is registered at that postal code.
+
+Usage:
+    python delivery_area.py locate         # geocode restaurants without coordinates (see geocoding.py)
+    python delivery_area.py lookup PLZ     # list the restaurants delivering to PLZ
+"""
+import csv
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from models import db, Restaurant, User
+import page_cache
+
+PLZ_CENTROIDS_PATH = os.environ.get(
+    "DELIVERY_PLZ_CENTROIDS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "data", "plz_centroids.csv")
+)
+DEFAULT_DELIVERY_RADIUS_KM = float(os.environ.get("DELIVERY_RADIUS_KM", 5.0))
+INDEX_RECHECK_SECONDS = 30
+EARTH_RADIUS_KM = 6371.0
+
+# Changing any of these moves a restaurant's delivery area
+LOCATION_FIELDS = ("latitude", "longitude", "delivery_radius_km")
+
+
+# ============================ 📍 PLZ CENTROIDS ============================ #
+_centroids = {}
+
+
+def read_centroids(path=PLZ_CENTROIDS_PATH):
+    """Yield (plz, lat, lon, city) for every postal code in a centroid CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            lat, lon, city = float(row["lat"]), float(row["lon"]), row.get("city") or None
+            if row.get("plz"):
+                yield row["plz"].strip(), lat, lon, city
+            else:
+                for plz in range(int(row["plz_from"]), int(row["plz_to"]) + 1):
+                    yield f"{plz:05d}", lat, lon, city
+
+
+def load_centroids(path=PLZ_CENTROIDS_PATH):
+    """{plz: (lat, lon)} from a centroid CSV, read once per path."""
+    if path not in _centroids:
+        _centroids[path] = {plz: (lat, lon) for plz, lat, lon, _ in read_centroids(path)}
+    return _centroids[path]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments in degrees, any of them may be arrays."""
+    import numpy as np
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# ============================ 🗺️ INDEX ============================ #
+class DeliveryAreaIndex:
+    """Restaurants bucketed into a lat/lon grid, with every postal code's answer precomputed."""
+
+    def __init__(self, ids, lats, lons, radii_km, centroids):
+        import numpy as np
+        # Kept in id order, so any subset taken in position order comes out sorted
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.lats = np.asarray(lats, dtype=np.float64)[order]
+        self.lons = np.asarray(lons, dtype=np.float64)[order]
+        self.radii = np.asarray(radii_km, dtype=np.float64)[order]
+
+        # Cells at least as wide as the largest radius: a restaurant delivering to
+        # a point always sits in the point's cell or one of its eight neighbours
+        reach_km = max(float(self.radii.max()) if len(self.radii) else 0.0, 1.0)
+        max_lat = max([abs(lat) for lat, _ in centroids.values()] + [float(np.abs(self.lats).max()) if len(self.lats) else 0.0])
+        self.cell_lat = reach_km / 111.0
+        self.cell_lon = reach_km / (111.0 * max(math.cos(math.radians(min(max_lat, 89.0))), 0.01))
+
+        cells = defaultdict(list)
+        for position, cell in enumerate(zip(*self._cell_of(self.lats, self.lons))):
+            cells[cell].append(position)
+        self.cells = {cell: np.asarray(positions, dtype=np.int64) for cell, positions in cells.items()}
+        self.by_plz = self._precompute(centroids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell_of(self, lats, lons):
+        import numpy as np
+        return (np.floor(np.asarray(lats) / self.cell_lat).astype(np.int64).tolist(),
+                np.floor(np.asarray(lons) / self.cell_lon).astype(np.int64).tolist())
+
+    def _candidates(self, cell):
+        import numpy as np
+        row, col = cell
+        blocks = [
+            self.cells[neighbour]
+            for neighbour in ((row + dr, col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+            if neighbour in self.cells
+        ]
+        return np.sort(np.concatenate(blocks)) if blocks else np.empty(0, dtype=np.int64)
+
+    def _precompute(self, centroids):
+        import numpy as np
+        # Postal codes sharing a centroid (a whole range in the coarse dataset)
+        # share one answer, and all centroids in a cell share their candidates,
+        # so each cell is one (centroids x candidates) distance matrix
+        points = list(dict.fromkeys(centroids.values()))
+        by_cell = defaultdict(list)
+        for point, cell in zip(points, zip(*self._cell_of([p[0] for p in points], [p[1] for p in points]))):
+            by_cell[cell].append(point)
+        answers = {}
+        for cell, cell_points in by_cell.items():
+            candidates = self._candidates(cell)
+            point_lats, point_lons = np.array(cell_points).T
+            covered = haversine_km(
+                point_lats[:, None], point_lons[:, None], self.lats[candidates], self.lons[candidates]
+            ) <= self.radii[candidates]
+            for point, row in zip(cell_points, covered):
+                answers[point] = self.ids[candidates[row]]
+        return {plz: answers[point] for plz, point in centroids.items()}
+
+    def delivering_to_point(self, lat, lon):
+        """Sorted ids of the restaurants whose delivery radius covers (lat, lon)."""
+        (row,), (col,) = self._cell_of([lat], [lon])
+        candidates = self._candidates((row, col))
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        return self.ids[candidates[distances <= self.radii[candidates]]]
+
+    def delivering_to(self, plz):
+        """Sorted ids of the restaurants delivering to plz, or None for a postal code without a centroid."""
+        return self.by_plz.get(str(plz).strip())
+
+
+def _located_restaurants(session):
+    return session.execute(
+        select(Restaurant.id, Restaurant.latitude, Restaurant.longitude, Restaurant.delivery_radius_km)
+        .where(Restaurant.latitude.is_not(None), Restaurant.longitude.is_not(None))
+        .order_by(Restaurant.id)
+    ).all()
+
+
+def _locations(session):
+    """(id, latitude, longitude, radius) of every restaurant with coordinates, in id order."""
+    return [
+        (row.id, row.latitude, row.longitude, row.delivery_radius_km or DEFAULT_DELIVERY_RADIUS_KM)
+        for row in _located_restaurants(session)
+    ]
+
+
+def build_index(session=None, centroids=None, locations=None):
+    """Build a DeliveryAreaIndex from the restaurant table."""
+    locations = locations if locations is not None else _locations(session or db.session)
+    ids, lats, lons, radii = zip(*locations) if locations else ((), (), (), ())
+    return DeliveryAreaIndex(ids, lats, lons, radii, centroids if centroids is not None else load_centroids())
+
+
+_index = None
+_index_locations = None
+_index_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_index():
+    """This process's index, rebuilt if restaurant locations changed since it was built."""
+    global _index, _index_locations, _index_version, _checked_at
+    if _index is not None and time.monotonic() - _checked_at < INDEX_RECHECK_SECONDS:
+        return _index
+    with _lock:
+        if _index is None or time.monotonic() - _checked_at >= INDEX_RECHECK_SECONDS:
+            version, _ = page_cache.catalog_version()
+            if _index is None or version != _index_version:
+                # Most version bumps (ratings, menus, opening hours) leave the locations
+                # alone; only a real move pays for the rebuild
+                locations = _locations(db.session)
+                if _index is None or locations != _index_locations:
+                    _index, _index_locations = build_index(locations=locations), locations
+                _index_version = version
+            _checked_at = time.monotonic()
+    return _index
+
+
+def invalidate_index():
+    """Make the next get_index() call in this process check for changes."""
+    global _checked_at
+    _checked_at = 0.0
+
+
+def restaurants_delivering_to(plz):
+    """Ids of the restaurants delivering to plz, or None if the postal code is unknown."""
+    ids = get_index().delivering_to(plz)
+    return None if ids is None else ids.tolist()
+
+
+# ============================ 🔔 INVALIDATION ============================ #
+@event.listens_for(Session, "before_flush")
+def _track_location_changes(session, flush_context, instances):
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Restaurant):
+            session.info["delivery_area_dirty"] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, Restaurant):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in LOCATION_FIELDS):
+                session.info["delivery_area_dirty"] = True
+                return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("delivery_area_dirty", False):
+        invalidate_index()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("delivery_area_dirty", None)
+
+
+# ============================ 🧭 CLI ============================ #
+def locate_restaurants(session=None, centroids=None, geocoder=None):
+    """Place restaurants without coordinates at their geocoded address, or failing that
+    at their owner's PLZ centroid; returns how many were placed."""
+    import geocoding
+    session = session or db.session
+    centroids = centroids if centroids is not None else load_centroids()
+    geocoder = geocoder or geocoding.get_geocoder()
+    located = 0
+    restaurants = session.execute(
+        select(Restaurant, User.plz)
+        .join(User, User.id == Restaurant.user_id)
+        .where(Restaurant.latitude.is_(None))
+    ).all()
+    addresses = {
+        restaurant.id: geocoding.full_address(restaurant.address, plz, restaurant.city)
+        for restaurant, plz in restaurants
+    }
+    locations = geocoder.geocode_many(addresses.values(), session.connection())
+    for restaurant, plz in restaurants:
+        location = locations.get(addresses[restaurant.id])
+        point = (location.latitude, location.longitude) if location else centroids.get(str(plz).strip())
+        if point:
+            restaurant.latitude, restaurant.longitude = point
+            located += 1
+    return located
+
+
+def main(argv):
+    if not argv or argv[0] not in ("locate", "lookup") or (argv[0] == "lookup" and len(argv) != 2):
+        print(__doc__.split("Usage:")[1].rstrip())
+        return 1
+
+    from app import app
+    with app.app_context():
+        if argv[0] == "locate":
+            located = locate_restaurants()
+            db.session.commit()
+            print(f"✅ Located {located} restaurants from their addresses and postal codes")
+            return 0
+
+        started = time.perf_counter()
+        index = get_index()
+        built = time.perf_counter()
+        ids = index.delivering_to(argv[1])
+        answered = time.perf_counter()
+        print(f"🗺️  Index of {len(index)} restaurants built in {(built - started) * 1000:.1f}ms")
+        if ids is None:
+            print(f"❌ No centroid for postal code {argv[1]}")
+            return 1
+        print(f"✅ {len(ids)} restaurants deliver to {argv[1]} (answered in {(answered - built) * 1e6:.0f}µs)")
+        for restaurant in db.session.execute(select(Restaurant).where(Restaurant.id.in_(ids.tolist()))).scalars():
+            print(f"   {restaurant.id}: {restaurant.name} ({restaurant.city})")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
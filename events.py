@@ -0,0 +1,273 @@
+"""Server-pushed cart and order updates.
+
+A small pub/sub broker fans events out to Server-Sent Events streams.
+Channels are "user:<id>" (cart count, the customer's own orders) and
+"restaurant:<id>" (incoming orders and their status changes). Cart counts
+and order events are published from session hooks once the change
+commits, so whatever code edits a cart or an order never has to.
+
+Only pages that show something live open /events: the restaurant
+dashboard, the order history and the menu page. Each open stream holds
+a request for as long as the tab stays open, so streaming needs:
+
+  - threaded or async workers; gunicorn.conf.py runs gthread workers
+    (GUNICORN_THREADS threads each, 32 by default)
+  - EVENTS_REDIS_URL with more than one worker or instance. Publishes
+    then go through Redis, and one listener thread per process relays
+    them to the local subscribers. The in-process broker only reaches
+    streams in the process that published.
+
+Serverless functions (Vercel) meet neither: a stream would hold an
+invocation until its timeout and never see publishes from other
+invocations. EVENTS_STREAMING is therefore off by default on Vercel.
+/events then answers 204 and pages fall back to polling the cart count
+every 30 seconds. Set EVENTS_STREAMING=1 or 0 to override.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from models import Order, OrderHasItems, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+RECONNECT_MS = 5000
+
+def streaming_enabled():
+    """Whether /events should stream here (EVENTS_STREAMING, off by default on Vercel)."""
+    default = "0" if os.environ.get("VERCEL") else "1"
+    return os.environ.get("EVENTS_STREAMING", default).lower() in ("1", "true", "yes")
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def restaurant_channel(restaurant_id):
+    return f"restaurant:{restaurant_id}"
+
+
+# ============================ 📡 BROKERS ============================ #
+class Subscription:
+    """One listener's mailbox. Messages are (event, data) tuples."""
+
+    def __init__(self, broker, channels, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.queue = queue.Queue(maxsize)
+
+    def get(self, timeout=None):
+        """Next message, or None if nothing arrived within timeout."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fans events out to subscribers in this process."""
+    name = "memory"
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, event_name, data):
+        self._deliver(channel, event_name, data)
+
+    def _deliver(self, channel, event_name, data):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait((event_name, data))
+            except queue.Full:
+                # A stalled client must not block publishers; it just misses the event
+                logger.warning(f"Dropping {event_name} for slow subscriber on {channel}")
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subscribers in self._channels.values() for s in subscribers})
+
+
+class RedisBroker(InProcessBroker):
+    """Publishes through Redis; a single listener thread per process relays
+    messages to the local subscribers."""
+    name = "redis"
+
+    def __init__(self, client, prefix="lieferspatz:events:"):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self._listener = None
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def subscribe(self, channels):
+        self._ensure_listener()
+        return super().subscribe(channels)
+
+    def publish(self, channel, event_name, data):
+        self.client.publish(self.prefix + channel, json.dumps({"event": event_name, "data": data}))
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + "*")
+        for message in pubsub.listen():
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode("utf-8")
+            payload = json.loads(message["data"])
+            self._deliver(channel[len(self.prefix):], payload["event"], payload["data"])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker, created on first use."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                redis_url = os.environ.get("EVENTS_REDIS_URL")
+                _broker = RedisBroker.from_url(redis_url) if redis_url else InProcessBroker()
+    return _broker
+
+
+def set_broker(broker):
+    global _broker
+    _broker = broker
+
+
+# ============================ 🌊 SSE STREAM ============================ #
+def event_stream(subscription, heartbeat=HEARTBEAT_SECONDS):
+    """Yield Server-Sent Events for a subscription until the client goes away."""
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        while True:
+            message = subscription.get(timeout=heartbeat)
+            if message is None:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            event_name, data = message
+            yield f"event: {event_name}\ndata: {json.dumps(data)}\n\n"
+    finally:
+        subscription.close()
+
+
+# ============================ 📣 PUBLISHERS ============================ #
+def publish_cart_count(user_id, count):
+    """Tell a user's open tabs their cart now holds count items."""
+    get_broker().publish(user_channel(user_id), "cart_count", {"count": count})
+
+
+def publish_order_status(order_id, user_id, restaurant_id, status, event_name="order_status"):
+    data = {"order_id": order_id, "status": status}
+    broker = get_broker()
+    broker.publish(user_channel(user_id), event_name, data)
+    broker.publish(restaurant_channel(restaurant_id), event_name, data)
+
+
+def queue_order_event(session, order_id, user_id, restaurant_id, status, event_name="order_status"):
+    """Publish an order event once session's transaction commits (dropped on rollback)."""
+    session.info.setdefault("order_events", []).append((order_id, user_id, restaurant_id, status, event_name))
+
+
+def queue_cart_counts(session, user_ids):
+    """Count the users' carts now and publish the counts once session's transaction commits."""
+    counts = dict(session.connection().execute(
+        select(Order.user_id, func.sum(OrderHasItems.quantity))
+        .join(OrderHasItems, OrderHasItems.order_id == Order.id)
+        .where(Order.user_id.in_(user_ids), Order.order_status == OrderStatus.SHOPPING.value)
+        .group_by(Order.user_id)
+    ).all())
+    # Later flushes overwrite earlier ones, so only the committed count is published
+    cart_counts = session.info.setdefault("cart_counts", {})
+    for user_id in user_ids:
+        cart_counts[user_id] = int(counts.get(user_id) or 0)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_order_events(session, flush_context):
+    # Carts are private to the customer; restaurants hear about an order once it is placed
+    for obj in session.new:
+        if isinstance(obj, Order) and obj.order_status != OrderStatus.SHOPPING:
+            queue_order_event(session, obj.id, obj.user_id, obj.restaurant_id, obj.order_status, "order_created")
+    for obj in session.dirty:
+        if isinstance(obj, Order):
+            history = inspect(obj).attrs.order_status.history
+            if history.has_changes() and obj.order_status != OrderStatus.SHOPPING:
+                placed = OrderStatus.SHOPPING in history.deleted
+                queue_order_event(session, obj.id, obj.user_id, obj.restaurant_id, obj.order_status,
+                                  "order_created" if placed else "order_status")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_cart_counts(session, flush_context):
+    # A cart is the user's shopping order: it changes with its items, on checkout and when dropped
+    order_ids, user_ids = set(), set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, OrderHasItems):
+            order_ids.update(inspect(obj).attrs.order_id.history.sum() or [obj.order_id])
+        elif isinstance(obj, Order):
+            history = inspect(obj).attrs.order_status.history
+            if OrderStatus.SHOPPING in history.sum() and (history.has_changes() or obj in session.deleted):
+                user_ids.add(obj.user_id)
+    order_ids.discard(None)
+    if order_ids:
+        user_ids.update(session.connection().execute(
+            select(Order.user_id).where(Order.id.in_(order_ids), Order.order_status == OrderStatus.SHOPPING.value)
+        ).scalars())
+    if user_ids:
+        queue_cart_counts(session, user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_order_events(session):
+    for order_id, user_id, restaurant_id, status, event_name in session.info.pop("order_events", []):
+        publish_order_status(order_id, user_id, restaurant_id, status, event_name)
+    for user_id, count in session.info.pop("cart_counts", {}).items():
+        publish_cart_count(user_id, count)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_order_events(session):
+    session.info.pop("order_events", None)
+    session.info.pop("cart_counts", None)
@@ -0,0 +1,208 @@
+"""Check that the hot query paths use indexes.
+
+Usage: python explain_audit.py [--database-url URL] [--keep]
+
+Seeds an empty scratch database with datagen (a temporary SQLite file
+unless --database-url names e.g. a throwaway Postgres database), runs
+each scenario below, and EXPLAINs every SELECT it issued. A plan that
+reads a whole table without an index fails the audit, unless the
+scenario lists that table in allow_scans. Exits with status 1 on any
+failure.
+
+On SQLite a full scan is a "SCAN <table>" step, or a "SCAN <table> USING
+INDEX" walk of a whole index in a statement without LIMIT. On Postgres
+the audit disables sequential scans for its session, so a "Seq Scan" (or
+an Index Scan without an index condition) only shows up where no usable
+index exists, however small the seeded tables are.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from sqlalchemy import event, select
+
+AUDIT_SIZES = {"restaurants": 200, "customers": 500, "orders": 5000, "items_per_restaurant": 10}
+
+
+class StatementCapture:
+    """Collects the SELECT statements an engine runs while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = {}
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.setdefault(statement, parameters)
+
+    def __enter__(self):
+        self.statements = {}
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+# ============================ 🔍 PLAN READERS ============================ #
+def full_scans_sqlite(connection, statement, parameters):
+    """(tables read in full, tables whose whole index is walked, plan lines)."""
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    plan = [row[-1] for row in rows]
+    scans, walks = [], []
+    for step in plan:
+        words = step.split()
+        # "SCAN order" reads the table; "SCAN order USING INDEX ix" reads all of ix instead
+        if words[0] == "SCAN" and len(words) == 2:
+            scans.append(words[1])
+        elif words[0] == "SCAN" and "INDEX" in words and not {"COVERING", "VIRTUAL"} & set(words):
+            walks.append(words[1])
+    return scans, walks, plan
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def full_scans_postgresql(connection, statement, parameters):
+    raw = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    root = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    nodes = list(_walk(root))
+    scans = [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"]
+    walks = [node["Relation Name"] for node in nodes if node["Node Type"] == "Index Scan" and "Index Cond" not in node]
+    return scans, walks, [f"{node['Node Type']} {node.get('Relation Name', '')}".strip() for node in nodes]
+
+
+# ============================ 🎬 SCENARIOS ============================ #
+def _scenarios():
+    """(name, callable, tables allowed to be scanned) for each hot path."""
+    import dashboard
+    import delivery_area
+    import identity
+    import listings
+    import order_archive
+    import page_cache
+    import search as search_index
+    from cache import get_cache
+    from models import db, Restaurant, User
+
+    def first(model, *where):
+        return db.session.execute(select(model).where(*where).limit(1)).scalar_one()
+
+    restaurant = first(Restaurant)
+    customer = first(User, User.user_type == "customer")
+
+    def open_listing():
+        get_cache().clear()
+        listings.get_open_restaurants()
+        listings.get_cities()
+
+    # Requests read the per-process delivery-area index; building it is audited on its own
+    delivery_area.get_index()
+
+    return [
+        ("home listing", open_listing, set()),
+        ("browse by city", lambda: listings.browse_restaurants(city=restaurant.city), set()),
+        ("browse by PLZ", lambda: listings.browse_restaurants(plz=customer.plz), set()),
+        ("search", lambda: search_index.search(restaurant.name.split()[0]), set()),
+        ("user loader", lambda: identity._load_detached(customer.id), set()),
+        ("restaurant dashboard", lambda: dashboard.get_dashboard_context(restaurant), set()),
+        ("order history", lambda: order_archive.order_history_page(customer.id, limit=5), set()),
+        # The admin page counts every user and restaurant and totals the whole
+        # rollup (one row per restaurant and day, not per order) by design
+        ("admin dashboard", lambda: dashboard.get_admin_dashboard_context(None),
+         {"user", "restaurant", "restaurant_daily_stats"}),
+        # Reads every located restaurant once per process, by design
+        ("delivery area index build", delivery_area.build_index, {"restaurant"}),
+        # An aggregate over every restaurant's version, by design
+        ("search catalog version", page_cache.catalog_version, {"restaurant"}),
+    ]
+
+
+def audit(engine):
+    from models import db
+    reader = full_scans_postgresql if engine.dialect.name == "postgresql" else full_scans_sqlite
+    failures = 0
+    for name, scenario, allow_scans in _scenarios():
+        failed = 0
+        with StatementCapture(engine) as capture:
+            scenario()
+            db.session.rollback()
+        with engine.connect() as connection:
+            if engine.dialect.name == "postgresql":
+                connection.exec_driver_sql("SET enable_seqscan = off")
+            for statement, parameters in capture.statements.items():
+                scans, walks, plan = reader(connection, statement, parameters)
+                # Walking a whole index in order is fine when a LIMIT stops it early
+                if " LIMIT " not in statement.upper():
+                    scans += walks
+                bad = [table for table in scans if table.strip('"') not in allow_scans]
+                if bad:
+                    failed += 1
+                    print(f"❌ {name}: full scan of {', '.join(bad)}")
+                    print("    " + " ".join(statement.split())[:300])
+                    for step in plan:
+                        print(f"      {step}")
+            connection.rollback()
+        if not failed:
+            print(f"✅ {name}: {len(capture.statements)} statements use indexes")
+        failures += failed
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries against a seeded database")
+    parser.add_argument("--database-url", help="empty scratch database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary SQLite database")
+    args = parser.parse_args(argv)
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+        url = f"sqlite:///{scratch}"
+
+    from app import create_app
+    from models import db
+    import datagen
+    import order_archive
+    import search as search_index
+    import stats
+
+    config = {"SQLALCHEMY_DATABASE_URI": url}
+    if url.startswith("sqlite"):
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {}
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        search_index.init_search_index()
+        with db.engine.connect() as connection:
+            datagen.generate(connection, **AUDIT_SIZES)
+        stats.rebuild()
+        db.session.commit()
+        # Older seeded orders go to the archive, so history pages read both tiers
+        order_archive.archive_orders()
+        # Fresh statistics, so the planner judges the indexes on realistic data
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        print(f"🌱 Seeded {db.engine.url.render_as_string(hide_password=True)}")
+
+        failures = audit(db.engine)
+
+    if scratch and not args.keep:
+        os.remove(scratch)
+    elif scratch:
+        print(f"💾 Kept {scratch}")
+    if failures:
+        print(f"❌ {failures} queries fall back to full table scans")
+        return 1
+    print("✅ Every audited query uses an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
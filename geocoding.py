@@ -0,0 +1,354 @@
+"""Geocoding with a persistent cache in front of the Google Maps client.
+
+Addresses are cached under a normalized key (case, spacing, punctuation,
+umlauts, "Str." for "Straße" and a trailing country are ignored), so the
+usual spellings of one address share an entry. A lookup tries, in order:
+
+  1. an in-process LRU (cache.TTLCache without expiry)
+  2. the geocode_cache table, shared by every worker and kept across deploys
+  3. the upstream client, only for addresses never seen before
+
+"Not found" answers are cached too, so a bad address costs one upstream
+call rather than one per lookup; upstream errors are not cached.
+Concurrent lookups of the same address in a process are coalesced: the
+first goes upstream and the others wait for its answer. geocode_many()
+is for imports: it reads the table once per chunk of addresses and only
+sends the misses upstream.
+
+Without a connection argument, cache reads and writes use their own
+short transactions, so an answer is kept even if the request that asked
+for it rolls back, and no caller's transaction is held open across an
+upstream call. Imports pass their connection instead, and the answers
+are committed together with their batch.
+
+The Google client is used when GOOGLE_MAPS_API_KEY is set. Otherwise
+FakeGeocodingClient answers offline from the PLZ centroids delivery_area
+uses, so seeding and development never need network access.
+
+Usage:
+    python geocoding.py ADDRESS...     # geocode addresses through the cache
+"""
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from contextlib import contextmanager
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from cache import TTLCache
+from models import db, GeocodeCache
+
+logger = logging.getLogger(__name__)
+
+LRU_SIZE = int(os.environ.get("GEOCODING_LRU_SIZE", 10000))
+CHUNK_SIZE = 500
+KEY_LENGTH = GeocodeCache.__table__.c.key.type.length
+UPSTREAM_TIMEOUT_SECONDS = 5
+
+Location = namedtuple("Location", ["latitude", "longitude", "formatted_address"])
+
+_table = GeocodeCache.__table__
+_MISSING = object()
+
+
+class GeocodingError(Exception):
+    """The upstream geocoder failed; the answer is unknown and was not cached."""
+
+
+# ============================ 🔤 NORMALIZATION ============================ #
+_TRANSLITERATIONS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+_STREET = re.compile(r"(str|strasse)\.?(?=\s|,|$)")
+_COUNTRY = re.compile(r"\s(germany|deutschland|de)$")
+
+
+def normalize_address(address):
+    """Cache key for an address: "Königstr. 5, 47051 Duisburg" -> "koenigstrasse 5 47051 duisburg"."""
+    text = unicodedata.normalize("NFKC", address or "").casefold().translate(_TRANSLITERATIONS)
+    text = _STREET.sub("strasse", text)
+    text = " ".join(re.sub(r"[^\w]+", " ", text).split())
+    text = _COUNTRY.sub("", text)
+    if len(text) > KEY_LENGTH:
+        # Keeps over-long keys unique without widening the column
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        text = f"{text[:KEY_LENGTH - len(digest) - 1]} {digest}"
+    return text
+
+
+def full_address(address, plz=None, city=None):
+    """address with the postal code and city appended unless it already contains them."""
+    key = normalize_address(address)
+    missing = [str(part) for part in (plz, city) if part and normalize_address(str(part)) not in key]
+    if not address:
+        return " ".join(missing)
+    return f"{address}, {' '.join(missing)}" if missing else address
+
+
+# ============================ 🌍 CLIENTS ============================ #
+class GoogleGeocodingClient:
+    """Geocodes through the Google Maps Geocoding API (imported on first use)."""
+
+    def __init__(self, api_key):
+        import googlemaps
+        # The client rate-limits itself and retries over-quota answers
+        self._client = googlemaps.Client(key=api_key, timeout=UPSTREAM_TIMEOUT_SECONDS)
+
+    def geocode(self, address):
+        from googlemaps.exceptions import ApiError, HTTPError, Timeout, TransportError
+        try:
+            results = self._client.geocode(address, region="de")
+        except (ApiError, HTTPError, Timeout, TransportError) as e:
+            raise GeocodingError(f"Geocoding {address!r} failed: {e}") from e
+        if not results:
+            return None
+        location = results[0]["geometry"]["location"]
+        return Location(location["lat"], location["lng"], results[0].get("formatted_address"))
+
+
+class FakeGeocodingClient:
+    """Offline stand-in for GoogleGeocodingClient.
+
+    Places an address near the centroid of the first known postal code
+    in it, or else of the first city it names, offset by up to ~1km
+    derived from the address so streets don't stack on one point.
+    latency simulates the round-trip; calls counts upstream lookups.
+    """
+
+    def __init__(self, centroids_path=None, latency=0.0):
+        import delivery_area
+        rows = list(delivery_area.read_centroids(centroids_path or delivery_area.PLZ_CENTROIDS_PATH))
+        self.by_plz = {plz: (lat, lon) for plz, lat, lon, _ in rows}
+        self.by_city = {}
+        for _, lat, lon, city in rows:
+            if city:
+                self.by_city.setdefault(normalize_address(city), (lat, lon))
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def geocode(self, address):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        key = normalize_address(address)
+        point = next((self.by_plz[plz] for plz in re.findall(r"\b\d{5}\b", key) if plz in self.by_plz), None)
+        if point is None:
+            point = next((point for city, point in self.by_city.items() if re.search(rf"\b{city}\b", key)), None)
+        if point is None:
+            return None
+        digest = hashlib.sha1(key.encode()).digest()
+        lat = point[0] + (digest[0] / 255 - 0.5) * 0.018
+        lon = point[1] + (digest[1] / 255 - 0.5) * 0.028
+        return Location(round(lat, 6), round(lon, 6), address)
+
+
+# ============================ 🧭 GEOCODER ============================ #
+@contextmanager
+def _transaction(connection):
+    # The caller's connection as is, or a short transaction of our own
+    if connection is not None:
+        yield connection
+    else:
+        with db.engine.begin() as own:
+            yield own
+
+
+class _Call:
+    """One upstream lookup that other threads may be waiting on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class Geocoder:
+    """Cached, coalescing geocoder in front of a client with geocode(address) -> Location or None."""
+
+    def __init__(self, client, lru_size=LRU_SIZE):
+        self.client = client
+        self.lru = TTLCache(maxsize=lru_size, default_ttl=0)
+        self.upstream_calls = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def geocode(self, address, connection=None):
+        """Location of address, or None if it can't be found; raises GeocodingError if upstream fails."""
+        key = normalize_address(address)
+        if not key:
+            return None
+        found = self.lru.get(key, _MISSING)
+        if found is not _MISSING:
+            return found
+        return self._once(key, lambda: self._load(connection, key, address))
+
+    def geocode_many(self, addresses, connection=None):
+        """{address: Location or None} for every address.
+
+        Addresses whose upstream lookup failed are left out, so an import
+        can carry on and pick them up on its next run.
+        """
+        keys = {address: normalize_address(address) for address in addresses}
+        answers = {}
+        for key in set(keys.values()):
+            found = self.lru.get(key, _MISSING) if key else None
+            if found is not _MISSING:
+                answers[key] = found
+
+        missing = [key for key in dict.fromkeys(keys.values()) if key not in answers]
+        for start in range(0, len(missing), CHUNK_SIZE):
+            for key, location in self._read(connection, missing[start:start + CHUNK_SIZE]).items():
+                self.lru.set(key, location)
+                answers[key] = location
+
+        spellings = {key: address for address, key in keys.items() if key not in answers}
+        for key, address in spellings.items():
+            try:
+                answers[key] = self._once(key, lambda: self._fetch_and_store(connection, key, address))
+            except GeocodingError as e:
+                logger.warning(f"{e}; skipping it until the next run")
+        return {address: answers[key] for address, key in keys.items() if key in answers}
+
+    def forget(self, address, connection=None):
+        """Drop the cached answer for address, so the next lookup asks upstream again."""
+        key = normalize_address(address)
+        self.lru.delete(key)
+        with _transaction(connection) as connection:
+            connection.execute(_table.delete().where(_table.c.key == key))
+
+    def _once(self, key, load):
+        # Whoever registers key first runs load(); everyone else waits for its answer
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+        if not leader:
+            return call.wait()
+        try:
+            call.result = load()
+            self.lru.set(key, call.result)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def _load(self, connection, key, address):
+        found = self._read(connection, [key])
+        if key in found:
+            return found[key]
+        return self._fetch_and_store(connection, key, address)
+
+    def _fetch_and_store(self, connection, key, address):
+        with self._lock:
+            self.upstream_calls += 1
+        location = self.client.geocode(address)
+        self._store(connection, key, address, location)
+        return location
+
+    @staticmethod
+    def _read(connection, keys):
+        with _transaction(connection) as connection:
+            rows = connection.execute(select(_table).where(_table.c.key.in_(keys))).all()
+        return {
+            row.key: Location(row.latitude, row.longitude, row.formatted_address)
+            if row.latitude is not None else None
+            for row in rows
+        }
+
+    @staticmethod
+    def _store(connection, key, address, location):
+        formatted = location.formatted_address if location else None
+        values = {
+            "key": key,
+            "address": address[:_table.c.address.type.length],
+            "latitude": location.latitude if location else None,
+            "longitude": location.longitude if location else None,
+            "formatted_address": formatted[:_table.c.formatted_address.type.length] if formatted else None,
+        }
+        with _transaction(connection) as connection:
+            dialect = connection.dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                # Another worker may have stored the same address meanwhile; either answer will do
+                insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(_table).values(**values)
+                connection.execute(insert.on_conflict_do_nothing(index_elements=["key"]))
+            elif not connection.execute(select(_table.c.key).where(_table.c.key == key)).first():
+                connection.execute(_table.insert().values(**values))
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder():
+    """Return the process-wide geocoder, creating it on first use."""
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                api_key = os.environ.get("GOOGLE_MAPS_API_KEY")
+                _geocoder = Geocoder(GoogleGeocodingClient(api_key) if api_key else FakeGeocodingClient())
+    return _geocoder
+
+
+def set_geocoder(geocoder):
+    """Replace the process-wide geocoder (e.g. with a FakeGeocodingClient one in benchmarks)."""
+    global _geocoder
+    _geocoder = geocoder
+
+
+def geocode(address, connection=None):
+    """Location of address through the process-wide geocoder, or None if not found."""
+    return get_geocoder().geocode(address, connection)
+
+
+def geocode_many(addresses, connection=None):
+    """{address: Location or None} through the process-wide geocoder."""
+    return get_geocoder().geocode_many(addresses, connection)
+
+
+def main(argv):
+    if not argv:
+        print(__doc__.split("Usage:")[1].rstrip())
+        return 1
+
+    from app import app
+    with app.app_context():
+        geocoder = get_geocoder()
+        print(f"🧭 Geocoding with {type(geocoder.client).__name__}")
+        try:
+            answers = geocoder.geocode_many(argv)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return 1
+        for address in argv:
+            location = answers.get(address, _MISSING)
+            if location is _MISSING:
+                print(f"⚠️ {address}: lookup failed")
+            elif location is None:
+                print(f"❌ {address}: not found")
+            else:
+                print(f"✅ {address}: {location.latitude:.5f}, {location.longitude:.5f}")
+        print(f"📈 {geocoder.upstream_calls} upstream calls for {len(argv)} addresses")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,15 @@
+"""gunicorn settings (read automatically when gunicorn starts in this directory).
+
+Each open /events stream holds a request for as long as its tab is open,
+so workers are threaded: one sync worker would serve a single tab at a
+time. With more than one worker, set EVENTS_REDIS_URL so events published
+in one worker reach streams held by the others (see events.py).
+"""
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+# Streams send a keepalive every HEARTBEAT_SECONDS, well inside this
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
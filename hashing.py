@@ -0,0 +1,144 @@
+"""Password hashing off the request threads.
+
+bcrypt is deliberately slow, so a burst of logins hashing inline ties up
+every worker. Hashes are instead computed in a small process pool
+(HASH_WORKERS processes). Request threads wait on the result, but the CPU
+work is bounded to the pool, so the rest of the app keeps its cores.
+
+HASH_EXECUTOR picks the strategy: "process" (default), "thread", or
+"inline" (no pool, e.g. on serverless platforms without multiprocessing).
+If the process pool cannot start, hashing falls back to inline. A pool
+whose worker died (BrokenProcessPool) is replaced and the hash that hit
+it is computed inline; after MAX_POOL_RESTARTS breaks hashing stays
+inline for the life of the process.
+
+BCRYPT_LOG_ROUNDS sets the cost for new hashes. Hashes made with another
+cost still verify, and check_password() callers can upgrade them through
+needs_rehash() on the next successful login.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+HASH_EXECUTOR = os.environ.get("HASH_EXECUTOR", "process")
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", 30))
+MAX_POOL_RESTARTS = 3
+
+# bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating
+MAX_PASSWORD_BYTES = 72
+
+
+# ============================ 🔐 WORKER FUNCTIONS ============================ #
+# Module-level so the process pool can pickle them
+def _hash(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(password.encode("utf-8")[:MAX_PASSWORD_BYTES], bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(password, password_hash):
+    import bcrypt
+    try:
+        return bcrypt.checkpw(password.encode("utf-8")[:MAX_PASSWORD_BYTES], password_hash.encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+# ============================ 🧵 EXECUTOR ============================ #
+_executor = None
+_executor_lock = threading.Lock()
+_pool_restarts = 0
+
+
+def _make_executor():
+    if HASH_EXECUTOR == "inline":
+        return None
+    if HASH_EXECUTOR == "thread":
+        return ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash")
+    try:
+        # spawn, not fork: forking a threaded web worker can copy held locks into the child
+        return ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    except (OSError, NotImplementedError) as e:
+        logger.warning(f"Process pool unavailable ({e}); hashing passwords inline")
+        return None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = _make_executor() or False
+    return _executor or None
+
+
+def _discard_broken(executor, error):
+    global _executor, _pool_restarts
+    with _executor_lock:
+        if _executor is not executor:
+            # Another thread already replaced it
+            return
+        _pool_restarts += 1
+        if _pool_restarts > MAX_POOL_RESTARTS:
+            logger.error(f"Hash pool broke {_pool_restarts} times ({error}); hashing passwords inline from now on")
+            _executor = False
+        else:
+            logger.warning(f"Hash pool broke ({error}); starting a new one")
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(function, *args):
+    executor = _get_executor()
+    if executor is None:
+        return function(*args)
+    try:
+        return executor.submit(function, *args).result(timeout=HASH_TIMEOUT)
+    except BrokenExecutor as e:
+        # A worker died (e.g. a spawned child failed to import its parent's main module)
+        _discard_broken(executor, e)
+    except RuntimeError:
+        # submit() raced with another thread shutting the broken pool down
+        if executor is _get_executor():
+            raise
+    return function(*args)
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor:
+            _executor.shutdown(wait=True)
+        _executor = None
+
+
+# ============================ 🔑 API ============================ #
+def hash_password(password, rounds=None):
+    """bcrypt hash of password at the configured cost."""
+    if not password:
+        raise ValueError("Password must be non-empty.")
+    return _run(_hash, password, rounds or BCRYPT_LOG_ROUNDS)
+
+
+def check_password(password, password_hash):
+    if not password or not password_hash:
+        return False
+    return _run(_check, password, password_hash)
+
+
+def hash_rounds(password_hash):
+    """The cost factor a bcrypt hash was made with ("$2b$12$..." -> 12)."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash, rounds=None):
+    return hash_rounds(password_hash) != (rounds or BCRYPT_LOG_ROUNDS)
@@ -0,0 +1,136 @@
+"""Cached user loading for Flask-Login.
+
+load_user() looks a user up in three places:
+
+1. flask.g, so repeated lookups within one request are free;
+2. a short-lived in-process TTLCache (IDENTITY_CACHE_TTL seconds) shared
+   across requests; the cached object is detached and copied into the
+   request's session with merge(load=False), which issues no SQL;
+3. the database, loading the user and its restaurant/customer/admin
+   record in a single joined query.
+
+Cached identities are dropped after any commit that changes a User or its
+role record (profile edits, password changes), after ledger balance
+moves and after ratings change a restaurant's aggregates. Each worker
+has its own cache, so another worker may serve a stale identity for at
+most the TTL.
+"""
+import os
+from flask import g, has_request_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, joinedload
+
+from cache import TTLCache
+from models import db, Admin, Customer, Rating, Restaurant, User
+
+IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", 30))
+IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", 10000))
+
+ROLE_MODELS = {"restaurant": Restaurant, "customer": Customer, "admin": Admin}
+
+_cache = TTLCache(maxsize=IDENTITY_CACHE_SIZE, default_ttl=IDENTITY_CACHE_TTL)
+# "role:role id" -> user id, so a balance change on a restaurant finds its owner's entry.
+# Bounded like _cache: once an identity has aged out there is nothing left to invalidate.
+_role_owners = TTLCache(maxsize=IDENTITY_CACHE_SIZE, default_ttl=IDENTITY_CACHE_TTL)
+
+
+def _key(user_id):
+    return f"identity:{user_id}"
+
+
+def _role_key(role, role_id):
+    return f"{role}:{role_id}"
+
+
+def _load_detached(user_id):
+    """The user with every role record eagerly loaded, detached from any session."""
+    with Session(db.engine) as session:
+        user = session.execute(
+            select(User)
+            .where(User.id == user_id)
+            .options(joinedload(User.restaurant), joinedload(User.customer), joinedload(User.admin))
+        ).unique().scalar_one_or_none()
+        session.expunge_all()
+    return user
+
+
+def load_user(user_id):
+    """Flask-Login user_loader: the user bound to the current session, or None."""
+    per_request = g.setdefault("_identities", {}) if has_request_context() else {}
+    if user_id in per_request:
+        return per_request[user_id]
+
+    cached = _cache.get(_key(user_id))
+    if cached is None:
+        cached = _load_detached(user_id)
+        if cached is None:
+            return None
+        _cache.set(_key(user_id), cached)
+        for role in ROLE_MODELS:
+            for record in getattr(cached, role):
+                _role_owners.set(_role_key(role, record.id), user_id)
+
+    # Copy into this request's session without a round-trip; the cached instance stays untouched
+    user = db.session.merge(cached, load=False)
+    per_request[user_id] = user
+    return user
+
+
+def restaurant_of(user):
+    """The user's Restaurant (the backref is a list), already loaded by load_user()."""
+    return user.restaurant[0] if user.restaurant else None
+
+
+def invalidate(user_id):
+    _cache.delete(_key(user_id))
+
+
+def invalidate_account(account_type, account_id):
+    """Drop the identity holding a ledger account (see ledger.ACCOUNTS)."""
+    if account_type == "user":
+        invalidate(account_id)
+    else:
+        key = _role_key(account_type, account_id)
+        owner = _role_owners.get(key)
+        if owner is not None:
+            _role_owners.delete(key)
+            invalidate(owner)
+
+
+def clear():
+    _cache.clear()
+    _role_owners.clear()
+
+
+def mark_dirty(session, account_type, account_id=None):
+    """Invalidate an account's identity once the session commits; None means every account of that type."""
+    session.info.setdefault("identity_dirty", set()).add((account_type, account_id))
+
+
+# ============================ 🔄 INVALIDATION ============================ #
+@event.listens_for(Session, "before_flush")
+def _collect_changed_identities(session, flush_context, instances):
+    role_models = tuple(ROLE_MODELS.values())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            mark_dirty(session, "user", obj.id)
+        elif isinstance(obj, role_models):
+            mark_dirty(session, "user", obj.user_id)
+    # Ratings update the restaurant's aggregates behind the ORM's back
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Rating):
+            mark_dirty(session, "restaurant", obj.restaurant_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_identities(session):
+    for account_type, account_id in session.info.pop("identity_dirty", ()):
+        if account_id is None:
+            clear()
+            return
+        invalidate_account(account_type, account_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_identity_changes(session):
+    session.info.pop("identity_dirty", None)
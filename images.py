@@ -0,0 +1,148 @@
+"""Responsive image variants.
+
+Uploads are re-encoded as AVIF and WebP at a few widths (AVIF needs
+Pillow 11.2 or later, as pinned; older installs produce WebP only),
+stored under content-hash file names:
+
+    /static/uploads/<hash>_640.jpg      original (downscaled to MAX_WIDTH),
+                                        suffixed with its widest variant
+    /static/uploads/<hash>-320.webp     variants, never wider than the original
+
+Bundled images under static/images get the same treatment from
+build_images.py, which records them in a manifest. Cloudinary images are
+resized on Cloudinary's side through URL transformations.
+
+Templates call image_sources(url) to get <source> entries for a <picture>.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+
+VARIANT_WIDTHS = (320, 640, 1024)
+MAX_WIDTH = 2048
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+HASH_LENGTH = 16
+
+STATIC_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "images", "variants", "manifest.json")
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+_HASHED_UPLOAD_RE = re.compile(r"^(?P<base>/static/uploads/[0-9a-f]{%d})_(?P<max_width>\d+)\.\w+$" % HASH_LENGTH)
+_CLOUDINARY_RE = re.compile(r"^(?P<prefix>https://res\.cloudinary\.com/[^/]+/image/upload/)(?P<rest>.+)$")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def variant_formats():
+    """Output formats the installed Pillow can encode, best first."""
+    from PIL import features
+    formats = ["webp"]
+    # Pillow before 11.2 has no AVIF module and warns about unknown features
+    if "avif" in features.modules and features.check_module("avif"):
+        formats.insert(0, "avif")
+    return formats
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "avif":
+        image.save(buffer, "AVIF", quality=AVIF_QUALITY)
+    elif fmt == "webp":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(buffer, fmt.upper())
+    return buffer.getvalue()
+
+
+def process_image(data, filename):
+    """Downscale an upload and render its responsive variants.
+
+    Returns a list of (file name, bytes) with the original first. Images
+    Pillow cannot read are returned unchanged under a hashed name.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    digest = content_hash(data)
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else "bin"
+    try:
+        image = Image.open(io.BytesIO(data))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError):
+        return [(f"{digest}.{extension}", data)]
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    original = data
+    if image.width > MAX_WIDTH:
+        image.thumbnail((MAX_WIDTH, MAX_WIDTH * image.height // image.width))
+        save_format = "JPEG" if extension in ("jpg", "jpeg") else extension.upper()
+        original = _encode(image.convert("RGB") if save_format == "JPEG" else image, save_format)
+
+    variants = []
+    widths = [width for width in VARIANT_WIDTHS if width <= image.width]
+    for width in widths:
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        for fmt in variant_formats():
+            variants.append((f"{digest}-{width}.{fmt}", _encode(resized, fmt)))
+
+    original_name = f"{digest}_{widths[-1]}.{extension}" if widths else f"{digest}.{extension}"
+    return [(original_name, original)] + variants
+
+
+# ============================ 🖼️ TEMPLATE HELPER ============================ #
+_static_manifest = None
+
+
+def _load_static_manifest():
+    global _static_manifest
+    if _static_manifest is None:
+        try:
+            with open(STATIC_MANIFEST) as f:
+                _static_manifest = json.load(f)
+        except (OSError, ValueError):
+            _static_manifest = {}
+    return _static_manifest
+
+
+def _srcset(urls_by_width):
+    return ", ".join(f"{url} {width}w" for width, url in urls_by_width)
+
+
+def image_sources(url):
+    """<source> entries ({"type", "srcset"}) for a <picture> around url.
+
+    Returns an empty list for images without variants, in which case the
+    plain <img> fallback is all the browser gets.
+    """
+    if not url:
+        return []
+
+    static_entry = _load_static_manifest().get(url)
+    if static_entry:
+        return [
+            {"type": MIME_TYPES[fmt], "srcset": _srcset((w, f"{static_entry['base']}-{w}.{fmt}") for w in static_entry["widths"])}
+            for fmt in static_entry["formats"]
+        ]
+
+    match = _HASHED_UPLOAD_RE.match(url)
+    if match:
+        widths = [w for w in VARIANT_WIDTHS if w <= int(match["max_width"])]
+        return [
+            {"type": MIME_TYPES[fmt], "srcset": _srcset((w, f"{match['base']}-{w}.{fmt}") for w in widths)}
+            for fmt in variant_formats()
+        ]
+
+    match = _CLOUDINARY_RE.match(url)
+    if match:
+        # f_auto lets Cloudinary pick AVIF/WebP per browser, so one source is enough
+        return [{
+            "type": None,
+            "srcset": _srcset((w, f"{match['prefix']}f_auto,q_auto,c_limit,w_{w}/{match['rest']}") for w in VARIANT_WIDTHS),
+        }]
+    return []
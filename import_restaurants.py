@@ -1,43 +1,12 @@
-import sqlite3
-import json
+"""Import static/data/restaurant.json into the restaurant table.
 
-# Ensure correct file path
-json_path = "static/data/restaurant.json"
-
-try:
-    # Load JSON data
-    with open(json_path, "r") as file:
-        restaurants = json.load(file)
-
-    # Connect to SQLite database
-    conn = sqlite3.connect("database.db")
-    cursor = conn.cursor()
-
-    # Clear existing data
-    cursor.execute("DELETE FROM restaurants")
+Thin wrapper around `python datagen.py import restaurants <file>`, which
+streams CSV/JSON input and inserts in batches.
+"""
+import sys
+from datagen import main
 
-    # Insert new data with safe handling
-    for restaurant in restaurants:
-        name = restaurant.get("name", "Unknown")  # Default to "Unknown" if missing
-        image = restaurant.get("image", "/static/default.png")  # Use a default image
-        rating = restaurant.get("rating", 0.0)  # Default to 0.0 if missing
-        reviews = restaurant.get("reviews", 0)  # Default to 0 if missing
-        delivery_time = restaurant.get("delivery_time", "N/A")  # Default to "N/A" if missing
-
-        cursor.execute(
-            "INSERT INTO restaurants (name, image, rating, reviews, delivery_time) VALUES (?, ?, ?, ?, ?)",
-            (name, image, rating, reviews, delivery_time),
-        )
-
-    # Commit and close
-    conn.commit()
-    conn.close()
-
-    print("✅ Data successfully inserted into database.db!")
+json_path = "static/data/restaurant.json"
 
-except FileNotFoundError:
-    print(f"❌ ERROR: The JSON file {json_path} was not found.")
-except json.JSONDecodeError:
-    print(f"❌ ERROR: JSON file {json_path} is not properly formatted.")
-except Exception as e:
-    print(f"❌ ERROR: {e}")
+if __name__ == "__main__":
+    sys.exit(main(["import", "restaurants", json_path] + sys.argv[1:]))
@@ -1,5 +1,7 @@
-from app import app
+from app import create_app
+
+app = create_app()
 
 # This is the correct handler for Vercel
 def handler(request):
-    return app(request) 
\ No newline at end of file
+    return app(request)
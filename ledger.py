@@ -0,0 +1,182 @@
+"""Balance movements for checkout, cashback and credits.
+
+Every change to User.balance, Restaurant.balance or Admin.total_earnings
+goes through here as a single `UPDATE ... SET balance = balance + :delta`,
+so concurrent checkouts never read-modify-write the same row in Python
+and no row locks are held across a request. Each movement also appends
+LedgerEntry rows, which makes every balance auditable.
+
+Nothing here commits: the caller's transaction either applies all legs
+of a transfer or none of them. The UPDATEs bypass the ORM, so refresh any
+User/Restaurant/Admin already loaded in the session before reading its
+balance; cached identities are invalidated when the transaction commits.
+"""
+import uuid
+from sqlalchemy import func, insert, literal, select, update
+from models import db, Admin, LedgerEntry, Order, Restaurant, User
+from money import Money, MoneyType
+import identity
+
+# Column holding each account type's balance
+ACCOUNTS = {
+    "user": User.__table__.c.balance,
+    "restaurant": Restaurant.__table__.c.balance,
+    "admin": Admin.__table__.c.total_earnings,
+}
+
+# Contra account for money entering or leaving the system (credits, payouts),
+# so every transfer's entries sum to zero
+EXTERNAL = ("external", 0)
+
+
+class LedgerError(Exception):
+    """Raised when a transfer cannot be applied."""
+
+
+class InsufficientFunds(LedgerError):
+    """Raised when a debit would take a balance below zero."""
+
+
+def _apply(connection, account_type, account_id, delta, allow_negative):
+    column = ACCOUNTS[account_type]
+    table = column.table
+    balance = func.coalesce(column, 0.0)
+    statement = update(table).where(table.c.id == account_id).values({column.name: balance + delta})
+    if delta < 0 and not allow_negative:
+        # The balance check rides on the UPDATE itself, so there is no window between check and write
+        statement = statement.where(balance >= -delta)
+    if connection.execute(statement).rowcount != 1:
+        exists = connection.execute(select(table.c.id).where(table.c.id == account_id)).first()
+        if exists is None:
+            raise LedgerError(f"No {account_type} account {account_id}")
+        raise InsufficientFunds(f"{account_type} {account_id} cannot cover {-delta:.2f}")
+
+
+def _entry(transfer_id, account_type, account_id, amount, reason, order_id=None):
+    return {
+        "transfer_id": transfer_id,
+        "account_type": account_type,
+        "account_id": account_id,
+        "amount": amount,
+        "reason": reason,
+        "order_id": order_id,
+    }
+
+
+def transfer(legs, reason, order_id=None, allow_negative=False, session=None):
+    """Move money between accounts in the current transaction.
+
+    legs is a list of (account_type, account_id, amount); amounts must sum
+    to zero. Debits are refused if they would overdraw an account unless
+    allow_negative is set. Returns the transfer id.
+    """
+    session = session or db.session
+    legs = [(account_type, account_id, Money(amount)) for account_type, account_id, amount in legs]
+    if any(account_type not in ACCOUNTS for account_type, _, _ in legs):
+        raise LedgerError(f"Unknown account type in {legs}")
+    if sum(amount for _, _, amount in legs) != 0:
+        raise LedgerError(f"Transfer legs do not balance: {legs}")
+
+    transfer_id = uuid.uuid4().hex
+    connection = session.connection()
+    # Apply legs in a fixed order so two transfers touching the same rows cannot deadlock
+    for account_type, account_id, amount in sorted(legs):
+        if amount:
+            _apply(connection, account_type, account_id, amount, allow_negative)
+            identity.mark_dirty(session, account_type, account_id)
+    connection.execute(insert(LedgerEntry), [
+        _entry(transfer_id, account_type, account_id, amount, reason, order_id)
+        for account_type, account_id, amount in legs if amount
+    ])
+    return transfer_id
+
+
+def credit(account_type, account_id, amount, reason="credit", session=None):
+    """Add (or with a negative amount, remove) money from outside the system."""
+    session = session or db.session
+    amount = Money(amount)
+    transfer_id = uuid.uuid4().hex
+    connection = session.connection()
+    _apply(connection, account_type, account_id, amount, allow_negative=True)
+    identity.mark_dirty(session, account_type, account_id)
+    connection.execute(insert(LedgerEntry), [
+        _entry(transfer_id, account_type, account_id, amount, reason),
+        _entry(transfer_id, *EXTERNAL, -amount, reason),
+    ])
+    return transfer_id
+
+
+def credit_all(account_type, amount, reason="credit", where=None, session=None):
+    """Credit every account of a type (or those matching where) with one
+    UPDATE and one INSERT ... SELECT."""
+    session = session or db.session
+    amount = Money(amount)
+    column = ACCOUNTS[account_type]
+    table = column.table
+    transfer_id = uuid.uuid4().hex
+    connection = session.connection()
+    statement = update(table).values({column.name: func.coalesce(column, 0.0) + amount})
+    accounts = select(literal(transfer_id), literal(account_type), table.c.id, literal(amount, MoneyType), literal(reason))
+    if where is not None:
+        statement = statement.where(where)
+        accounts = accounts.where(where)
+    updated = connection.execute(statement).rowcount
+    identity.mark_dirty(session, account_type)
+    connection.execute(insert(LedgerEntry).from_select(
+        ["transfer_id", "account_type", "account_id", "amount", "reason"], accounts,
+    ))
+    connection.execute(insert(LedgerEntry).values(_entry(transfer_id, *EXTERNAL, -(amount * updated), reason)))
+    return updated
+
+
+# ============================ 🧾 ORDER SETTLEMENT ============================ #
+def default_admin_id(session=None):
+    session = session or db.session
+    admin_id = session.execute(select(Admin.id).order_by(Admin.id).limit(1)).scalar()
+    if admin_id is None:
+        raise LedgerError("No admin account to receive service fees")
+    return admin_id
+
+
+def settle_order(order, admin_id=None, session=None):
+    """Charge the customer and pay the restaurant and the platform for an order.
+
+    The customer pays original_fee + service_fee from their balance;
+    original_fee goes to the restaurant and service_fee to the admin account.
+    """
+    session = session or db.session
+    admin_id = admin_id or default_admin_id(session)
+    return transfer(
+        [
+            ("user", order.user_id, -(order.original_fee + order.service_fee)),
+            ("restaurant", order.restaurant_id, order.original_fee),
+            ("admin", admin_id, order.service_fee),
+        ],
+        reason="checkout",
+        order_id=order.id,
+        session=session,
+    )
+
+
+def apply_cashback(order, amount, session=None):
+    """Refund part of an order from the restaurant to the customer, once."""
+    session = session or db.session
+    if amount <= 0:
+        raise LedgerError("Cashback must be positive")
+    # Claim the order first; a second concurrent cashback matches no row and stops here
+    claimed = session.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.cashback_applied.is_not(True))
+        .values(cashback_applied=True)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed != 1:
+        raise LedgerError(f"Cashback already applied to order {order.id}")
+    transfer_id = transfer(
+        [("restaurant", order.restaurant_id, -amount), ("user", order.user_id, amount)],
+        reason="cashback",
+        order_id=order.id,
+        session=session,
+    )
+    session.expire(order, ["cashback_applied"])
+    return transfer_id
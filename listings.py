@@ -0,0 +1,124 @@
+"""Restaurant listings: the cached home page and the paginated browse API.
+
+The open-restaurant list and the city list are stored as plain dicts in the
+shared cache. Session events drop them after any commit that changes a
+field the listing shows, so readers never see a stale card for longer than
+the request that wrote the change.
+"""
+from sqlalchemy import and_, event, inspect, or_, tuple_
+from sqlalchemy.orm import Session
+
+from models import db, User, Restaurant, Rating
+from cache import get_cache
+from pagination import encode_cursor, decode_cursor
+import delivery_area
+
+OPEN_RESTAURANTS_KEY = "listing:open_restaurants"
+CITIES_KEY = "listing:cities"
+LISTING_TTL = 300
+BROWSE_DEFAULT_LIMIT = 20
+BROWSE_MAX_LIMIT = 100
+
+# Columns rendered on the home page; changing any of them invalidates the listing
+LISTING_FIELDS = ("name", "city", "image_url", "is_open", "display_order", "rating")
+
+
+def _listing_entry(restaurant):
+    entry = restaurant.to_dict()
+    entry["display_order"] = restaurant.display_order
+    # Fragment cache key and Last-Modified for the home page
+    entry["version"] = restaurant.version
+    entry["updated_at"] = restaurant.updated_at.isoformat() if restaurant.updated_at else None
+    return entry
+
+
+def get_open_restaurants():
+    """Open restaurants in display order, as dicts."""
+    def load():
+        restaurants = (
+            Restaurant.query.filter_by(is_open=True)
+            .order_by(Restaurant.display_order, Restaurant.id)
+            .all()
+        )
+        return [_listing_entry(r) for r in restaurants]
+    return get_cache().get_or_set(OPEN_RESTAURANTS_KEY, load, LISTING_TTL)
+
+
+def get_cities():
+    """Sorted list of distinct restaurant cities."""
+    def load():
+        rows = db.session.query(Restaurant.city).distinct().all()
+        return sorted(city for (city,) in rows if city)
+    return get_cache().get_or_set(CITIES_KEY, load, LISTING_TTL)
+
+
+def browse_restaurants(city=None, plz=None, is_open=True, cursor=None, limit=BROWSE_DEFAULT_LIMIT):
+    """One page of restaurants ordered by (display_order, id).
+
+    plz selects the restaurants delivering to that postal code (see
+    delivery_area.py), plus those without coordinates yet that are
+    registered there. Uses keyset pagination: the cursor carries the sort
+    key of the last row of the previous page, so every page is an index
+    range scan of at most limit + 1 rows. Returns (restaurant dicts, next
+    cursor or None).
+    Raises ValueError for a malformed cursor.
+    """
+    limit = min(max(limit, 1), BROWSE_MAX_LIMIT)
+    query = Restaurant.query.filter(Restaurant.is_open == is_open)
+    if city:
+        query = query.filter(Restaurant.city == city)
+    if plz:
+        delivering = delivery_area.restaurants_delivering_to(plz)
+        registered_here = User.plz == plz
+        query = query.join(User, User.id == Restaurant.user_id)
+        if delivering is None:
+            # No centroid for this postal code: fall back to restaurants registered there
+            query = query.filter(registered_here)
+        else:
+            # Restaurants not located yet have no delivery area, so match them by their owner's PLZ
+            unlocated = or_(Restaurant.latitude.is_(None), Restaurant.longitude.is_(None))
+            query = query.filter(or_(Restaurant.id.in_(delivering), and_(unlocated, registered_here)))
+
+    after = decode_cursor(cursor, int, int)
+    if after:
+        query = query.filter(tuple_(Restaurant.display_order, Restaurant.id) > tuple_(*after))
+
+    rows = query.order_by(Restaurant.display_order, Restaurant.id).limit(limit + 1).all()
+    page, has_more = rows[:limit], len(rows) > limit
+    next_cursor = encode_cursor(page[-1].display_order, page[-1].id) if has_more else None
+    return [_listing_entry(r) for r in page], next_cursor
+
+
+def invalidate_listing():
+    get_cache().delete(OPEN_RESTAURANTS_KEY, CITIES_KEY)
+
+
+# ============================ 🔔 INVALIDATION ============================ #
+def _listing_changed(restaurant):
+    state = inspect(restaurant)
+    return any(state.attrs[field].history.has_changes() for field in LISTING_FIELDS)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_listing_changes(session, flush_context, instances):
+    # Ratings update the restaurant's average with a plain UPDATE, so they
+    # count as a listing change too
+    for obj in session.new | session.deleted:
+        if isinstance(obj, (Restaurant, Rating)):
+            session.info["listing_dirty"] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, Rating) or (isinstance(obj, Restaurant) and _listing_changed(obj)):
+            session.info["listing_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("listing_dirty", False):
+        invalidate_listing()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("listing_dirty", None)
@@ -1,21 +1,26 @@
-from app import app
-from models import db, Item, MenuItem
+from sqlalchemy import insert, literal, select
+from models import Item, MenuItem
+from migration_runner import DataMigration, run_cli
 
-def migrate_items_to_menu_items():
-    with app.app_context():
-        items = Item.query.all()
-        for item in items:
-            menu_item = MenuItem(
-                name=item.name,
-                price=item.price,
-                restaurant_id=item.restaurant_id,
-                description=item.description,
-                image_url=item.image_url,
-                category="default"  # Adjust as needed
+class CopyItemsToMenuItems(DataMigration):
+    """Copy every Item into the menu_item table with INSERT ... SELECT per chunk."""
+    name = "copy_items_to_menu_items"
+    model = Item
+
+    def process_chunk(self, session, first_id, last_id):
+        rows = select(
+            Item.name,
+            Item.price,
+            Item.restaurant_id,
+            Item.description,
+            Item.image_url,
+            literal("default"),  # Adjust as needed
+        ).where(Item.id.between(first_id, last_id))
+        return session.execute(
+            insert(MenuItem).from_select(
+                ["name", "price", "restaurant_id", "description", "image_url", "category"], rows
             )
-            db.session.add(menu_item)
-        db.session.commit()
-        print("Migration completed successfully.")
+        ).rowcount
 
 if __name__ == "__main__":
-    migrate_items_to_menu_items()   
\ No newline at end of file
+    run_cli(CopyItemsToMenuItems())
@@ -0,0 +1,145 @@
+"""Chunked, resumable data migrations.
+
+A DataMigration walks one table in primary-key order, CHUNK_SIZE ids at
+a time. For each chunk it runs process_chunk() and records the last id in
+migration_checkpoint, then commits. The work and its checkpoint land in
+the same transaction, so an interrupted run resumes exactly where it
+stopped without redoing or skipping rows. Chunks should be set-based
+statements bounded by the id range, not per-row ORM work.
+
+Scripts define a subclass and call run_cli():
+
+    class BackfillSomething(DataMigration):
+        name = "backfill_something"
+        model = Order
+
+        def process_chunk(self, session, first_id, last_id):
+            return session.execute(update(Order).where(Order.id.between(first_id, last_id)) ...).rowcount
+
+    if __name__ == "__main__":
+        run_cli(BackfillSomething())
+
+Pass --restart to clear the checkpoint and start over, --chunk-size N to
+override the chunk size.
+"""
+import argparse
+import sys
+import time
+from sqlalchemy import func, select
+
+from models import db, MigrationCheckpoint
+
+CHUNK_SIZE = 1000
+PROGRESS_INTERVAL = 5  # seconds between progress lines
+
+
+class DataMigration:
+    """Base class for a chunked data migration."""
+    name = None
+    model = None  # table walked in primary-key order
+    chunk_size = CHUNK_SIZE
+    # Incremental migrations pick up rows added since their last run instead
+    # of stopping once they have completed
+    incremental = False
+
+    def setup(self, session):
+        """Idempotent schema work (e.g. adding columns) run before any chunk."""
+
+    def where(self):
+        """Optional filter limiting which rows are walked."""
+        return None
+
+    def process_chunk(self, session, first_id, last_id):
+        """Migrate rows with first_id <= id <= last_id; return rows affected."""
+        raise NotImplementedError
+
+
+def _ids_after(migration, last_id):
+    id_column = migration.model.id
+    query = select(id_column).where(id_column > last_id)
+    condition = migration.where()
+    if condition is not None:
+        query = query.where(condition)
+    return query
+
+
+def run(migration, session=None, restart=False, chunk_size=None):
+    """Run a migration to completion, resuming from its checkpoint.
+
+    Returns the number of rows walked in this run.
+    """
+    session = session or db.session
+    chunk_size = chunk_size or migration.chunk_size
+    MigrationCheckpoint.__table__.create(session.connection(), checkfirst=True)
+
+    checkpoint = session.get(MigrationCheckpoint, migration.name)
+    if checkpoint is not None and restart:
+        session.delete(checkpoint)
+        session.flush()
+        checkpoint = None
+    if checkpoint is None:
+        checkpoint = MigrationCheckpoint(name=migration.name, last_id=0, rows_done=0)
+        session.add(checkpoint)
+    elif checkpoint.completed_at is not None and not migration.incremental:
+        print(f"✅ {migration.name} already completed on {checkpoint.completed_at:%Y-%m-%d %H:%M}")
+        return 0
+    elif checkpoint.last_id:
+        print(f"🔁 Resuming {migration.name} after id {checkpoint.last_id}")
+
+    migration.setup(session)
+    session.commit()
+
+    remaining = session.execute(
+        select(func.count()).select_from(_ids_after(migration, checkpoint.last_id).subquery())
+    ).scalar()
+    print(f"🚚 {migration.name}: {remaining} rows to go in chunks of {chunk_size}")
+
+    started = last_report = time.perf_counter()
+    walked = 0
+    while True:
+        ids = session.execute(
+            _ids_after(migration, checkpoint.last_id).order_by(migration.model.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        try:
+            migration.process_chunk(session, ids[0], ids[-1])
+            checkpoint.last_id = ids[-1]
+            checkpoint.rows_done += len(ids)
+            checkpoint.updated_at = func.current_timestamp()
+            session.commit()
+        except Exception:
+            session.rollback()
+            print(f"❌ {migration.name} failed in chunk {ids[0]}..{ids[-1]}; rerun to resume after id {checkpoint.last_id}")
+            raise
+        walked += len(ids)
+
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL:
+            rate = walked / (now - started)
+            eta = (remaining - walked) / rate if rate else 0
+            print(f"⏱️  {walked}/{remaining} rows ({walked / remaining:.0%}), {rate:.0f} rows/s, ~{eta:.0f}s left")
+            last_report = now
+
+    checkpoint.completed_at = func.current_timestamp()
+    session.commit()
+    elapsed = time.perf_counter() - started
+    print(f"✅ {migration.name} finished: {walked} rows in {elapsed:.1f}s "
+          f"({walked / elapsed if elapsed else 0:.0f} rows/s)")
+    return walked
+
+
+def run_cli(migration, argv=None):
+    """Parse --restart / --chunk-size and run the migration inside the app."""
+    parser = argparse.ArgumentParser(description=f"Run the {migration.name} data migration")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the beginning")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from app import app
+    with app.app_context():
+        try:
+            run(migration, restart=args.restart, chunk_size=args.chunk_size)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
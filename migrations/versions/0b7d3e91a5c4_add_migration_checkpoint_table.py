@@ -0,0 +1,31 @@
+"""Add migration_checkpoint table for resumable data migrations
+
+Revision ID: 0b7d3e91a5c4
+Revises: f2a9c4d83b16
+Create Date: 2026-10-18 14:26:31.804552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7d3e91a5c4'
+down_revision = 'f2a9c4d83b16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('migration_checkpoint',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('migration_checkpoint')
@@ -0,0 +1,33 @@
+"""Add version and updated_at to restaurant for conditional GETs
+
+Revision ID: 1c6e5f0a8d27
+Revises: 0b7d3e91a5c4
+Create Date: 2026-10-18 15:12:48.203916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c6e5f0a8d27'
+down_revision = '0b7d3e91a5c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('restaurant')}
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        if 'version' not in existing:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        if 'updated_at' not in existing:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute('UPDATE restaurant SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
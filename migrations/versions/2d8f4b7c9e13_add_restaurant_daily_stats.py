@@ -0,0 +1,40 @@
+"""Add restaurant_daily_stats for the admin dashboard
+
+Revision ID: 2d8f4b7c9e13
+Revises: 1c6e5f0a8d27
+Create Date: 2026-10-18 15:58:09.417362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8f4b7c9e13'
+down_revision = '1c6e5f0a8d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('restaurant_daily_stats',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.BigInteger(), nullable=False),
+    sa.Column('service_fees', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('restaurant_id', 'day')
+    )
+    with op.batch_alter_table('restaurant_daily_stats', schema=None) as batch_op:
+        batch_op.create_index('ix_restaurant_daily_stats_day', ['day'], unique=False)
+
+    # Existing orders are rolled up afterwards with `python stats.py rebuild`,
+    # which can run while the app is already serving
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant_daily_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_restaurant_daily_stats_day')
+
+    op.drop_table('restaurant_daily_stats')
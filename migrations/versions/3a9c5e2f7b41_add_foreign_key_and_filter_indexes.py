@@ -0,0 +1,71 @@
+"""Index foreign keys and filtered columns on the hot query paths
+
+Revision ID: 3a9c5e2f7b41
+Revises: 2d8f4b7c9e13
+Create Date: 2026-10-18 16:41:52.730184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9c5e2f7b41'
+down_revision = '2d8f4b7c9e13'
+branch_labels = None
+depends_on = None
+
+# (index, table, columns), matching the __table_args__ in models.py
+INDEXES = [
+    ('ix_order_restaurant_status_date', 'order', ['restaurant_id', 'order_status', 'order_date']),
+    ('ix_order_user_date', 'order', ['user_id', 'order_date', 'id']),
+    ('ix_order_customer', 'order', ['customer_id']),
+    ('ix_order_date', 'order', ['order_date', 'id']),
+    ('ix_order_has_items_order', 'order_has_items', ['order_id']),
+    ('ix_order_has_items_item', 'order_has_items', ['item_id']),
+    ('ix_payment_order', 'payment', ['order_id']),
+    ('ix_rating_restaurant', 'rating', ['restaurant_id']),
+    ('ix_rating_user', 'rating', ['user_id']),
+    ('ix_item_restaurant', 'item', ['restaurant_id']),
+    ('ix_item_category', 'item', ['category_id']),
+    ('ix_category_restaurant', 'category', ['restaurant_id']),
+    ('ix_menu_restaurant', 'menu', ['restaurant_id']),
+    ('ix_menu_item_restaurant', 'menu_item', ['restaurant_id']),
+    ('ix_restaurant_city', 'restaurant', ['city']),
+    ('ix_ledger_entry_order', 'ledger_entry', ['order_id']),
+]
+
+
+def _missing_indexes():
+    """Indexes not there yet, skipping tables or columns this database never got."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    missing = []
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table)}
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing_indexes and set(columns) <= existing_columns:
+            missing.append((name, table, columns))
+    return missing
+
+
+def upgrade():
+    missing = _missing_indexes()
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY keeps the order table writable while its indexes build
+        with op.get_context().autocommit_block():
+            for name, table, columns in missing:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+    else:
+        for name, table, columns in missing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in reversed(INDEXES):
+        if table in tables and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
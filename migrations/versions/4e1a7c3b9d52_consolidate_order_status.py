@@ -0,0 +1,64 @@
+"""Fold order.status into order_status, add per-status timestamps and a live-orders index
+
+Revision ID: 4e1a7c3b9d52
+Revises: 3a9c5e2f7b41
+Create Date: 2026-10-18 17:26:37.508142
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e1a7c3b9d52'
+down_revision = '3a9c5e2f7b41'
+branch_labels = None
+depends_on = None
+
+STATUSES = ('shopping', 'pending', 'accepted', 'prepared', 'delivered', 'cancelled')
+# Spellings the templates used before the statuses were fixed
+ALIASES = {'completed': 'delivered', 'canceled': 'cancelled'}
+TIMESTAMPS = ('placed_at', 'accepted_at', 'prepared_at', 'delivered_at', 'cancelled_at')
+ACTIVE = "order_status IN ('pending', 'accepted', 'prepared')"
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('order')}
+
+    if 'status' in existing:
+        op.execute('UPDATE "order" SET order_status = status WHERE order_status IS NULL')
+    op.execute('UPDATE "order" SET order_status = \'shopping\' WHERE order_status IS NULL')
+    for alias, status in ALIASES.items():
+        op.execute(f'UPDATE "order" SET order_status = \'{status}\' WHERE order_status = \'{alias}\'')
+    unknown = op.get_bind().execute(
+        sa.text('SELECT DISTINCT order_status FROM "order" WHERE order_status NOT IN :statuses')
+        .bindparams(sa.bindparam('statuses', STATUSES, expanding=True))
+    ).scalars().all()
+    if unknown:
+        raise RuntimeError(f"Orders with unknown statuses {unknown}; map them to one of {STATUSES} first")
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        for name in TIMESTAMPS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.DateTime(), nullable=True))
+        if 'status' in existing:
+            batch_op.drop_column('status')
+        batch_op.alter_column('order_status', existing_type=sa.String(length=50), nullable=False)
+
+    # Orders placed before this revision only know their order date
+    op.execute('UPDATE "order" SET placed_at = order_date WHERE placed_at IS NULL AND order_status != \'shopping\'')
+
+    op.create_index('ix_order_restaurant_active', 'order', ['restaurant_id', 'order_date'], unique=False,
+                    sqlite_where=sa.text(ACTIVE), postgresql_where=sa.text(ACTIVE))
+
+
+def downgrade():
+    op.drop_index('ix_order_restaurant_active', table_name='order')
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.alter_column('order_status', existing_type=sa.String(length=50), nullable=True)
+        batch_op.add_column(sa.Column('status', sa.String(length=50), nullable=True))
+        for name in reversed(TIMESTAMPS):
+            batch_op.drop_column(name)
+
+    op.execute('UPDATE "order" SET status = order_status')
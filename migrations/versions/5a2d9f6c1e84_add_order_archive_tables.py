@@ -0,0 +1,113 @@
+"""Add order archive tables and page restaurant order history by date
+
+Revision ID: 5a2d9f6c1e84
+Revises: 4e1a7c3b9d52
+Create Date: 2026-10-18 18:32:05.926417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a2d9f6c1e84'
+down_revision = '4e1a7c3b9d52'
+branch_labels = None
+depends_on = None
+
+ARCHIVE_TABLES = ('rating_archive', 'payment_archive', 'order_has_items_archive', 'order_archive')
+
+
+def upgrade():
+    op.create_table('order_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.BigInteger(), nullable=True),
+    sa.Column('original_fee', sa.BigInteger(), nullable=True),
+    sa.Column('service_fee', sa.BigInteger(), nullable=True),
+    sa.Column('order_status', sa.String(length=50), nullable=False),
+    sa.Column('order_date', sa.DateTime(), nullable=True),
+    sa.Column('placed_at', sa.DateTime(), nullable=True),
+    sa.Column('accepted_at', sa.DateTime(), nullable=True),
+    sa.Column('prepared_at', sa.DateTime(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.Column('cashback_applied', sa.Boolean(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customer.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_order_archive_user_date', ['user_id', 'order_date', 'id'], unique=False)
+        batch_op.create_index('ix_order_archive_restaurant_date', ['restaurant_id', 'order_date', 'id'], unique=False)
+
+    op.create_table('order_has_items_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['item.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['order_archive.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_has_items_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_order_has_items_archive_order', ['order_id'], unique=False)
+
+    op.create_table('payment_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.BigInteger(), nullable=False),
+    sa.Column('transaction_status', sa.String(length=50), nullable=True),
+    sa.Column('transaction_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order_archive.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('payment_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_payment_archive_order', ['order_id'], unique=False)
+
+    op.create_table('rating_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order_archive.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id')
+    )
+
+    # Completed orders are now paged by (order_date, id) rather than filtered by status
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('order')}
+    if 'ix_order_restaurant_status_date' in indexes:
+        op.drop_index('ix_order_restaurant_status_date', table_name='order')
+    op.create_index('ix_order_restaurant_date', 'order', ['restaurant_id', 'order_date', 'id'], unique=False)
+
+    # Ledger entries keep pointing at orders once they move to order_archive.
+    # SQLite does not enforce the constraint, so only Postgres needs it dropped.
+    if op.get_bind().dialect.name == 'postgresql':
+        for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys('ledger_entry'):
+            if foreign_key['referred_table'] == 'order' and foreign_key['name']:
+                op.drop_constraint(foreign_key['name'], 'ledger_entry', type_='foreignkey')
+
+
+def downgrade():
+    archived = op.get_bind().execute(sa.text('SELECT COUNT(*) FROM order_archive')).scalar()
+    if archived:
+        raise RuntimeError(f"order_archive still holds {archived} orders; move them back before downgrading")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_foreign_key(None, 'ledger_entry', 'order', ['order_id'], ['id'])
+
+    op.drop_index('ix_order_restaurant_date', table_name='order')
+    op.create_index('ix_order_restaurant_status_date', 'order', ['restaurant_id', 'order_status', 'order_date'],
+                    unique=False)
+
+    for table in ARCHIVE_TABLES:
+        op.drop_table(table)
@@ -0,0 +1,33 @@
+"""Add coordinates and delivery radius to restaurant
+
+Revision ID: 6b4e0c8a2f19
+Revises: 5a2d9f6c1e84
+Create Date: 2026-10-18 19:14:40.318852
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b4e0c8a2f19'
+down_revision = '5a2d9f6c1e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('restaurant')}
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        for name in ('latitude', 'longitude', 'delivery_radius_km'):
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.Float(), nullable=True))
+
+    # Existing restaurants are placed afterwards with `python delivery_area.py locate`
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.drop_column('delivery_radius_km')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
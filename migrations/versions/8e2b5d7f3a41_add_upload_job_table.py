@@ -0,0 +1,41 @@
+"""Add upload_job table so upload progress is shared by every worker
+
+Revision ID: 8e2b5d7f3a41
+Revises: 7c3f1a9e5b26
+Create Date: 2026-10-18 21:14:36.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2b5d7f3a41'
+down_revision = '7c3f1a9e5b26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_job',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=255), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('upload_job', schema=None) as batch_op:
+        batch_op.create_index('ix_upload_job_restaurant', ['restaurant_id'], unique=False)
+        batch_op.create_index('ix_upload_job_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('upload_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_upload_job_updated_at')
+        batch_op.drop_index('ix_upload_job_restaurant')
+
+    op.drop_table('upload_job')
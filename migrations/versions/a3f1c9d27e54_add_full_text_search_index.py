@@ -0,0 +1,92 @@
+"""Add full-text search index for restaurants and menu items
+
+Revision ID: a3f1c9d27e54
+Revises: 56348029bdcf
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d27e54'
+down_revision = '56348029bdcf'
+branch_labels = None
+depends_on = None
+
+# Copied from search.py as of this revision, so later changes there don't alter the migration
+SQLITE_DDL = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS restaurant_fts USING fts5(
+            name, description, city,
+            content='restaurant', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')''',
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS menu_item_fts USING fts5(
+            name, description,
+            content='menu_item', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')''',
+    '''CREATE TRIGGER IF NOT EXISTS restaurant_fts_ai AFTER INSERT ON restaurant BEGIN
+            INSERT INTO restaurant_fts(rowid, name, description, city)
+            VALUES (new.id, new.name, new.description, new.city);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS restaurant_fts_ad AFTER DELETE ON restaurant BEGIN
+            INSERT INTO restaurant_fts(restaurant_fts, rowid, name, description, city)
+            VALUES ('delete', old.id, old.name, old.description, old.city);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS restaurant_fts_au AFTER UPDATE OF name, description, city ON restaurant BEGIN
+            INSERT INTO restaurant_fts(restaurant_fts, rowid, name, description, city)
+            VALUES ('delete', old.id, old.name, old.description, old.city);
+            INSERT INTO restaurant_fts(rowid, name, description, city)
+            VALUES (new.id, new.name, new.description, new.city);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS menu_item_fts_ai AFTER INSERT ON menu_item BEGIN
+            INSERT INTO menu_item_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS menu_item_fts_ad AFTER DELETE ON menu_item BEGIN
+            INSERT INTO menu_item_fts(menu_item_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS menu_item_fts_au AFTER UPDATE OF name, description ON menu_item BEGIN
+            INSERT INTO menu_item_fts(menu_item_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO menu_item_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END''',
+]
+
+RESTAURANT_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(city, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+MENU_ITEM_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade():
+    # SQLite gets FTS5 tables plus sync triggers, Postgres gets GIN expression indexes
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO restaurant_fts(restaurant_fts) VALUES ('rebuild')")
+        op.execute("INSERT INTO menu_item_fts(menu_item_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == 'postgresql':
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_restaurant_search ON restaurant USING gin (({RESTAURANT_DOCUMENT}))')
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_menu_item_search ON menu_item USING gin (({MENU_ITEM_DOCUMENT}))')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ('restaurant_fts_ai', 'restaurant_fts_ad', 'restaurant_fts_au',
+                        'menu_item_fts_ai', 'menu_item_fts_ad', 'menu_item_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS restaurant_fts')
+        op.execute('DROP TABLE IF EXISTS menu_item_fts')
+    elif bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_restaurant_search')
+        op.execute('DROP INDEX IF EXISTS ix_menu_item_search')
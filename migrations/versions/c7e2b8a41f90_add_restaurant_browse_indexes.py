@@ -0,0 +1,47 @@
+"""Add composite indexes for keyset restaurant browsing
+
+Revision ID: c7e2b8a41f90
+Revises: a3f1c9d27e54
+Create Date: 2026-10-18 10:04:17.552930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2b8a41f90'
+down_revision = 'a3f1c9d27e54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built from the migrations alone never got these model columns
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('restaurant')}
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        if 'is_open' not in existing:
+            batch_op.add_column(sa.Column('is_open', sa.Boolean(), nullable=True))
+        if 'display_order' not in existing:
+            batch_op.add_column(sa.Column('display_order', sa.Integer(), nullable=True))
+
+    # Keyset comparisons on (display_order, id) need display_order to be non-null
+    op.execute('UPDATE restaurant SET display_order = 0 WHERE display_order IS NULL')
+
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.alter_column('display_order',
+               existing_type=sa.Integer(),
+               nullable=False,
+               server_default='0')
+        batch_op.create_index('ix_restaurant_open_city_order', ['is_open', 'city', 'display_order', 'id'], unique=False)
+        batch_op.create_index('ix_restaurant_open_order', ['is_open', 'display_order', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.drop_index('ix_restaurant_open_order')
+        batch_op.drop_index('ix_restaurant_open_city_order')
+        batch_op.alter_column('display_order',
+               existing_type=sa.Integer(),
+               nullable=True,
+               server_default=None)
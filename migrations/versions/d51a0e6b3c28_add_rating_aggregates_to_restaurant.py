@@ -0,0 +1,40 @@
+"""Add rating_sum and rating_count to Restaurant
+
+Revision ID: d51a0e6b3c28
+Revises: c7e2b8a41f90
+Create Date: 2026-10-18 10:41:55.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd51a0e6b3c28'
+down_revision = 'c7e2b8a41f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+    # The rating table comes from db.create_all(), not from a migration
+    if 'rating' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    # Backfill from existing ratings; `python consistency.py backfill-ratings` does the same later
+    op.execute("""
+        UPDATE restaurant SET
+            rating_sum = COALESCE((SELECT SUM(rating) FROM rating WHERE rating.restaurant_id = restaurant.id), 0),
+            rating_count = (SELECT COUNT(*) FROM rating WHERE rating.restaurant_id = restaurant.id)
+    """)
+    op.execute("UPDATE restaurant SET rating = rating_sum / rating_count WHERE rating_count > 0")
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
@@ -0,0 +1,42 @@
+"""Add ledger_entry table for balance movements
+
+Revision ID: e8f4a2c61d97
+Revises: d51a0e6b3c28
+Create Date: 2026-10-18 11:52:07.318450
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8f4a2c61d97'
+down_revision = 'd51a0e6b3c28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('transfer_id', sa.String(length=32), nullable=False),
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('reason', sa.String(length=50), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ledger_entry', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ledger_entry_transfer_id'), ['transfer_id'], unique=False)
+        batch_op.create_index('ix_ledger_entry_account', ['account_type', 'account_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ledger_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_ledger_entry_account')
+        batch_op.drop_index(batch_op.f('ix_ledger_entry_transfer_id'))
+
+    op.drop_table('ledger_entry')
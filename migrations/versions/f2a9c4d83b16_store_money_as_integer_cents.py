@@ -0,0 +1,111 @@
+"""Store money columns as integer cents
+
+Revision ID: f2a9c4d83b16
+Revises: e8f4a2c61d97
+Create Date: 2026-10-18 13:07:44.561203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c4d83b16'
+down_revision = 'e8f4a2c61d97'
+branch_labels = None
+depends_on = None
+
+# Some of these columns were added by one-off scripts rather than migrations,
+# so each one is only converted if it exists
+MONEY_COLUMNS = {
+    'user': ['balance'],
+    'restaurant': ['balance'],
+    'item': ['price'],
+    'menu': ['price'],
+    'menu_item': ['price'],
+    'order': ['total_price', 'original_fee', 'service_fee'],
+    'payment': ['total_price'],
+    'admin': ['total_earnings'],
+    'ledger_entry': ['amount'],
+}
+
+BATCH_SIZE = 5000
+
+
+def _existing_columns(bind):
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    found = {}
+    for table_name, columns in MONEY_COLUMNS.items():
+        if table_name not in tables:
+            continue
+        existing = {column['name']: column for column in inspector.get_columns(table_name)}
+        present = [existing[name] for name in columns if name in existing]
+        if present:
+            found[table_name] = present
+    return found
+
+
+def _copy_in_batches(bind, table_name, pairs, convert):
+    """Fill new columns from old ones, BATCH_SIZE ids per UPDATE."""
+    table = sa.table(table_name, sa.column('id'), *[sa.column(name) for pair in pairs for name in pair])
+    low, high = bind.execute(sa.select(sa.func.min(table.c.id), sa.func.max(table.c.id))).first()
+    if low is None:
+        return
+    values = {target: convert(table.c[source]) for source, target in pairs}
+    for start in range(low, high + 1, BATCH_SIZE):
+        bind.execute(
+            table.update()
+            .where(table.c.id >= start, table.c.id < start + BATCH_SIZE)
+            .values(values)
+        )
+
+
+def _scaled_default(column, factor, cast):
+    default = column.get('default')
+    if default is None:
+        return None
+    try:
+        return str(cast(float(str(default).strip("'()")) * factor))
+    except ValueError:
+        return None
+
+
+def _swap_columns(table_name, columns, suffix, new_type, factor, convert, cast):
+    bind = op.get_bind()
+    with op.batch_alter_table(table_name, schema=None) as batch_op:
+        for column in columns:
+            batch_op.add_column(sa.Column(
+                column['name'] + suffix, new_type, nullable=True,
+                server_default=_scaled_default(column, factor, cast),
+            ))
+
+    _copy_in_batches(bind, table_name, [(column['name'], column['name'] + suffix) for column in columns], convert)
+
+    with op.batch_alter_table(table_name, schema=None) as batch_op:
+        for column in columns:
+            batch_op.drop_column(column['name'])
+            batch_op.alter_column(
+                column['name'] + suffix,
+                new_column_name=column['name'],
+                existing_type=new_type,
+                nullable=column['nullable'],
+            )
+
+
+def upgrade():
+    for table_name, columns in _existing_columns(op.get_bind()).items():
+        _swap_columns(
+            table_name, columns, '_cents', sa.BigInteger(), 100,
+            lambda value: sa.cast(sa.func.round(value * 100), sa.BigInteger),
+            lambda value: int(round(value)),
+        )
+
+
+def downgrade():
+    for table_name, columns in _existing_columns(op.get_bind()).items():
+        _swap_columns(
+            table_name, columns, '_float', sa.Float(), 0.01,
+            lambda value: sa.cast(value, sa.Float) / 100.0,
+            float,
+        )
@@ -1,10 +1,19 @@
+import enum
+from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, case, literal_column
 from flask_login import UserMixin
-from flask_bcrypt import generate_password_hash, check_password_hash
+import hashing
+from money import MoneyType
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+
+def utcnow():
+    """Naive UTC timestamp, matching what CURRENT_TIMESTAMP stores."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 # ============================ 🛠️ USER MODELS ============================ #
 class User(db.Model, UserMixin):
     """User model for authentication."""
@@ -20,15 +29,22 @@ class User(db.Model, UserMixin):
     plz = db.Column(db.String(10), nullable=False)
     
     # Balance Field
-    balance = db.Column(db.Float, default=0.0)
+    balance = db.Column(MoneyType, default=0.0)
 
     def set_password(self, password):
         """Hashes the password and stores it."""
-        self.password_hash = generate_password_hash(password).decode("utf-8")
+        self.password_hash = hashing.hash_password(password)
 
     def check_password(self, password):
-        """Verifies the password hash."""
-        return check_password_hash(self.password_hash, password)
+        """Verifies the password hash, upgrading it if BCRYPT_LOG_ROUNDS changed.
+
+        The upgraded hash is saved with the session's next commit.
+        """
+        if not hashing.check_password(password, self.password_hash):
+            return False
+        if hashing.needs_rehash(self.password_hash):
+            self.password_hash = hashing.hash_password(password)
+        return True
 
 
 # ============================ 🛠️ CUSTOMER MODEL ============================ #
@@ -49,14 +65,30 @@ class Restaurant(db.Model):
     city = db.Column(db.String(100), nullable=False)
     image_url = db.Column(db.String(255))
     description = db.Column(db.Text)
-    rating = db.Column(db.Float, default=0.0, nullable=False)  
-    balance = db.Column(db.Float, default=0.0)
+    rating = db.Column(db.Float, default=0.0, nullable=False)  # Average, kept in sync with rating_sum / rating_count
+    rating_sum = db.Column(db.Float, default=0.0, server_default="0", nullable=False)
+    rating_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    balance = db.Column(MoneyType, default=0.0)
     is_open = db.Column(db.Boolean, default=False)
-    display_order = db.Column(db.Integer, default=0)  # New field for ordering restaurants
+    display_order = db.Column(db.Integer, default=0, server_default="0", nullable=False)  # New field for ordering restaurants
+    # Bumped whenever anything the pages show changes (see page_cache)
+    version = db.Column(db.Integer, default=1, server_default="1", nullable=False)
+    updated_at = db.Column(db.DateTime, default=utcnow)
+    # Delivery area, see delivery_area.py; no radius means the platform default
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    delivery_radius_km = db.Column(db.Float)
     menu_items = db.relationship('MenuItem', backref='restaurant', lazy=True)
 
     user = db.relationship("User", backref="restaurant", uselist=False)
 
+    # Keyset pagination for the browse API seeks on (display_order, id)
+    __table_args__ = (
+        db.Index("ix_restaurant_open_city_order", "is_open", "city", "display_order", "id"),
+        db.Index("ix_restaurant_open_order", "is_open", "display_order", "id"),
+        db.Index("ix_restaurant_city", "city"),  # Distinct city list
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -66,9 +98,15 @@ class Restaurant(db.Model):
             "image_url": self.image_url or "/static/images/default_restaurant.png",
             "description": self.description,
             "rating": self.rating,
+            "ratings_count": self.rating_count,
             "is_open": self.is_open
         }
 
+    @property
+    def ratings_count(self):
+        """Number of ratings, read from the denormalized counter."""
+        return self.rating_count or 0
+
     @staticmethod
     def create_for_user(user):
         """Creates a Restaurant entry for a new restaurant user."""
@@ -92,54 +130,118 @@ class Category(db.Model):
     restaurant = db.relationship("Restaurant", backref="categories")
     items = db.relationship("Item", backref="category")
 
+    __table_args__ = (db.Index("ix_category_restaurant", "restaurant_id"),)
+
 class Item(db.Model):  # ✅ Keep this as the main item model
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255), nullable=True)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(MoneyType, nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     image_url = db.Column(db.String(255), nullable=True, default="/static/images/default_food.png")
 
+    __table_args__ = (
+        db.Index("ix_item_restaurant", "restaurant_id"),
+        db.Index("ix_item_category", "category_id"),
+    )
+
 
 class Menu(db.Model):
     __tablename__ = 'menu'  # ✅ Ensure the table name is correct
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(MoneyType, nullable=False)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
 
+    __table_args__ = (db.Index("ix_menu_restaurant", "restaurant_id"),)
+
 
 class MenuItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(MoneyType, nullable=False)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     description = db.Column(db.String(255))
     image_url = db.Column(db.String(255), default="/static/images/default_food.png")
     category = db.Column(db.String(50), nullable=False)
 
+    __table_args__ = (db.Index("ix_menu_item_restaurant", "restaurant_id"),)
+
     # ❌ Remove this line: `restaurant = db.relationship("Restaurant", back_populates="menu_items")`
 
 
 # ============================ 🛒 ORDER & PAYMENT MODELS ============================ #
+class OrderStatus(str, enum.Enum):
+    """Where an order is in its lifecycle; order_state.py owns the transitions."""
+    SHOPPING = "shopping"    # still a cart
+    PENDING = "pending"      # placed, waiting for the restaurant
+    ACCEPTED = "accepted"
+    PREPARED = "prepared"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+
+
+# Orders a restaurant still has to act on
+ACTIVE_ORDER_STATUSES = (OrderStatus.PENDING.value, OrderStatus.ACCEPTED.value, OrderStatus.PREPARED.value)
+
+
+def active_orders_clause(column):
+    """column IN (active statuses), with the statuses inlined.
+
+    Bound parameters would hide the values from the planner, which then
+    cannot tell that the query only wants rows the partial index covers.
+    """
+    return column.in_([literal_column(f"'{status}'") for status in ACTIVE_ORDER_STATUSES])
+
+
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey("customer.id"), nullable=False)
     restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    total_price = db.Column(db.Float, default=0)
-    original_fee = db.Column(db.Float, default=0)  # Original fee for restaurant
-    service_fee = db.Column(db.Float, default=0)   # Service fee for admin
-    order_status = db.Column(db.String(50), default="shopping")
+    total_price = db.Column(MoneyType, default=0)
+    original_fee = db.Column(MoneyType, default=0)  # Original fee for restaurant
+    service_fee = db.Column(MoneyType, default=0)   # Service fee for admin
+    order_status = db.Column(
+        db.Enum(*(status.value for status in OrderStatus), name="order_status", native_enum=False, length=50,
+                validate_strings=True),
+        nullable=False,
+        default=OrderStatus.SHOPPING.value,
+    )
     order_date = db.Column(db.DateTime, server_default=db.func.current_timestamp())
-    status = db.Column(db.String(50), default='pending')
+    # When the order entered each status; set by order_state.transition()
+    placed_at = db.Column(db.DateTime)
+    accepted_at = db.Column(db.DateTime)
+    prepared_at = db.Column(db.DateTime)
+    delivered_at = db.Column(db.DateTime)
+    cancelled_at = db.Column(db.DateTime)
     cashback_applied = db.Column(db.Boolean, default=False)
     items = db.relationship('OrderHasItems', backref='order_items', lazy=True, overlaps="order_items")
 
     customer = db.relationship("Customer", backref="orders")
     restaurant = db.relationship("Restaurant", backref="orders")
 
+    # The old free-form `status` column was folded into order_status
+    status = db.synonym("order_status")
+    archived = False
+
+    __table_args__ = (
+        # Restaurant order history, newest first, paged by (order_date, id)
+        db.Index("ix_order_restaurant_date", "restaurant_id", "order_date", "id"),
+        # Live orders only, so it stays small however much history piles up
+        db.Index(
+            "ix_order_restaurant_active", "restaurant_id", "order_date",
+            sqlite_where=active_orders_clause(order_status),
+            postgresql_where=active_orders_clause(order_status),
+        ),
+        # Order history: a user's orders, newest first
+        db.Index("ix_order_user_date", "user_id", "order_date", "id"),
+        db.Index("ix_order_customer", "customer_id"),
+        # Admin recent orders
+        db.Index("ix_order_date", "order_date", "id"),
+    )
+
 class OrderHasItems(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False)
@@ -149,15 +251,22 @@ class OrderHasItems(db.Model):
     order = db.relationship("Order", backref="order_items", overlaps="items")
     item = db.relationship("Item", backref="order_items")
 
+    __table_args__ = (
+        db.Index("ix_order_has_items_order", "order_id"),
+        db.Index("ix_order_has_items_item", "item_id"),
+    )
+
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False)
-    total_price = db.Column(db.Float, nullable=False)
+    total_price = db.Column(MoneyType, nullable=False)
     transaction_status = db.Column(db.String(50), default="pending")  # paid, pending
     transaction_date = db.Column(db.DateTime, server_default=db.func.current_timestamp())
 
     order = db.relationship("Order", backref="payment")
 
+    __table_args__ = (db.Index("ix_payment_order", "order_id"),)
+
 # ============================ ⭐ RATING MODEL ============================ #
 class Rating(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -172,11 +281,118 @@ class Rating(db.Model):
     restaurant = db.relationship("Restaurant", backref="ratings")
     order = db.relationship("Order", backref="rating", uselist=False)
 
+    __table_args__ = (
+        db.Index("ix_rating_restaurant", "restaurant_id"),
+        db.Index("ix_rating_user", "user_id"),
+    )
+
+def _apply_rating_delta(connection, restaurant_id, sum_delta, count_delta):
+    """Adjust a restaurant's rating aggregates in the current transaction.
+
+    A single UPDATE reads and writes the counters, so concurrent ratings for
+    the same restaurant cannot overwrite each other's increments.
+    """
+    table = Restaurant.__table__
+    new_sum = table.c.rating_sum + sum_delta
+    new_count = table.c.rating_count + count_delta
+    connection.execute(
+        table.update()
+        .where(table.c.id == restaurant_id)
+        .values(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=case((new_count > 0, new_sum / new_count), else_=0.0),
+            version=table.c.version + 1,
+            updated_at=utcnow(),
+        )
+    )
+
+@event.listens_for(Rating, "after_insert")
+def _rating_inserted(mapper, connection, target):
+    _apply_rating_delta(connection, target.restaurant_id, target.rating, 1)
+
+@event.listens_for(Rating, "after_delete")
+def _rating_deleted(mapper, connection, target):
+    _apply_rating_delta(connection, target.restaurant_id, -target.rating, -1)
+
+@event.listens_for(Rating, "after_update")
+def _rating_updated(mapper, connection, target):
+    history = db.inspect(target).attrs.rating.history
+    if history.deleted and history.added:
+        _apply_rating_delta(connection, target.restaurant_id, history.added[0] - history.deleted[0], 0)
+
+# ============================ 🗄️ ORDER ARCHIVE MODELS ============================ #
+# Delivered and cancelled orders past the retention window, moved here by
+# order_archive.py with their lines, payments and ratings. Rows keep their
+# ids and columns, so templates render them like live orders.
+class ArchivedOrder(db.Model):
+    __tablename__ = "order_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey("customer.id"), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    total_price = db.Column(MoneyType)
+    original_fee = db.Column(MoneyType)
+    service_fee = db.Column(MoneyType)
+    order_status = db.Column(db.String(50), nullable=False)
+    order_date = db.Column(db.DateTime)
+    placed_at = db.Column(db.DateTime)
+    accepted_at = db.Column(db.DateTime)
+    prepared_at = db.Column(db.DateTime)
+    delivered_at = db.Column(db.DateTime)
+    cancelled_at = db.Column(db.DateTime)
+    cashback_applied = db.Column(db.Boolean)
+    archived_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+    restaurant = db.relationship("Restaurant")
+    order_items = db.relationship("ArchivedOrderItem", back_populates="order")
+    rating = db.relationship("ArchivedRating")
+    payment = db.relationship("ArchivedPayment")
+
+    archived = True
+
+    __table_args__ = (
+        db.Index("ix_order_archive_user_date", "user_id", "order_date", "id"),
+        db.Index("ix_order_archive_restaurant_date", "restaurant_id", "order_date", "id"),
+    )
+
+class ArchivedOrderItem(db.Model):
+    __tablename__ = "order_has_items_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order_archive.id"), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey("item.id"), nullable=False)
+    quantity = db.Column(db.Integer)
+
+    order = db.relationship("ArchivedOrder", back_populates="order_items")
+    item = db.relationship("Item")
+
+    __table_args__ = (db.Index("ix_order_has_items_archive_order", "order_id"),)
+
+class ArchivedPayment(db.Model):
+    __tablename__ = "payment_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order_archive.id"), nullable=False)
+    total_price = db.Column(MoneyType, nullable=False)
+    transaction_status = db.Column(db.String(50))
+    transaction_date = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index("ix_payment_archive_order", "order_id"),)
+
+class ArchivedRating(db.Model):
+    """Archived ratings still count towards Restaurant.rating; archiving does not touch the aggregates."""
+    __tablename__ = "rating_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order_archive.id"), nullable=False, unique=True)
+    rating = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime)
+
 # ============================ 👑 ADMIN MODEL ============================ #
 class Admin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, unique=True)
-    total_earnings = db.Column(db.Float, default=0.0)  # Total earnings from service fees
+    total_earnings = db.Column(MoneyType, default=0.0)  # Total earnings from service fees
     
     user = db.relationship("User", backref="admin", uselist=False)
     
@@ -188,6 +404,77 @@ class Admin(db.Model):
             total_earnings=0.0
         )
 
+# ============================ 📒 LEDGER MODEL ============================ #
+class LedgerEntry(db.Model):
+    """One leg of a balance movement. Entries sharing a transfer_id sum to zero."""
+    id = db.Column(db.Integer, primary_key=True)
+    transfer_id = db.Column(db.String(32), nullable=False, index=True)
+    account_type = db.Column(db.String(20), nullable=False)  # "user", "restaurant" or "admin"
+    account_id = db.Column(db.Integer, nullable=False)
+    amount = db.Column(MoneyType, nullable=False)
+    reason = db.Column(db.String(50), nullable=False)  # "checkout", "cashback", "credit", ...
+    # No foreign key: the order may have moved to order_archive (same id)
+    order_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.Index("ix_ledger_entry_account", "account_type", "account_id"),
+        db.Index("ix_ledger_entry_order", "order_id"),
+    )
+
+# ============================ 📊 STATISTICS MODEL ============================ #
+class RestaurantDailyStats(db.Model):
+    """Delivered orders rolled up per restaurant and day (maintained by stats.py)."""
+    __tablename__ = "restaurant_daily_stats"
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(MoneyType, nullable=False, default=0)  # Sum of total_price
+    service_fees = db.Column(MoneyType, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_restaurant_daily_stats_day", "day"),
+    )
+
+# ============================ 🧭 GEOCODING CACHE MODEL ============================ #
+class GeocodeCache(db.Model):
+    """Geocoding answers keyed by normalized address (maintained by geocoding.py)."""
+    __tablename__ = "geocode_cache"
+    key = db.Column(db.String(255), primary_key=True)
+    address = db.Column(db.String(255), nullable=False)  # As first looked up
+    # Both NULL: the address was looked up and not found
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    formatted_address = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+
+# ============================ 🖼️ UPLOAD JOB MODEL ============================ #
+class UploadJob(db.Model):
+    """State of a background image upload (maintained by upload_queue.py)."""
+    __tablename__ = "upload_job"
+    id = db.Column(db.String(32), primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey("restaurant.id"), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, uploading, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    url = db.Column(db.String(255), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_upload_job_restaurant", "restaurant_id"),
+        # Pruning finished jobs by age
+        db.Index("ix_upload_job_updated_at", "updated_at"),
+    )
+
+# ============================ 🚚 DATA MIGRATION CHECKPOINTS ============================ #
+class MigrationCheckpoint(db.Model):
+    """Progress of a chunked data migration, so an interrupted run can resume."""
+    name = db.Column(db.String(100), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+
 # ============================ 🔧 DATABASE INITIALIZATION FUNCTION ============================ #
 def init_db(app):
     db.init_app(app)
@@ -0,0 +1,140 @@
+"""Money stored as integer cents.
+
+Money columns use MoneyType, which keeps whole cents in a BIGINT column
+and hands back Money values. Sums and comparisons therefore run on
+integers in the database and come back exact, with no float drift to
+round away in templates.
+
+Money behaves like a number in euros. You can add it to or compare it
+with ints, floats and Decimals, and it formats through "%.2f" and
+f"{value:.2f}". Products like `price * 0.85` are rounded half-up to the
+cent.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from functools import total_ordering
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+@total_ordering
+class Money:
+    """An amount of euros held as integer cents."""
+    __slots__ = ("cents",)
+
+    def __init__(self, amount=0):
+        if isinstance(amount, Money):
+            self.cents = amount.cents
+        else:
+            # Go through str() so 0.1 + 0.2 style floats land on the cent they print as
+            value = Decimal(str(amount)) if isinstance(amount, float) else Decimal(amount)
+            self.cents = int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+    @classmethod
+    def from_cents(cls, cents):
+        money = cls.__new__(cls)
+        money.cents = int(cents)
+        return money
+
+    @property
+    def amount(self):
+        return (Decimal(self.cents) * CENT).quantize(CENT)
+
+    # ---- arithmetic ----
+    def __add__(self, other):
+        if isinstance(other, (Money, int, float, Decimal)):
+            return Money.from_cents(self.cents + Money(other).cents)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, (Money, int, float, Decimal)):
+            return Money.from_cents(self.cents - Money(other).cents)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, (int, float, Decimal)):
+            return Money.from_cents(Money(other).cents - self.cents)
+        return NotImplemented
+
+    def __mul__(self, factor):
+        if isinstance(factor, (int, float, Decimal)):
+            value = self.amount * (Decimal(str(factor)) if isinstance(factor, float) else Decimal(factor))
+            return Money(value)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        if isinstance(divisor, (int, float, Decimal)):
+            value = self.amount / (Decimal(str(divisor)) if isinstance(divisor, float) else Decimal(divisor))
+            return Money(value)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money.from_cents(-self.cents)
+
+    def __abs__(self):
+        return Money.from_cents(abs(self.cents))
+
+    def __round__(self, ndigits=None):
+        return self if ndigits is not None and ndigits >= 2 else Money(round(self.amount, ndigits or 0))
+
+    # ---- comparison ----
+    def __eq__(self, other):
+        if isinstance(other, (Money, int, float, Decimal)):
+            return self.cents == Money(other).cents
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, (Money, int, float, Decimal)):
+            return self.cents < Money(other).cents
+        return NotImplemented
+
+    def __hash__(self):
+        # Hash as the euro amount, so Money(1) and 1 (or Decimal("1.00")) are one dict key
+        return hash(self.amount)
+
+    def __bool__(self):
+        return self.cents != 0
+
+    # ---- conversion ----
+    def __float__(self):
+        return self.cents / 100
+
+    def __str__(self):
+        return str(self.amount)
+
+    def __repr__(self):
+        return f"Money('{self.amount}')"
+
+    def __format__(self, spec):
+        return format(self.amount, spec) if spec else str(self)
+
+
+class MoneyType(TypeDecorator):
+    """Integer-cent column that reads and writes Money.
+
+    Plain numbers bound to it are taken as euros, so `Item(price=12.99)`
+    and `Order.total_price > 10` keep working.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return Money(value).cents
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Money.from_cents(value)
+
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+
+    @property
+    def python_type(self):
+        return Money
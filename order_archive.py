@@ -0,0 +1,194 @@
+"""Archive of finished orders, and order history paged across it.
+
+Delivered and cancelled orders older than ORDER_ARCHIVE_DAYS (180 by
+default) move from order to order_archive, together with their
+order_has_items, payment and rating rows, so the tables that checkout and
+the dashboards hit stay small. Each batch copies BATCH_SIZE orders with
+INSERT ... SELECT and deletes the originals in the same transaction: a
+batch is moved completely or not at all, and an interrupted run just
+carries on with the orders still waiting. Rows keep their ids, so ledger
+entries still point at the right order, and restaurant rating aggregates
+and the dashboard stats keep counting archived orders.
+
+History pages are keyset-paginated on (order_date, id), newest first. The
+order table is walked first and the archive is only read once it runs
+out, so recent pages never touch it while "Load older orders" still
+reaches every archived order.
+
+Usage:
+    python order_archive.py [--days N] [--batch-size N]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, literal, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import (
+    db, ArchivedOrder, ArchivedOrderItem, ArchivedPayment, ArchivedRating, Order, OrderHasItems, OrderStatus,
+    Payment, Rating, utcnow,
+)
+from pagination import encode_cursor, decode_cursor
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ORDER_ARCHIVE_DAYS", 180))
+BATCH_SIZE = 1000
+HISTORY_PAGE_SIZE = 20
+FINISHED_STATUSES = (OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value)
+
+# (live table, archive table), parents first; deletes run in reverse
+TABLES = [
+    (Order.__table__, ArchivedOrder.__table__),
+    (OrderHasItems.__table__, ArchivedOrderItem.__table__),
+    (Payment.__table__, ArchivedPayment.__table__),
+    (Rating.__table__, ArchivedRating.__table__),
+]
+
+# History tiers in the order they are paged
+TIERS = {"order": Order, "archive": ArchivedOrder}
+
+
+# ============================ 🗄️ ARCHIVING ============================ #
+def _order_key(table):
+    return table.c.id if table is Order.__table__ else table.c.order_id
+
+
+def archive_batch(cutoff, batch_size=BATCH_SIZE, session=None):
+    """Move up to batch_size finished orders dated before cutoff; returns how many moved.
+
+    The caller commits.
+    """
+    session = session or db.session
+    ids = session.execute(
+        select(Order.id)
+        .where(Order.order_status.in_(FINISHED_STATUSES), Order.order_date < cutoff)
+        .order_by(Order.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    archived_at = literal(utcnow(), DateTime).label("archived_at")
+    for source, target in TABLES:
+        columns = [column.name for column in target.c if column.name in source.c]
+        query = select(*(source.c[name] for name in columns)).where(_order_key(source).in_(ids))
+        if "archived_at" in target.c:
+            columns.append("archived_at")
+            query = query.add_columns(archived_at)
+        session.execute(target.insert().from_select(columns, query))
+    for source, _ in reversed(TABLES):
+        session.execute(source.delete().where(_order_key(source).in_(ids)))
+    return len(ids)
+
+
+def archive_orders(days=ARCHIVE_AFTER_DAYS, batch_size=BATCH_SIZE, session=None):
+    """Archive every finished order older than days, committing after each batch.
+
+    Returns the number of orders moved.
+    """
+    session = session or db.session
+    cutoff = utcnow() - timedelta(days=days)
+    for _, target in TABLES:
+        target.create(session.connection(), checkfirst=True)
+    session.commit()
+
+    started = time.perf_counter()
+    moved = 0
+    while True:
+        try:
+            batch = archive_batch(cutoff, batch_size, session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            print(f"❌ Archiving failed after {moved} orders; rerun to continue")
+            raise
+        if not batch:
+            break
+        moved += batch
+        print(f"🚚 {moved} orders archived")
+    elapsed = time.perf_counter() - started
+    print(f"✅ Archived {moved} orders finished before {cutoff:%Y-%m-%d} in {elapsed:.1f}s")
+    return moved
+
+
+# ============================ 📜 HISTORY ============================ #
+def _seek(model, filters, after, limit):
+    item_model = model.order_items.property.mapper.class_
+    query = (
+        select(model)
+        .where(*filters(model))
+        .options(
+            selectinload(model.order_items).joinedload(item_model.item),
+            selectinload(model.rating),
+            joinedload(model.restaurant),
+        )
+        .order_by(model.order_date.desc(), model.id.desc())
+        .limit(limit)
+    )
+    if after:
+        query = query.where(tuple_(model.order_date, model.id) < tuple_(*after))
+    return db.session.execute(query).scalars().all()
+
+
+def _history_page(filters, cursor, limit):
+    after = decode_cursor(cursor, str, str, int)
+    tier = after[0] if after else "order"
+    if tier not in TIERS:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    try:
+        key = (datetime.fromisoformat(after[1]), after[2]) if after else None
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    names = list(TIERS)
+    page = []
+    for name in names[names.index(tier):]:
+        # One row past the page tells whether another page follows
+        page += _seek(TIERS[name], filters, key if name == tier else None, limit + 1 - len(page))
+        if len(page) > limit:
+            last = page[limit - 1]
+            return page[:limit], encode_cursor("archive" if last.archived else "order", last.order_date, last.id)
+    return page, None
+
+
+def order_history_page(user_id, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """A user's placed orders, newest first; returns (orders, next cursor or None).
+
+    Orders are Order or ArchivedOrder rows (check .archived). Raises
+    ValueError for a malformed cursor.
+    """
+    return _history_page(
+        lambda model: (model.user_id == user_id, model.order_status != OrderStatus.SHOPPING.value),
+        cursor, limit,
+    )
+
+
+def restaurant_history_page(restaurant_id, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """A restaurant's delivered and cancelled orders, newest first; returns (orders, next cursor or None)."""
+    return _history_page(
+        lambda model: (model.restaurant_id == restaurant_id, model.order_status.in_(FINISHED_STATUSES)),
+        cursor, limit,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move old finished orders to the archive tables")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"archive orders older than this (default {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app import app
+    with app.app_context():
+        try:
+            archive_orders(days=args.days, batch_size=args.batch_size)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Order lifecycle: which status changes are allowed, applied without races.
+
+    shopping -> pending -> accepted -> prepared -> delivered
+        |          |          |
+        +----------+----------+----> cancelled
+
+Every change is a single `UPDATE order SET order_status = :target ...
+WHERE id = :id AND order_status = :expected`, which also stamps the
+column recording when the order entered its new status. If a customer
+cancels while the restaurant accepts, only one UPDATE matches the row;
+the other raises StaleOrderState instead of overwriting it, and no row
+lock is held across the request.
+
+The UPDATE bypasses the ORM, so the order events (events.py) and the
+dashboard stats (stats.py) that the session hooks would otherwise
+produce are recorded here. Nothing here commits.
+"""
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import db, Order, OrderStatus, utcnow
+import events
+import stats
+
+TRANSITIONS = {
+    OrderStatus.SHOPPING: {OrderStatus.PENDING, OrderStatus.CANCELLED},
+    OrderStatus.PENDING: {OrderStatus.ACCEPTED, OrderStatus.CANCELLED},
+    OrderStatus.ACCEPTED: {OrderStatus.PREPARED, OrderStatus.CANCELLED},
+    OrderStatus.PREPARED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+# Column stamped when an order enters each status
+TIMESTAMPS = {
+    OrderStatus.PENDING: "placed_at",
+    OrderStatus.ACCEPTED: "accepted_at",
+    OrderStatus.PREPARED: "prepared_at",
+    OrderStatus.DELIVERED: "delivered_at",
+    OrderStatus.CANCELLED: "cancelled_at",
+}
+
+
+class OrderStateError(Exception):
+    """Raised when an order cannot change status."""
+
+
+class InvalidTransition(OrderStateError):
+    """Raised for a status change the lifecycle does not allow."""
+
+
+class StaleOrderState(OrderStateError):
+    """Raised when the order was no longer in the expected status."""
+
+
+def can_transition(current, target):
+    return OrderStatus(target) in TRANSITIONS[OrderStatus(current)]
+
+
+def transition(order, target, expected=None, session=None):
+    """Move order to target, provided it is still in expected.
+
+    expected defaults to the status the order had when it was loaded.
+    Raises InvalidTransition if the lifecycle does not allow the change and
+    StaleOrderState if another transaction moved the order first (its
+    status is then expired, so the next read sees the current one).
+    """
+    session = session or db.session
+    target = OrderStatus(target)
+    expected = OrderStatus(expected if expected is not None else order.order_status)
+    if target not in TRANSITIONS[expected]:
+        raise InvalidTransition(f"Order {order.id} cannot go from {expected.value} to {target.value}")
+
+    now = utcnow()
+    updated = session.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.order_status == expected.value)
+        .values({"order_status": target.value, TIMESTAMPS[target]: now})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated != 1:
+        session.expire(order, ["order_status"])
+        raise StaleOrderState(f"Order {order.id} changed status since it was read as {expected.value}")
+
+    # Update the loaded order without making it dirty, so no hook counts the change twice
+    set_committed_value(order, "order_status", target.value)
+    set_committed_value(order, TIMESTAMPS[target], now)
+    if target == stats.COMPLETED_STATUS:
+        stats.record_orders([order], session=session)
+    events.queue_order_event(
+        session, order.id, order.user_id, order.restaurant_id, target.value,
+        "order_created" if expected == OrderStatus.SHOPPING else "order_status",
+    )
+    if expected == OrderStatus.SHOPPING:
+        # The UPDATE above bypasses the flush hooks, so recount the cart it just checked out
+        events.queue_cart_counts(session, [order.user_id])
+    return order
+
+
+# ============================ 🧾 TRANSITIONS ============================ #
+def place_order(order, session=None):
+    """Check out a cart."""
+    return transition(order, OrderStatus.PENDING, session=session)
+
+
+def accept_order(order, session=None):
+    return transition(order, OrderStatus.ACCEPTED, session=session)
+
+
+def mark_order_prepared(order, session=None):
+    return transition(order, OrderStatus.PREPARED, session=session)
+
+
+def mark_order_delivered(order, session=None):
+    return transition(order, OrderStatus.DELIVERED, session=session)
+
+
+def cancel_order(order, session=None):
+    """Cancel a cart or an order that has not been prepared yet."""
+    return transition(order, OrderStatus.CANCELLED, session=session)
@@ -0,0 +1,193 @@
+"""Conditional GETs and fragment caching for rendered pages.
+
+Every Restaurant carries a version counter and an updated_at timestamp.
+Both are bumped whenever something the pages show changes: the
+restaurant's own columns (not its balance), its menu items, its ratings.
+
+render_if_modified() turns a page's data version into an ETag and a
+Last-Modified header and answers 304 when the browser already has that
+version, skipping the template render entirely. The ETag also covers the
+logged-in user (the header greets them by name) and the deployed
+templates and assets.
+
+The {% cache %} tag stores a rendered block in the shared cache under its
+key parts, e.g. {% cache "restaurant_card", restaurant.id, restaurant.version %}.
+Keys contain the version, so a changed restaurant simply misses and old
+entries age out; nothing has to be invalidated. Cached blocks must not
+depend on the current user.
+"""
+import glob
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from jinja2 import Undefined, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from assets import MANIFEST
+from cache import get_cache
+from models import db, Item, MenuItem, Restaurant, utcnow
+
+FRAGMENT_CACHE_TTL = int(os.environ.get("FRAGMENT_CACHE_TTL", 3600))
+
+# Restaurant columns that never appear on a page; changing them keeps the version
+UNVERSIONED_FIELDS = {"balance", "version", "updated_at"}
+
+_fingerprint = None
+
+
+# ============================ 🔖 VERSIONS ============================ #
+def _bump_values():
+    return {"version": Restaurant.version + 1, "updated_at": utcnow()}
+
+
+def _restaurant_changed(restaurant):
+    state = inspect(restaurant)
+    return any(
+        attr.history.has_changes()
+        for attr in state.attrs
+        if attr.key not in UNVERSIONED_FIELDS and attr.key in state.mapper.column_attrs
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_versions(session, flush_context, instances):
+    for obj in session.dirty:
+        if isinstance(obj, Restaurant) and _restaurant_changed(obj):
+            # SQL expressions keep concurrent bumps from overwriting each other
+            for key, value in _bump_values().items():
+                setattr(obj, key, value)
+
+    # Menu changes bump their restaurant once the item rows are written
+    touched = session.info.setdefault("touched_restaurants", set())
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, (Item, MenuItem)):
+            # Both the old and new restaurant when an item moves
+            restaurant_ids = inspect(obj).attrs.restaurant_id.history.sum() or [obj.restaurant_id]
+            touched.update(restaurant_id for restaurant_id in restaurant_ids if restaurant_id is not None)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_touched_restaurants(session, flush_context):
+    touched = session.info.pop("touched_restaurants", None)
+    if touched:
+        table = Restaurant.__table__
+        session.connection().execute(
+            table.update()
+            .where(table.c.id.in_(sorted(touched)))
+            .values(version=table.c.version + 1, updated_at=utcnow())
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched_restaurants(session):
+    session.info.pop("touched_restaurants", None)
+
+
+def catalog_version():
+    """(version, last modified) covering every restaurant and menu, in one aggregate query.
+
+    The restaurant count and version sum change with any insert, delete or bump.
+    """
+    count, version_sum, last_modified = db.session.query(
+        func.count(Restaurant.id), func.coalesce(func.sum(Restaurant.version), 0), func.max(Restaurant.updated_at)
+    ).one()
+    return (count, version_sum), last_modified
+
+
+# ============================ 🧾 CONDITIONAL RESPONSES ============================ #
+def deploy_fingerprint():
+    """(hash, modification time) of the templates and asset manifest this process renders with."""
+    global _fingerprint
+    if _fingerprint is None:
+        paths = sorted(glob.glob(os.path.join(current_app.root_path, current_app.template_folder, "**", "*.html"), recursive=True))
+        if os.path.exists(MANIFEST):
+            paths.append(MANIFEST)
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        mtime = max((os.path.getmtime(path) for path in paths), default=0)
+        _fingerprint = (digest.hexdigest()[:16], datetime.fromtimestamp(int(mtime), timezone.utc))
+    return _fingerprint
+
+
+def _viewer():
+    if current_user.is_authenticated:
+        return (current_user.id, current_user.first_name, current_user.user_type)
+    return "anonymous"
+
+
+def _as_utc(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    # Last-Modified says nothing about who is logged in, so only anonymous pages can rely on it
+    if request.if_modified_since and not current_user.is_authenticated:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def render_if_modified(version, render, last_modified=None):
+    """Respond 304 if the client's copy matches version, otherwise render().
+
+    version is any repr-able value that changes whenever the page's data
+    does; render is called only when a full response is needed.
+    """
+    template_hash, deployed_at = deploy_fingerprint()
+    etag = hashlib.sha256(repr((version, _viewer(), template_hash)).encode()).hexdigest()[:32]
+    last_modified = max(_as_utc(last_modified), deployed_at) if last_modified else deployed_at
+
+    # Flashed messages are shown once, so a page carrying them is never "unchanged"
+    if session.get("_flashes"):
+        return make_response(render())
+
+    if _not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add("Cookie")
+    return response
+
+
+# ============================ 🧩 FRAGMENT CACHE ============================ #
+class FragmentCacheExtension(Extension):
+    """{% cache "name", key, ... %}...{% endcache %} stored in the shared cache."""
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render_cached", [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, parts, caller):
+        # A missing key part (e.g. a listing entry cached before versions existed) is never shared
+        if any(part is None or isinstance(part, Undefined) for part in parts):
+            return caller()
+        key = "fragment:" + ":".join(str(part) for part in parts) + ":" + deploy_fingerprint()[0]
+        return Markup(get_cache().get_or_set(key, lambda: str(caller()), FRAGMENT_CACHE_TTL))
+
+
+def init_page_cache(app):
+    """Enable the {% cache %} tag on a Flask app."""
+    app.jinja_env.add_extension(FragmentCacheExtension)
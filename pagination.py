@@ -0,0 +1,31 @@
+"""Opaque cursor tokens for keyset (seek) pagination."""
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page as a URL-safe token."""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, *types):
+    """Decode a token from encode_cursor(); returns None for an empty token.
+
+    types gives the expected type of each value, e.g. decode_cursor(token, int, int).
+    Raises ValueError if the token is malformed or its values don't match types.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError(f"Invalid cursor: {token}")
+    for value, expected in zip(values, types):
+        # bool is an int subclass, but never a valid sort key here
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ValueError(f"Invalid cursor: {token}")
+    return values
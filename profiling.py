@@ -0,0 +1,176 @@
+"""Request-level SQL instrumentation.
+
+Hooks SQLAlchemy's cursor events to record, per request, how many queries
+ran, how long they took and which were slowest. Each response gets a
+Server-Timing header, statements slower than SLOW_QUERY_THRESHOLD_MS go to
+the "lieferspatz.slow_query" logger as JSON, and per-route totals are kept
+in memory for /api/metrics (admins only).
+"""
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOWEST_KEPT = 5
+STATEMENT_PREVIEW = 500
+UNMATCHED_ROUTE = "<unmatched>"
+
+slow_query_logger = logging.getLogger("lieferspatz.slow_query")
+
+_settings = {"slow_query_ms": float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100))}
+_route_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+class QueryStats:
+    """SQL statements executed during one request (or one QueryCounter block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = []  # min-heap of (duration_ms, statement)
+
+    def record(self, statement, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        entry = (duration_ms, statement[:STATEMENT_PREVIEW])
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, entry)
+        elif duration_ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def slowest_statements(self):
+        return [
+            {"duration_ms": round(duration, 3), "statement": statement}
+            for duration, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+class QueryCounter:
+    """Context manager counting the SQL statements run inside the block.
+
+        with QueryCounter() as queries:
+            render_dashboard()
+        assert queries.count == 6
+    """
+    _local = threading.local()
+
+    def __enter__(self):
+        self.stats = QueryStats()
+        self._local.__dict__.setdefault("stack", []).append(self.stats)
+        return self.stats
+
+    def __exit__(self, *exc):
+        self._local.stack.pop()
+
+    @classmethod
+    def active(cls):
+        return getattr(cls._local, "stack", None) or []
+
+
+# ============================ 🪝 SQLALCHEMY HOOKS ============================ #
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    for stats in QueryCounter.active():
+        stats.record(statement, duration_ms)
+
+    route = None
+    if has_request_context():
+        route = request.endpoint
+        stats = g.get("sql_stats")
+        if stats is not None:
+            stats.record(statement, duration_ms)
+
+    if duration_ms >= _settings["slow_query_ms"]:
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "route": route,
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement[:STATEMENT_PREVIEW],
+            "executemany": executemany,
+        }))
+
+
+# ============================ 🌐 FLASK MIDDLEWARE ============================ #
+def _start_request():
+    g.sql_stats = QueryStats()
+    g.request_started = time.perf_counter()
+
+
+def _finish_request(response):
+    stats = g.pop("sql_stats", None)
+    started = g.pop("request_started", None)
+    if stats is None or started is None:
+        return response
+
+    wall_ms = (time.perf_counter() - started) * 1000
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries", app;dur={wall_ms:.2f}',
+    )
+    # Unmatched URLs (404s, scanners) share one entry so the table can't grow without bound
+    _record_route(request.endpoint or UNMATCHED_ROUTE, wall_ms, stats)
+    return response
+
+
+def _record_route(route, wall_ms, stats):
+    with _metrics_lock:
+        metrics = _route_metrics.setdefault(route, {
+            "requests": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "db_ms": 0.0,
+            "queries": 0,
+            "max_queries": 0,
+            "slowest": [],
+        })
+        metrics["requests"] += 1
+        metrics["total_ms"] += wall_ms
+        metrics["max_ms"] = max(metrics["max_ms"], wall_ms)
+        metrics["db_ms"] += stats.total_ms
+        metrics["queries"] += stats.count
+        metrics["max_queries"] = max(metrics["max_queries"], stats.count)
+        slowest = metrics["slowest"] + stats.slowest_statements()
+        metrics["slowest"] = sorted(slowest, key=lambda s: s["duration_ms"], reverse=True)[:SLOWEST_KEPT]
+
+
+def get_metrics():
+    """Snapshot of per-route request and SQL totals since process start."""
+    with _metrics_lock:
+        return {
+            route: {
+                "requests": m["requests"],
+                "avg_ms": round(m["total_ms"] / m["requests"], 3),
+                "max_ms": round(m["max_ms"], 3),
+                "avg_db_ms": round(m["db_ms"] / m["requests"], 3),
+                "avg_queries": round(m["queries"] / m["requests"], 2),
+                "max_queries": m["max_queries"],
+                "slowest_queries": list(m["slowest"]),
+            }
+            for route, m in _route_metrics.items()
+        }
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _route_metrics.clear()
+
+
+def init_profiling(app):
+    """Install the per-request SQL profiler on a Flask app."""
+    _settings["slow_query_ms"] = float(app.config.get("SLOW_QUERY_THRESHOLD_MS", _settings["slow_query_ms"]))
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,273 @@
+"""Full-text search over restaurants and menu items.
+
+The backend is chosen from the database dialect: Postgres uses weighted
+tsvector expressions backed by GIN indexes, SQLite uses FTS5 tables kept
+in sync by triggers. Any other database falls back to the old ILIKE scan,
+and so does SQLite until init_search_index() (or the migration) has
+created the FTS tables.
+"""
+import re
+import weakref
+
+from sqlalchemy import inspect, or_, text
+
+from models import db, Restaurant, MenuItem
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query):
+    """Split a raw search string into lowercase word tokens."""
+    return [token.lower() for token in _TOKEN_RE.findall(query or "")]
+
+
+def _load_in_order(model, ids):
+    """Load model rows for ids, keeping the ranked order of ids."""
+    if not ids:
+        return []
+    rows = {row.id: row for row in model.query.filter(model.id.in_(ids)).all()}
+    return [rows[i] for i in ids if i in rows]
+
+
+# ============================ 🔎 BACKENDS ============================ #
+class IlikeSearchBackend:
+    """Substring matching with ILIKE. Needs no index but scans both tables."""
+    name = "ilike"
+
+    def ensure_index(self, connection):
+        pass
+
+    def has_index(self, connection):
+        return True
+
+    def search_restaurants(self, tokens, limit, offset):
+        filters = [
+            or_(
+                Restaurant.name.ilike(f"%{token}%"),
+                Restaurant.description.ilike(f"%{token}%"),
+                Restaurant.city.ilike(f"%{token}%"),
+            )
+            for token in tokens
+        ]
+        query = Restaurant.query.filter(*filters)
+        total = query.count()
+        return query.order_by(Restaurant.id).limit(limit).offset(offset).all(), total
+
+    def search_menu_items(self, tokens, limit, offset):
+        filters = [
+            or_(
+                MenuItem.name.ilike(f"%{token}%"),
+                MenuItem.description.ilike(f"%{token}%"),
+            )
+            for token in tokens
+        ]
+        query = MenuItem.query.filter(*filters)
+        total = query.count()
+        return query.order_by(MenuItem.id).limit(limit).offset(offset).all(), total
+
+
+class SQLiteSearchBackend:
+    """FTS5 external-content tables, ranked with bm25."""
+    name = "sqlite-fts5"
+
+    DDL = [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS restaurant_fts USING fts5(
+            name, description, city,
+            content='restaurant', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS menu_item_fts USING fts5(
+            name, description,
+            content='menu_item', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')""",
+        """CREATE TRIGGER IF NOT EXISTS restaurant_fts_ai AFTER INSERT ON restaurant BEGIN
+            INSERT INTO restaurant_fts(rowid, name, description, city)
+            VALUES (new.id, new.name, new.description, new.city);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS restaurant_fts_ad AFTER DELETE ON restaurant BEGIN
+            INSERT INTO restaurant_fts(restaurant_fts, rowid, name, description, city)
+            VALUES ('delete', old.id, old.name, old.description, old.city);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS restaurant_fts_au AFTER UPDATE OF name, description, city ON restaurant BEGIN
+            INSERT INTO restaurant_fts(restaurant_fts, rowid, name, description, city)
+            VALUES ('delete', old.id, old.name, old.description, old.city);
+            INSERT INTO restaurant_fts(rowid, name, description, city)
+            VALUES (new.id, new.name, new.description, new.city);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS menu_item_fts_ai AFTER INSERT ON menu_item BEGIN
+            INSERT INTO menu_item_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS menu_item_fts_ad AFTER DELETE ON menu_item BEGIN
+            INSERT INTO menu_item_fts(menu_item_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS menu_item_fts_au AFTER UPDATE OF name, description ON menu_item BEGIN
+            INSERT INTO menu_item_fts(menu_item_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO menu_item_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END""",
+    ]
+
+    def ensure_index(self, connection):
+        """Create the FTS tables and triggers, then rebuild from the base tables."""
+        for statement in self.DDL:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO restaurant_fts(restaurant_fts) VALUES ('rebuild')"))
+        connection.execute(text("INSERT INTO menu_item_fts(menu_item_fts) VALUES ('rebuild')"))
+
+    def has_index(self, connection):
+        tables = set(inspect(connection).get_table_names())
+        return {"restaurant_fts", "menu_item_fts"} <= tables
+
+    @staticmethod
+    def match_expression(tokens):
+        # Quote every token so user input can never inject FTS5 syntax,
+        # and make the last one a prefix so search-as-you-type works.
+        terms = ['"%s"' % token.replace('"', '""') for token in tokens]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def _search(self, fts_table, weights, model, tokens, limit, offset):
+        params = {"q": self.match_expression(tokens), "limit": limit, "offset": offset}
+        ids = db.session.execute(
+            text(
+                f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :q "
+                f"ORDER BY bm25({fts_table}, {weights}) LIMIT :limit OFFSET :offset"
+            ),
+            params,
+        ).scalars().all()
+        total = db.session.execute(
+            text(f"SELECT count(*) FROM {fts_table} WHERE {fts_table} MATCH :q"), params
+        ).scalar()
+        return _load_in_order(model, ids), total
+
+    def search_restaurants(self, tokens, limit, offset):
+        return self._search("restaurant_fts", "10.0, 2.0, 5.0", Restaurant, tokens, limit, offset)
+
+    def search_menu_items(self, tokens, limit, offset):
+        return self._search("menu_item_fts", "10.0, 2.0", MenuItem, tokens, limit, offset)
+
+
+class PostgresSearchBackend:
+    """Weighted tsvector expressions served by GIN expression indexes.
+
+    The index is on the expression itself, so Postgres maintains it on every
+    insert and update without triggers or extra columns.
+    """
+    name = "postgres-tsvector"
+
+    RESTAURANT_DOCUMENT = (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(city, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+    )
+    MENU_ITEM_DOCUMENT = (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+    )
+
+    def ensure_index(self, connection):
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_restaurant_search ON restaurant "
+            f"USING gin (({self.RESTAURANT_DOCUMENT}))"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_menu_item_search ON menu_item "
+            f"USING gin (({self.MENU_ITEM_DOCUMENT}))"
+        ))
+
+    def has_index(self, connection):
+        # The expressions work without their GIN indexes, just slower
+        return True
+
+    @staticmethod
+    def tsquery(tokens):
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def _search(self, table, document, model, tokens, limit, offset):
+        params = {"q": self.tsquery(tokens), "limit": limit, "offset": offset}
+        ids = db.session.execute(
+            text(
+                f"SELECT id FROM {table}, to_tsquery('simple', :q) AS query "
+                f"WHERE ({document}) @@ query "
+                f"ORDER BY ts_rank({document}, query) DESC, id "
+                f"LIMIT :limit OFFSET :offset"
+            ),
+            params,
+        ).scalars().all()
+        total = db.session.execute(
+            text(f"SELECT count(*) FROM {table} WHERE ({document}) @@ to_tsquery('simple', :q)"),
+            params,
+        ).scalar()
+        return _load_in_order(model, ids), total
+
+    def search_restaurants(self, tokens, limit, offset):
+        return self._search("restaurant", self.RESTAURANT_DOCUMENT, Restaurant, tokens, limit, offset)
+
+    def search_menu_items(self, tokens, limit, offset):
+        return self._search("menu_item", self.MENU_ITEM_DOCUMENT, MenuItem, tokens, limit, offset)
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+# Engines whose index is known to exist, so the check runs once per process
+_indexed_engines = weakref.WeakSet()
+
+
+def get_backend(dialect_name=None):
+    """Return the search backend for the current (or given) database dialect.
+
+    For the bound database, falls back to IlikeSearchBackend while the
+    dialect's index hasn't been created yet.
+    """
+    if dialect_name is not None:
+        return BACKENDS.get(dialect_name, IlikeSearchBackend)()
+    engine = db.engine
+    backend = BACKENDS.get(engine.dialect.name, IlikeSearchBackend)()
+    if engine not in _indexed_engines:
+        with engine.connect() as connection:
+            if not backend.has_index(connection):
+                return IlikeSearchBackend()
+        _indexed_engines.add(engine)
+    return backend
+
+
+def init_search_index():
+    """Create the search index for the bound database. Safe to run repeatedly."""
+    backend = get_backend(db.engine.dialect.name)
+    with db.engine.begin() as connection:
+        backend.ensure_index(connection)
+    _indexed_engines.add(db.engine)
+    return backend
+
+
+# ============================ 📄 QUERY API ============================ #
+def search(query, page=1, per_page=DEFAULT_PER_PAGE, backend=None):
+    """Search restaurants and menu items; returns ranked, paginated results."""
+    page = max(page or 1, 1)
+    per_page = min(max(per_page or DEFAULT_PER_PAGE, 1), MAX_PER_PAGE)
+    tokens = tokenize(query)
+    results = {
+        "restaurants": [],
+        "menu_items": [],
+        "restaurant_total": 0,
+        "menu_item_total": 0,
+        "page": page,
+        "per_page": per_page,
+    }
+    if not tokens:
+        return results
+
+    backend = backend or get_backend()
+    offset = (page - 1) * per_page
+    results["restaurants"], results["restaurant_total"] = backend.search_restaurants(tokens, per_page, offset)
+    results["menu_items"], results["menu_item_total"] = backend.search_menu_items(tokens, per_page, offset)
+    return results
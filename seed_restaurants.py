@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+import geocoding
+import hashing
 from app import app, db, User, Restaurant  # Import necessary models
 
 # List of cities
@@ -13,19 +15,19 @@ restaurant_names = [
 # Sample restaurant types (cuisine types)
 restaurant_types = ["Italian", "Vegan", "BBQ", "Sushi", "Mexican", "Burgers", "Indian", "Chinese"]
 
-def create_restaurant_user(email, password, first_name, last_name, location, plz):
-    """Creates a restaurant user and returns the user object."""
+def create_restaurant_user(email, password_hash, first_name, last_name, location, plz):
+    """Creates a restaurant user and returns the user object (flushed, not committed)."""
     user = User(
         email=email,
+        password_hash=password_hash,
         first_name=first_name,
         last_name=last_name,
         location=location,
         plz=plz,
         user_type="restaurant"
     )
-    user.set_password(password)
     db.session.add(user)
-    db.session.commit()
+    db.session.flush()  # Assigns user.id without a commit per user
     return user
 
 def seed_restaurants():
@@ -35,19 +37,21 @@ def seed_restaurants():
     db.session.commit()
 
     restaurant_count_per_city = 8
+    # Every seeded user gets the same default password, so hash it once
+    password_hash = hashing.hash_password("password123")
+    addresses = {}
 
     for city in cities:
         for i in range(restaurant_count_per_city):
             # Generate a unique email for the restaurant
             email = f"{city.lower()}_{i+1}@lieferspatz.com"
-            password = "password123"  # Default password
             first_name = restaurant_names[i]
             last_name = "Restaurant"
             location = f"Random Street {i+1}, {city}, Germany"
             plz = f"47{i+1}00"
 
             # Create a restaurant user
-            user = create_restaurant_user(email, password, first_name, last_name, location, plz)
+            user = create_restaurant_user(email, password_hash, first_name, last_name, location, plz)
 
             # Create a restaurant linked to the user
             restaurant = Restaurant(
@@ -61,6 +65,14 @@ def seed_restaurants():
             )
 
             db.session.add(restaurant)
+            addresses[restaurant] = geocoding.full_address(location, plz, city)
+
+    # One cache read for all addresses; only unseen ones go to the geocoder.
+    # New answers join this transaction, which already holds the write lock.
+    locations = geocoding.geocode_many(addresses.values(), db.session.connection())
+    for restaurant, address in addresses.items():
+        if locations.get(address):
+            restaurant.latitude, restaurant.longitude = locations[address].latitude, locations[address].longitude
 
     db.session.commit()
     print("✅ Successfully seeded restaurants!")
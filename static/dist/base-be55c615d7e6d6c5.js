@@ -0,0 +1,27 @@
+var LIVE_POLL_MS=30000;function liveEvents(){if(!window.EventSource||document.body.dataset.liveEvents!=='on'){return null;}
+if(!window.lieferspatzEvents){window.lieferspatzEvents=new EventSource('/events');}
+return window.lieferspatzEvents;};document.addEventListener('DOMContentLoaded',function(){const cartCount=document.getElementById('cart-count');const cartToggle=document.getElementById('cart-toggle');const cartSidebar=document.getElementById('cart-sidebar');const closeCart=document.getElementById('close-cart');const overlay=document.getElementById('overlay');const mobileMenu=document.getElementById('mobile-menu');const navbarToggle=document.getElementById('navbar-toggle');function updateCartCount(){fetch('/cart/count').then(response=>{if(!response.ok){throw new Error('Network response was not ok');}
+return response.json();}).then(data=>{if(cartCount){cartCount.textContent=data.count||'0';}}).catch(error=>{console.error('Error fetching cart count:',error);});}
+updateCartCount();const events=document.querySelector('[data-live-orders]')?liveEvents():null;if(events){events.addEventListener('cart_count',function(event){if(cartCount){cartCount.textContent=JSON.parse(event.data).count||'0';}});['order_created','order_status'].forEach(function(eventName){events.addEventListener(eventName,function(){window.location.reload();});});}
+if(navbarToggle&&mobileMenu&&overlay){navbarToggle.addEventListener('click',function(){if(mobileMenu.classList.contains('hidden')){mobileMenu.classList.remove('hidden');overlay.classList.remove('hidden');document.body.classList.add('overflow-hidden');}else{mobileMenu.classList.add('hidden');overlay.classList.add('hidden');document.body.classList.remove('overflow-hidden');}});}
+if(cartToggle&&cartSidebar&&closeCart&&overlay){cartToggle.addEventListener('click',function(){cartSidebar.classList.remove('translate-x-full');overlay.classList.remove('hidden');document.body.classList.add('overflow-hidden');loadCartItems();});closeCart.addEventListener('click',function(){cartSidebar.classList.add('translate-x-full');overlay.classList.add('hidden');document.body.classList.remove('overflow-hidden');});overlay.addEventListener('click',function(){cartSidebar.classList.add('translate-x-full');if(mobileMenu)mobileMenu.classList.add('hidden');overlay.classList.add('hidden');document.body.classList.remove('overflow-hidden');});}
+function loadCartItems(){const cartItemsContainer=document.getElementById('cart-items');const cartTotal=document.getElementById('cart-total');if(cartItemsContainer&&cartTotal){fetch('/cart/items').then(response=>response.json()).then(data=>{if(data.items&&data.items.length>0){let html='';let total=0;data.items.forEach(item=>{const itemTotal=item.price*item.quantity;total+=itemTotal;html+=`
+              <div class="flex justify-between items-center py-2 border-b">
+                <div>
+                  <p class="font-medium">${item.name}</p>
+                  <p class="text-sm text-gray-500">${item.quantity} x €${item.price.toFixed(2)}</p>
+                </div>
+                <div class="flex items-center">
+                  <span class="font-medium">€${itemTotal.toFixed(2)}</span>
+                  <button class="remove-item ml-2 text-red-500" data-id="${item.id}">
+                    <svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                      <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"></path>
+                    </svg>
+                  </button>
+                </div>
+              </div>
+              `;});cartItemsContainer.innerHTML=html;cartTotal.textContent=`€${total.toFixed(2)}`;document.querySelectorAll('.remove-item').forEach(button=>{button.addEventListener('click',function(){const itemId=this.dataset.id;removeCartItem(itemId);});});}else{cartItemsContainer.innerHTML='<p class="text-gray-500 text-center">Your cart is empty</p>';cartTotal.textContent='€0.00';}}).catch(error=>{console.error('Error loading cart items:',error);cartItemsContainer.innerHTML='<p class="text-red-500 text-center">Failed to load cart items</p>';});}}
+function removeCartItem(itemId){fetch(`/cart/remove/${itemId}`,{method:'POST',headers:{'Content-Type':'application/json','X-Requested-With':'XMLHttpRequest'}}).then(response=>response.json()).then(data=>{loadCartItems();updateCartCount();}).catch(error=>{console.error('Error removing item from cart:',error);});}
+const addToCartButtons=document.querySelectorAll('.add-to-cart');if(addToCartButtons.length>0){addToCartButtons.forEach(button=>{button.addEventListener('click',function(e){e.preventDefault();const itemId=this.dataset.itemId;const restaurantId=this.dataset.restaurantId;if(!itemId||!restaurantId){console.error('Missing item ID or restaurant ID');return;}
+fetch('/cart/add',{method:'POST',headers:{'Content-Type':'application/json','X-Requested-With':'XMLHttpRequest'},body:JSON.stringify({item_id:itemId,restaurant_id:restaurantId,quantity:1})}).then(response=>{if(!response.ok){throw new Error('Network response was not ok');}
+return response.json();}).then(data=>{updateCartCount();alert('Item added to cart!');}).catch(error=>{console.error('Error adding item to cart:',error);alert('Failed to add item to cart. Please try again.');});});});}});
\ No newline at end of file
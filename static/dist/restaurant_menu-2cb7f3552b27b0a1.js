@@ -0,0 +1,111 @@
+var LIVE_POLL_MS=30000;function liveEvents(){if(!window.EventSource||document.body.dataset.liveEvents!=='on'){return null;}
+if(!window.lieferspatzEvents){window.lieferspatzEvents=new EventSource('/events');}
+return window.lieferspatzEvents;};document.addEventListener("DOMContentLoaded",async function(){console.log("📥 Fetching menu items...");const restaurantId=window.location.pathname.split("/").pop();const menuContainer=document.getElementById("menu-container");const cartSidebar=document.getElementById('cart-sidebar');const cartOverlay=document.getElementById('cart-overlay');const cartButton=document.getElementById('cart-btn');const closeCartButton=document.getElementById('close-cart');if(closeCartButton){closeCartButton.addEventListener('click',function(e){e.preventDefault();e.stopPropagation();console.log("NUCLEAR CLOSE: Close button clicked in restaurant.js");if(typeof window.closeCart==='function'){window.closeCart(e);}else{console.error("closeCart function not found! Using nuclear close method");const sidebar=document.getElementById('cart-sidebar');const overlay=document.getElementById('cart-overlay');if(sidebar&&sidebar.parentNode){console.log("NUCLEAR: Removing sidebar from DOM");sidebar.parentNode.removeChild(sidebar);const newSidebar=document.createElement('div');newSidebar.id='cart-sidebar';newSidebar.style.display='none';document.body.appendChild(newSidebar);}
+if(overlay&&overlay.parentNode){console.log("NUCLEAR: Removing overlay from DOM");overlay.parentNode.removeChild(overlay);const newOverlay=document.createElement('div');newOverlay.id='cart-overlay';newOverlay.style.display='none';document.body.appendChild(newOverlay);}
+document.querySelectorAll('[id*="cart"]').forEach(el=>{if(el.id!=='cart-btn'&&el.id!=='cart-bubble'){el.style.display='none';}});document.body.style.overflow='';document.documentElement.style.overflow='';console.log("NUCLEAR close completed");}
+return false;},true);}
+async function addToCart(menuItemId){console.log(`🛍️ Adding item ${menuItemId} to cart...`);const cartBubble=document.getElementById('cart-bubble')||document.querySelector('.cart-bubble')||document.querySelector('[id$="cart-bubble"]');if(cartBubble){let currentCount=parseInt(cartBubble.textContent)||0;currentCount++;cartBubble.textContent=currentCount;cartBubble.style.cssText=`
+                display: flex !important;
+                visibility: visible !important;
+                opacity: 1 !important;
+                background-color: #ef4444 !important;
+                color: white !important;
+                border-radius: 9999px !important;
+                position: absolute !important;
+                top: -8px !important;
+                right: -8px !important;
+                height: 20px !important;
+                width: 20px !important;
+                font-weight: bold !important;
+                font-size: 12px !important;
+                align-items: center !important;
+                justify-content: center !important;
+                z-index: 9999 !important;
+            `;cartBubble.classList.remove('hidden','invisible');void cartBubble.offsetHeight;}
+try{const response=await fetch(`/cart/add/${menuItemId}`,{method:"POST",headers:{"Content-Type":"application/json","X-Requested-With":"XMLHttpRequest"}});if(response.ok){console.log("✅ Item added to cart successfully");await loadCartItems();setTimeout(updateCartCount,100);openCart();window.dispatchEvent(new CustomEvent('cartChanged',{detail:{action:'add',itemId:menuItemId}}));return true;}else{console.error("❌ Failed to add item to cart");updateCartCount();return false;}}catch(error){console.error("Error adding item to cart:",error);updateCartCount();return false;}}
+async function updateCartCount(){console.log("🔄 Updating cart count...");try{const response=await fetch("/cart/count");const data=await response.json();const count=data.count||0;console.log(`🛒 Cart count updated: ${count}`);const cartBubble=document.getElementById("cart-bubble")||document.querySelector(".cart-bubble")||document.querySelector("[id$='cart-bubble']");const cartCount=document.getElementById("cart-count")||document.querySelector(".cart-count")||document.querySelector("[id$='cart-count']");if(cartBubble){cartBubble.textContent=count;console.log(`🔵 Making cart bubble visible with count: ${count}`);cartBubble.classList.remove("hidden","invisible","opacity-0");cartBubble.classList.add("visible","opacity-100");cartBubble.style.cssText=`
+                    display: flex !important;
+                    visibility: visible !important;
+                    opacity: 1 !important;
+                    background-color: #ef4444 !important;
+                    color: white !important;
+                    border-radius: 9999px !important;
+                    position: absolute !important;
+                    top: -8px !important;
+                    right: -8px !important;
+                    height: 20px !important;
+                    width: 20px !important;
+                    font-weight: bold !important;
+                    font-size: 12px !important;
+                    align-items: center !important;
+                    justify-content: center !important;
+                    z-index: 9999 !important;
+                `;void cartBubble.offsetHeight;cartBubble.getBoundingClientRect();const computedStyle=window.getComputedStyle(cartBubble);console.log(`Cart bubble computed style - display: ${computedStyle.display}, visibility: ${computedStyle.visibility}, opacity: ${computedStyle.opacity}`);}else{console.error("❌ Cart bubble element not found!");}
+if(cartCount&&cartCount!==cartBubble){cartCount.textContent=count;cartCount.classList.remove("hidden","invisible","opacity-0");cartCount.style.cssText="display: flex !important; visibility: visible !important; opacity: 1 !important;";}
+return count;}catch(error){console.error("Error updating cart count:",error);return 0;}}
+async function loadCartItems(){console.log("Loading cart items...");try{const response=await fetch("/api/cart");const data=await response.json();renderCartItems(data.items);}catch(error){console.error("Error loading cart items:",error);}}
+function renderCartItems(cartItems){console.log("Rendering cart items:",cartItems);const cartItemsContainer=document.getElementById("cart-items");if(!cartItemsContainer)return;cartItemsContainer.innerHTML="";if(!cartItems||cartItems.length===0){cartItemsContainer.innerHTML=`
+                <p class="text-gray-500 text-center py-8">Your cart is empty.</p>
+            `;return;}
+const itemsDiv=document.createElement('div');itemsDiv.className='flex-1 overflow-y-auto';let subtotal=0;cartItems.forEach((item)=>{const itemTotal=item.price*item.quantity;subtotal+=itemTotal;const itemElement=document.createElement("div");itemElement.className="flex justify-between items-center border-b py-3";itemElement.innerHTML=`
+                <div class="flex-1">
+                    <h3 class="font-medium">${item.name}</h3>
+                    <div class="flex items-center">
+                        <span class="text-gray-600">€${item.price.toFixed(2)} × ${item.quantity}</span>
+                    </div>
+                </div>
+                <div class="flex items-center">
+                    <span class="font-medium">€${itemTotal.toFixed(2)}</span>
+                    <button class="remove-item ml-2 text-red-500 hover:text-red-700" data-id="${item.id}">
+                        <svg xmlns="http://www.w3.org/2000/svg" class="h-5 w-5" viewBox="0 0 20 20" fill="currentColor">
+                            <path fill-rule="evenodd" d="M4.293 4.293a1 1 0 011.414 0L10 8.586l4.293-4.293a1 1 0 111.414 1.414L11.414 10l4.293 4.293a1 1 0 01-1.414 1.414L10 11.414l-4.293 4.293a1 1 0 01-1.414-1.414L8.586 10 4.293 5.707a1 1 0 010-1.414z" clip-rule="evenodd" />
+                        </svg>
+                    </button>
+                </div>
+            `;itemsDiv.appendChild(itemElement);});const bottomSection=document.createElement('div');bottomSection.className='border-t sticky bottom-0 bg-white pt-4';const deliveryFee=2.99;const total=subtotal+deliveryFee;bottomSection.innerHTML=`
+            <div class="mt-2">
+                <div class="flex justify-between mb-2">
+                    <span class="text-gray-600">Subtotal:</span>
+                    <span>€${subtotal.toFixed(2)}</span>
+                </div>
+                <div class="flex justify-between mb-2">
+                    <span class="text-gray-600">Delivery Fee:</span>
+                    <span>€${deliveryFee.toFixed(2)}</span>
+                </div>
+                <div class="flex justify-between font-bold text-lg mb-4">
+                    <span>Total:</span>
+                    <span>€${total.toFixed(2)}</span>
+                </div>
+                <a href="/checkout" class="block bg-teal-600 text-white text-center py-2 px-4 rounded-lg hover:bg-teal-700 transition">
+                    Proceed to Checkout
+                </a>
+            </div>
+        `;cartItemsContainer.appendChild(itemsDiv);cartItemsContainer.appendChild(bottomSection);const removeButtons=cartItemsContainer.querySelectorAll(".remove-item");removeButtons.forEach((button)=>{button.addEventListener("click",async(e)=>{const itemId=button.getAttribute("data-id");await removeCartItem(itemId);});});}
+async function removeCartItem(itemId){console.log("🗑️ Removing item from cart:",itemId);const cartBubble=document.getElementById('cart-bubble')||document.querySelector('.cart-bubble')||document.querySelector('[id$="cart-bubble"]');let currentCount=0;if(cartBubble){currentCount=parseInt(cartBubble.textContent)||0;if(currentCount>0){currentCount--;}
+cartBubble.textContent=currentCount;cartBubble.style.cssText=`
+                display: flex !important;
+                visibility: visible !important;
+                opacity: 1 !important;
+                background-color: #ef4444 !important;
+                color: white !important;
+                border-radius: 9999px !important;
+                position: absolute !important;
+                top: -8px !important;
+                right: -8px !important;
+                height: 20px !important;
+                width: 20px !important;
+                font-weight: bold !important;
+                font-size: 12px !important;
+                align-items: center !important;
+                justify-content: center !important;
+                z-index: 9999 !important;
+            `;cartBubble.classList.remove("hidden","invisible","opacity-0");void cartBubble.offsetHeight;}
+try{const response=await fetch(`/cart/remove/${itemId}`,{method:"POST",headers:{"Content-Type":"application/json","X-Requested-With":"XMLHttpRequest"}});if(response.ok){console.log("✅ Item removed from cart successfully");await loadCartItems();const count=await updateCartCount();window.dispatchEvent(new CustomEvent('cartChanged',{detail:{action:'remove',itemId:itemId}}));if(count===0){console.log("🛒 Cart is now empty, closing cart");if(typeof window.closeCart==='function'){window.closeCart();}else if(typeof window.forceCloseCart==='function'){window.forceCloseCart();}else{const sidebar=document.getElementById('cart-sidebar');const overlay=document.getElementById('cart-overlay');if(sidebar)sidebar.style.cssText="display: none !important; transform: translateX(100%) !important;";if(overlay)overlay.style.cssText="display: none !important;";document.body.style.overflow='';}}
+return true;}else{console.error("❌ Failed to remove item from cart");updateCartCount();return false;}}catch(error){console.error("❌ Error removing item from cart:",error);updateCartCount();return false;}}
+updateCartCount();const events=liveEvents();if(events){events.addEventListener("cart_count",function(){updateCartCount();});}else{setInterval(updateCartCount,LIVE_POLL_MS);}
+try{const response=await fetch(`/api/restaurant/${restaurantId}/menu`);const data=await response.json();console.log("Menu data:",data);document.querySelectorAll(".add-to-cart").forEach((button)=>{button.addEventListener("click",(e)=>{const itemId=button.getAttribute("data-id");addToCart(itemId);});});}catch(error){console.error("Error loading menu items:",error);}
+document.addEventListener('click',function(e){if(e.target.id==='close-cart'||e.target.closest('#close-cart')){e.preventDefault();e.stopPropagation();console.log("🛒 Emergency close handler triggered");if(typeof window.closeCart==='function'){window.closeCart();}else{console.log("⚠️ No global closeCart function, using nuclear method");const cartSidebar=document.getElementById('cart-sidebar');const cartOverlay=document.getElementById('cart-overlay');if(cartSidebar){cartSidebar.classList.remove('visible');cartSidebar.style.transform='translateX(100%)';}
+if(cartOverlay){cartOverlay.classList.remove('visible');cartOverlay.style.display='none';}
+document.body.style.overflow='';document.body.classList.remove('cart-open');}}});document.addEventListener('click',function(e){if(e.target.id==='emergency-close-cart'){e.preventDefault();e.stopPropagation();console.log("🛒 Emergency button close handler triggered");if(typeof window.closeCart==='function'){window.closeCart();}else{console.log("⚠️ No global closeCart function, using nuclear method");const cartSidebar=document.getElementById('cart-sidebar');const cartOverlay=document.getElementById('cart-overlay');if(cartSidebar){cartSidebar.classList.remove('visible');cartSidebar.style.transform='translateX(100%)';}
+if(cartOverlay){cartOverlay.classList.remove('visible');cartOverlay.style.display='none';}
+document.body.style.overflow='';document.body.classList.remove('cart-open');}}});});
\ No newline at end of file
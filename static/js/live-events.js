@@ -0,0 +1,17 @@
+// Shared Server-Sent Events connection for cart and order updates.
+// Bundled into both base.js and restaurant_menu.js, so a page opens one
+// /events stream however many of its scripts listen. Only pages that show
+// something live call liveEvents(). It returns null where the server has
+// streaming off (<body data-live-events="off">, e.g. on Vercel) or the
+// browser lacks EventSource, and callers then poll every LIVE_POLL_MS.
+var LIVE_POLL_MS = 30000;  // var: both bundles declare it
+
+function liveEvents() {
+  if (!window.EventSource || document.body.dataset.liveEvents !== 'on') {
+    return null;
+  }
+  if (!window.lieferspatzEvents) {
+    window.lieferspatzEvents = new EventSource('/events');
+  }
+  return window.lieferspatzEvents;
+}
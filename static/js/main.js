@@ -33,6 +33,22 @@ document.addEventListener('DOMContentLoaded', function() {
   // Update cart count on page load
   updateCartCount();
   
+  // Pages showing live orders carry data-live-orders; only they open /events (see live-events.js)
+  const events = document.querySelector('[data-live-orders]') ? liveEvents() : null;
+  if (events) {
+    events.addEventListener('cart_count', function(event) {
+      if (cartCount) {
+        cartCount.textContent = JSON.parse(event.data).count || '0';
+      }
+    });
+    // Reload when an order arrives or changes state
+    ['order_created', 'order_status'].forEach(function(eventName) {
+      events.addEventListener(eventName, function() {
+        window.location.reload();
+      });
+    });
+  }
+  
   // Navbar toggle functionality
   if (navbarToggle && mobileMenu && overlay) {
     navbarToggle.addEventListener('click', function() {
@@ -445,6 +445,16 @@ document.addEventListener("DOMContentLoaded", async function () {
 
     // Initialize
     updateCartCount();
+
+    // Refresh the cart bubble when the server pushes a new count, or poll where it can't (see live-events.js)
+    const events = liveEvents();
+    if (events) {
+        events.addEventListener("cart_count", function () {
+            updateCartCount();
+        });
+    } else {
+        setInterval(updateCartCount, LIVE_POLL_MS);
+    }
     
     // Load menu items
     try {
@@ -0,0 +1,251 @@
+"""Rolled-up order statistics for the admin dashboard.
+
+restaurant_daily_stats holds, per restaurant and day, the number of
+delivered orders with their revenue (total_price) and service fees. The
+dashboard reads these rows instead of aggregating the order table.
+
+Rows are kept current incrementally: a session hook sees orders entering
+or leaving the completed status (or being deleted) and upserts the
+difference in the same transaction. Writes that bypass the ORM (bulk
+imports, Core UPDATEs) call record_orders() or rebuild() themselves.
+
+Usage:
+    python stats.py rebuild [--since YYYY-MM-DD]   # recompute from the order table
+    python stats.py check                          # report drift, exit 1 if any
+"""
+import argparse
+import sys
+from datetime import date
+
+from sqlalchemy import BigInteger, and_, event, func, inspect, or_, select, type_coerce, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import db, ArchivedOrder, Order, OrderStatus, RestaurantDailyStats, utcnow
+from money import Money
+
+COMPLETED_STATUS = OrderStatus.DELIVERED.value
+
+_table = RestaurantDailyStats.__table__
+
+
+# ============================ ➕ INCREMENTAL UPDATES ============================ #
+def _upsert(connection, restaurant_id, day, orders, revenue_cents, fee_cents):
+    values = {
+        "restaurant_id": restaurant_id,
+        "day": day,
+        "order_count": orders,
+        "revenue": Money.from_cents(revenue_cents),
+        "service_fees": Money.from_cents(fee_cents),
+    }
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(_table).values(**values)
+        connection.execute(insert.on_conflict_do_update(
+            index_elements=["restaurant_id", "day"],
+            set_={
+                "order_count": _table.c.order_count + insert.excluded.order_count,
+                "revenue": _table.c.revenue + insert.excluded.revenue,
+                "service_fees": _table.c.service_fees + insert.excluded.service_fees,
+            },
+        ))
+        return
+    updated = connection.execute(
+        _table.update()
+        .where(_table.c.restaurant_id == restaurant_id, _table.c.day == day)
+        .values(
+            order_count=_table.c.order_count + orders,
+            revenue=type_coerce(_table.c.revenue, BigInteger) + revenue_cents,
+            service_fees=type_coerce(_table.c.service_fees, BigInteger) + fee_cents,
+        )
+    ).rowcount
+    if not updated:
+        connection.execute(_table.insert().values(**values))
+
+
+def _apply(connection, deltas):
+    # Sorted so concurrent transactions lock rows in the same order
+    for (restaurant_id, day), (orders, revenue, fees) in sorted(deltas.items()):
+        if orders or revenue or fees:
+            _upsert(connection, restaurant_id, day, orders, revenue, fees)
+
+
+def _add(deltas, sign, restaurant_id, order_date, total_price, service_fee):
+    if restaurant_id is None:
+        return
+    day = (order_date or utcnow()).date()
+    counts = deltas.setdefault((restaurant_id, day), [0, 0, 0])
+    counts[0] += sign
+    counts[1] += sign * Money(total_price or 0).cents
+    counts[2] += sign * Money(service_fee or 0).cents
+
+
+def record_orders(orders, sign=1, session=None):
+    """Count completed orders into the stats (sign=-1 takes them back out).
+
+    For code that changes order_status with a Core UPDATE, which the
+    session hook cannot see.
+    """
+    session = session or db.session
+    deltas = {}
+    for order in orders:
+        _add(deltas, sign, order.restaurant_id, order.order_date, order.total_price, order.service_fee)
+    _apply(session.connection(), deltas)
+
+
+def _before_and_after(order):
+    """(restaurant_id, order_date, total_price, service_fee, completed) before and after this flush."""
+    state = inspect(order)
+    before, after = [], []
+    for key in ("restaurant_id", "order_date", "total_price", "service_fee", "order_status"):
+        # load_history() reads unloaded columns instead of reporting them as empty
+        history = state.attrs[key].load_history()
+        current = history.added[0] if history.added else (history.unchanged[0] if history.unchanged else None)
+        previous = history.deleted[0] if history.deleted else current
+        before.append(previous)
+        after.append(current)
+    before[-1] = before[-1] == COMPLETED_STATUS
+    after[-1] = after[-1] == COMPLETED_STATUS
+    return before, after
+
+
+# Assigning to an expired attribute normally forgets the old value; keep it,
+# so a flush can tell which status (and amounts) an order is leaving
+for _attribute in (Order.restaurant_id, Order.order_date, Order.total_price, Order.service_fee, Order.order_status):
+    event.listen(_attribute, "set", lambda target, value, oldvalue, initiator: value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_completed_orders(session, flush_context):
+    deltas = {}
+    for order in session.new:
+        if isinstance(order, Order) and order.order_status == COMPLETED_STATUS:
+            _add(deltas, 1, order.restaurant_id, order.order_date, order.total_price, order.service_fee)
+    for order in session.deleted:
+        if isinstance(order, Order):
+            before, _ = _before_and_after(order)
+            if before[-1]:
+                _add(deltas, -1, *before[:-1])
+    for order in session.dirty:
+        if isinstance(order, Order) and session.is_modified(order):
+            before, after = _before_and_after(order)
+            if before == after:
+                continue
+            if before[-1]:
+                _add(deltas, -1, *before[:-1])
+            if after[-1]:
+                _add(deltas, 1, *after[:-1])
+    if deltas:
+        _apply(session.connection(), deltas)
+
+
+# ============================ 🔁 REBUILD ============================ #
+def _completed_orders(since=None):
+    """Delivered orders from the order table and the archive (see order_archive.py)."""
+    selects = []
+    for table in (Order.__table__, ArchivedOrder.__table__):
+        query = select(
+            table.c.id, table.c.restaurant_id, table.c.order_date, table.c.total_price, table.c.service_fee,
+        ).where(table.c.order_status == COMPLETED_STATUS, table.c.restaurant_id.is_not(None))
+        if since:
+            query = query.where(table.c.order_date >= since)
+        selects.append(query)
+    return union_all(*selects).subquery()
+
+
+def _aggregate(since=None):
+    orders = _completed_orders(since)
+    day = func.date(orders.c.order_date)
+    return (
+        select(
+            orders.c.restaurant_id.label("restaurant_id"),
+            day.label("day"),
+            func.count(orders.c.id).label("order_count"),
+            func.coalesce(func.sum(type_coerce(orders.c.total_price, BigInteger)), 0).label("revenue"),
+            func.coalesce(func.sum(type_coerce(orders.c.service_fee, BigInteger)), 0).label("service_fees"),
+        )
+        .group_by(orders.c.restaurant_id, day)
+    )
+
+
+def rebuild(since=None, session=None):
+    """Recompute the stats from the orders, for days from since on (all days by default).
+
+    Archived orders count too, so archiving never changes the figures.
+    Runs as one DELETE and one INSERT ... SELECT, so readers see either the
+    old or the new figures. Returns the number of rows written. The caller
+    commits.
+    """
+    session = session or db.session
+    _table.create(session.connection(), checkfirst=True)
+    delete = _table.delete()
+    if since:
+        delete = delete.where(_table.c.day >= since)
+    session.execute(delete)
+    columns = ["restaurant_id", "day", "order_count", "revenue", "service_fees"]
+    return session.execute(_table.insert().from_select(columns, _aggregate(since))).rowcount
+
+
+def check(session=None):
+    """Return (restaurant_id, day) rows whose stored stats disagree with the order table."""
+    session = session or db.session
+    actual = _aggregate().subquery()
+    restaurant_id, day, orders, revenue, fees = actual.c
+    stored_day = func.date(_table.c.day)
+    mismatches = []
+    # A full outer join, done as two left joins for SQLite
+    for stored_first in (True, False):
+        if stored_first:
+            query = select(
+                _table.c.restaurant_id, stored_day, _table.c.order_count, orders,
+            ).outerjoin(actual, and_(restaurant_id == _table.c.restaurant_id, day == stored_day)).where(or_(
+                # Rows whose orders all left the completed status stay behind as zeros
+                and_(orders.is_(None), or_(
+                    _table.c.order_count != 0,
+                    type_coerce(_table.c.revenue, BigInteger) != 0,
+                    type_coerce(_table.c.service_fees, BigInteger) != 0,
+                )),
+                orders != _table.c.order_count,
+                revenue != type_coerce(_table.c.revenue, BigInteger),
+                fees != type_coerce(_table.c.service_fees, BigInteger),
+            ))
+        else:
+            query = select(restaurant_id, day, _table.c.order_count, orders).outerjoin(
+                _table, and_(_table.c.restaurant_id == restaurant_id, stored_day == day)
+            ).where(_table.c.restaurant_id.is_(None))
+        mismatches.extend(
+            {"restaurant_id": row[0], "day": row[1], "stored_orders": row[2] or 0, "actual_orders": row[3] or 0}
+            for row in session.execute(query)
+        )
+    return sorted(mismatches, key=lambda row: (row["restaurant_id"], str(row["day"])))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Maintain the admin dashboard statistics")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = commands.add_parser("rebuild", help="recompute stats from the order table")
+    rebuild_parser.add_argument("--since", type=date.fromisoformat, help="only rebuild days from this date on")
+    commands.add_parser("check", help="compare stored stats with the order table")
+    args = parser.parse_args(argv)
+
+    from app import app
+    with app.app_context():
+        if args.command == "rebuild":
+            rows = rebuild(since=args.since)
+            db.session.commit()
+            print(f"✅ Rebuilt {rows} restaurant-day rows" + (f" since {args.since}" if args.since else ""))
+            return 0
+
+        drift = check()
+        for row in drift:
+            print(f"❌ Restaurant {row['restaurant_id']} on {row['day']}: stored {row['stored_orders']} orders, "
+                  f"actual {row['actual_orders']}")
+        if drift:
+            print(f"❌ {len(drift)} restaurant-days have drifted; run `python stats.py rebuild`")
+            return 1
+        print("✅ Dashboard statistics match the order table")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
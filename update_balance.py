@@ -1,15 +1,16 @@
-from app import app
-from models import db, Restaurant
+from models import Restaurant
+from ledger import credit_all
+from migration_runner import DataMigration, run_cli
 
-def add_credit_to_restaurants():
-    with app.app_context():
-        restaurants = Restaurant.query.all()
-        for restaurant in restaurants:
-            if restaurant.balance is None:
-                restaurant.balance = 0  # Initialize balance if None
-            restaurant.balance += 100  # Add 100 credit
-        db.session.commit()
-        print("Added 100 credit to each restaurant.")
+class AddRestaurantCredit(DataMigration):
+    """Add 100 credit to each restaurant, once, in resumable chunks."""
+    name = "add_restaurant_credit_100"
+    model = Restaurant
+
+    def process_chunk(self, session, first_id, last_id):
+        # Set-based UPDATE (NULL balances count as 0) plus a ledger entry per restaurant
+        return credit_all("restaurant", 100, reason="promo_credit",
+                          where=Restaurant.id.between(first_id, last_id), session=session)
 
 if __name__ == "__main__":
-    add_credit_to_restaurants()
\ No newline at end of file
+    run_cli(AddRestaurantCredit())
@@ -0,0 +1,172 @@
+"""Background image uploads.
+
+Requests hand the file bytes to a worker pool and return straight away;
+the worker pushes the image to the storage backend, retrying with
+exponential backoff, and writes the final URL to Restaurant.image_url.
+
+Job state lives in the upload_job table, so a poll by job id can land on
+any worker or instance. The upload itself runs in the process that
+accepted it: if that process exits mid-upload, its job stays pending or
+uploading until it is pruned. Finished jobs are pruned once they are
+UPLOAD_JOB_RETENTION seconds old.
+"""
+import io
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sqlalchemy import select
+from werkzeug.utils import secure_filename
+
+from models import db, Restaurant, UploadJob, utcnow
+from images import process_image, VARIANT_WIDTHS
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", 2))
+UPLOAD_MAX_ATTEMPTS = int(os.environ.get("UPLOAD_MAX_ATTEMPTS", 4))
+UPLOAD_RETRY_DELAY = float(os.environ.get("UPLOAD_RETRY_DELAY", 1.0))
+
+PENDING = "pending"
+UPLOADING = "uploading"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs older than this are forgotten
+UPLOAD_JOB_RETENTION = int(os.environ.get("UPLOAD_JOB_RETENTION", 86400))
+
+_jobs = UploadJob.__table__
+
+
+class UploadError(Exception):
+    """Raised by a backend when an upload attempt fails and may be retried."""
+
+
+# ============================ 🗄️ BACKENDS ============================ #
+class LocalUploadBackend:
+    """Writes uploads and their resized variants into a local folder served
+    under /static/uploads."""
+    name = "local"
+
+    def __init__(self, folder, url_prefix="/static/uploads"):
+        self.folder = folder
+        self.url_prefix = url_prefix
+
+    def upload(self, data, filename):
+        files = process_image(data, secure_filename(filename) or "upload")
+        os.makedirs(self.folder, exist_ok=True)
+        for stored_name, content in files:
+            with open(os.path.join(self.folder, stored_name), "wb") as f:
+                f.write(content)
+        return f"{self.url_prefix}/{files[0][0]}"
+
+
+class CloudinaryUploadBackend:
+    """Uploads through cloud_storage.upload_file()."""
+    name = "cloudinary"
+
+    def upload(self, data, filename):
+        from cloud_storage import upload_file
+        # Have Cloudinary render the srcset widths up front instead of on first view
+        eager = [{"width": width, "crop": "limit", "fetch_format": "auto", "quality": "auto"}
+                 for width in VARIANT_WIDTHS]
+        url = upload_file(io.BytesIO(data), eager=eager)
+        if not url:
+            raise UploadError(f"Cloudinary upload failed for {filename}")
+        return url
+
+
+# ============================ 🧵 QUEUE ============================ #
+class UploadQueue:
+    """Thread pool that runs uploads and records their progress."""
+
+    def __init__(self, app, backend, workers=UPLOAD_WORKERS,
+                 max_attempts=UPLOAD_MAX_ATTEMPTS, retry_delay=UPLOAD_RETRY_DELAY):
+        self.app = app
+        self.backend = backend
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload")
+
+    def submit(self, restaurant_id, data, filename):
+        """Queue an image for a restaurant and return the job id."""
+        job_id = uuid.uuid4().hex
+        now = utcnow()
+        with self.app.app_context(), db.engine.begin() as connection:
+            connection.execute(_jobs.delete().where(
+                _jobs.c.status.in_((DONE, FAILED)),
+                _jobs.c.updated_at < now - timedelta(seconds=UPLOAD_JOB_RETENTION),
+            ))
+            connection.execute(_jobs.insert().values(
+                id=job_id, restaurant_id=restaurant_id, status=PENDING, attempts=0, updated_at=now,
+            ))
+        self._executor.submit(self._run, job_id, restaurant_id, data, filename)
+        return job_id
+
+    def status(self, job_id):
+        """The job as a dict (id, restaurant_id, status, attempts, url, error, updated_at), or None."""
+        with self.app.app_context(), db.engine.connect() as connection:
+            job = connection.execute(select(_jobs).where(_jobs.c.id == job_id)).mappings().first()
+        return dict(job) if job else None
+
+    def _update(self, job_id, **fields):
+        # Own short transaction, so pollers see progress while the upload runs
+        with self.app.app_context(), db.engine.begin() as connection:
+            connection.execute(_jobs.update().where(_jobs.c.id == job_id).values(updated_at=utcnow(), **fields))
+
+    def _run(self, job_id, restaurant_id, data, filename):
+        for attempt in range(1, self.max_attempts + 1):
+            self._update(job_id, status=UPLOADING, attempts=attempt)
+            try:
+                url = self.backend.upload(data, filename)
+                break
+            except Exception as e:
+                logger.warning(f"Upload {job_id} attempt {attempt} failed: {e}")
+                if attempt == self.max_attempts:
+                    self._update(job_id, status=FAILED, error=str(e))
+                    return
+                # Exponential backoff with jitter so retries don't stampede the backend
+                time.sleep(self.retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+        try:
+            with self.app.app_context():
+                restaurant = db.session.get(Restaurant, restaurant_id)
+                if restaurant is not None:
+                    restaurant.image_url = url
+                    db.session.commit()
+        except Exception as e:
+            logger.error(f"Upload {job_id} stored but saving the URL failed: {e}")
+            self._update(job_id, status=FAILED, url=url, error=str(e))
+            return
+        self._update(job_id, status=DONE, url=url)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def _default_backend(app):
+    backend = os.environ.get("UPLOAD_BACKEND")
+    if backend is None:
+        backend = "cloudinary" if os.environ.get("CLOUDINARY_CLOUD_NAME") else "local"
+    if backend == "cloudinary":
+        return CloudinaryUploadBackend()
+    if backend == "local":
+        from app import ensure_upload_folder
+        return LocalUploadBackend(ensure_upload_folder(app))
+    raise ValueError(f"Unknown UPLOAD_BACKEND {backend!r}")
+
+
+_queue_lock = threading.Lock()
+
+
+def get_upload_queue(app):
+    """The app's upload queue, created on first use."""
+    with _queue_lock:
+        queue = app.extensions.get("upload_queue")
+        if queue is None:
+            queue = app.extensions["upload_queue"] = UploadQueue(app, _default_backend(app))
+        return queue